@@ -1,22 +1,27 @@
 from __future__ import annotations
 
-import os
-
-from flask import send_from_directory
-
 from .admin import modules_admin_bp, register_admin_menu
 from .api import modules_api_bp
+from .cli import register_cli
+from .compat import warm_compat_callables
 from .hooks import register_plugin_runtime_hooks
 from .models import db_init
+from .utils.assets import STATIC_URL_PREFIX, asset_response, build_asset_manifest
+from .utils.cache import register_cache_invalidation_hooks
+from .utils.schedule import start_schedule_timer
+from .utils.sweeper import start_access_sweeper
 from .views import modules_bp
 
 
 def _register_static_route(app):
-    static_dir = os.path.join(os.path.dirname(__file__), "static")
+    try:
+        build_asset_manifest()
+    except Exception:
+        app.logger.exception("ctfd_modules: could not fingerprint static assets")
 
     try:
         has_static_rule = any(
-            rule.rule == "/plugins/ctfd_modules/static/<path:filename>"
+            rule.rule == f"{STATIC_URL_PREFIX}/<path:filename>"
             for rule in app.url_map.iter_rules()
         )
     except Exception:
@@ -25,9 +30,9 @@ def _register_static_route(app):
     if has_static_rule:
         return
 
-    @app.route("/plugins/ctfd_modules/static/<path:filename>")
+    @app.route(f"{STATIC_URL_PREFIX}/<path:filename>")
     def ctfd_modules_static(filename: str):
-        return send_from_directory(static_dir, filename)
+        return asset_response(filename)
 
 
 def _register_blueprints(app):
@@ -67,12 +72,18 @@ def _apply_patches(app):
 def load(app):
     """CTFd plugin entrypoint."""
 
+    warm_compat_callables()
+
     _register_static_route(app)
     _register_blueprints(app)
 
     db_init(app)
+    register_cache_invalidation_hooks()
     register_admin_menu(app)
     register_plugin_runtime_hooks(app)
+    register_cli(app)
+    start_access_sweeper(app)
+    start_schedule_timer(app)
 
     _register_user_menu()
     _apply_patches(app)
@@ -1,20 +1,44 @@
 from __future__ import annotations
 
+from datetime import datetime
+
 from flask import Blueprint, abort, flash, redirect, render_template, request, url_for, jsonify
 
-from CTFd.models import Users, db
+from CTFd.models import Teams, Users, db
 from CTFd.utils.decorators import admins_only, ratelimit
 from CTFd.utils.user import get_current_user
 
-from .models import Module, ModuleAccess, ModuleCategory, ModuleChallenge, ModuleStatus
+from .models import (
+    Module,
+    ModuleAccess,
+    ModuleCategory,
+    ModuleChallenge,
+    ModuleGroup,
+    ModuleGroupAccess,
+    ModuleGroupMember,
+    ModuleScore,
+    ModuleStatus,
+    ModuleTeamAccess,
+)
 from .compat import csrf_protect
 from .utils import (
+    add_group_members,
+    dump_prerequisites,
     ensure_private_invite_code,
     generate_invite_code,
     grant_access,
+    grant_group_access,
+    grant_team_access,
+    invalidate_cache,
+    parse_user_ids,
+    remove_group_member,
     revoke_access,
+    revoke_group_access,
+    revoke_team_access,
     ordered_modules_query,
     ordered_categories_query,
+    parse_prerequisites,
+    validate_prerequisites,
 )
 
 
@@ -25,6 +49,42 @@ def _to_int(value, default=0):
         return default
 
 
+def _to_datetime(value):
+    """Parse a `datetime-local` form value (treated as UTC)."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"invalid datetime: {value}")
+
+
+def _schedule_from_form(form):
+    """Return `(open_at, open_status, close_at)` or raise ValueError with a user-facing message."""
+    try:
+        open_at = _to_datetime(form.get("open_at"))
+        close_at = _to_datetime(form.get("close_at"))
+    except ValueError:
+        raise ValueError("Invalid schedule date")
+    if open_at and close_at and close_at <= open_at:
+        raise ValueError("Close time must be after open time")
+
+    open_status = (form.get("open_status") or "").strip() or None
+    if open_status is not None and open_status not in (ModuleStatus.public.value, ModuleStatus.private.value):
+        raise ValueError("Modules can only open as public or private")
+    if open_at is None:
+        open_status = None
+    return open_at, open_status, close_at
+
+
+def _prerequisites_from_form(module_id, form):
+    """Return the JSON prerequisites value or raise ValueError with a user-facing message."""
+    return dump_prerequisites(validate_prerequisites(module_id, form.getlist("prerequisites")))
+
+
 modules_admin_bp = Blueprint(
     "ctfd_modules_admin",
     __name__,
@@ -129,15 +189,28 @@ def admin_modules_new():
             categories = ordered_categories_query().all()
             return render_template("admin/modules/edit.html", module=None, categories=categories)
 
+        try:
+            open_at, open_status, close_at = _schedule_from_form(request.form)
+            prerequisites = _prerequisites_from_form(None, request.form)
+        except ValueError as e:
+            flash(str(e), "danger")
+            categories = ordered_categories_query().all()
+            return render_template("admin/modules/edit.html", module=None, categories=categories)
+
         m = Module(
             name=name,
             category=category_name,
             banner_url=(request.form.get("banner_url") or "").strip() or None,
             order=_to_int(request.form.get("order"), 0),
             status=(request.form.get("status") or "public").strip(),
+            open_at=open_at,
+            open_status=open_status,
+            close_at=close_at,
+            prerequisites=prerequisites,
         )
         ensure_private_invite_code(m)
         db.session.add(m)
+        invalidate_cache("modules")
         db.session.commit()
 
         flash("Module created", "success")
@@ -163,13 +236,25 @@ def admin_modules_edit(module_id: int):
             flash("Please select a category from the list", "danger")
             return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
 
+        try:
+            open_at, open_status, close_at = _schedule_from_form(request.form)
+            prerequisites = _prerequisites_from_form(module.id, request.form)
+        except ValueError as e:
+            flash(str(e), "danger")
+            return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
+
         module.name = name
         module.category = category_name
         module.banner_url = (request.form.get("banner_url") or "").strip() or None
         module.order = _to_int(request.form.get("order"), 0)
         module.status = (request.form.get("status") or "public").strip()
+        module.open_at = open_at
+        module.open_status = open_status
+        module.close_at = close_at
+        module.prerequisites = prerequisites
 
         ensure_private_invite_code(module)
+        invalidate_cache("modules")
         db.session.commit()
 
         flash("Module updated", "success")
@@ -194,6 +279,22 @@ def admin_modules_edit(module_id: int):
         access_users = []
         access_user_ids = set()
 
+    access_teams = (
+        db.session.query(Teams, ModuleTeamAccess.expires_at)
+        .join(ModuleTeamAccess, ModuleTeamAccess.team_id == Teams.id)
+        .filter(ModuleTeamAccess.module_id == module.id)
+        .order_by(Teams.name.asc())
+        .all()
+    )
+
+    access_groups = (
+        db.session.query(ModuleGroup, ModuleGroupAccess.expires_at)
+        .join(ModuleGroupAccess, ModuleGroupAccess.group_id == ModuleGroup.id)
+        .filter(ModuleGroupAccess.module_id == module.id)
+        .order_by(ModuleGroup.name.asc())
+        .all()
+    )
+
     if access_q:
         try:
             filters = []
@@ -224,6 +325,10 @@ def admin_modules_edit(module_id: int):
         access_results=access_results,
         access_users=access_users,
         access_user_ids=access_user_ids,
+        access_groups=access_groups,
+        access_teams=access_teams,
+        all_groups=ModuleGroup.query.order_by(ModuleGroup.name.asc()).all(),
+        prerequisite_ids=parse_prerequisites(module.prerequisites),
     )
 
 
@@ -238,7 +343,8 @@ def admin_modules_settings():
         flash("Settings updated", "success")
         return redirect(url_for("ctfd_modules_admin.admin_modules_settings"))
 
-    from .utils import get_settings, get_ui_theme, get_progress_mode
+    from .utils import get_settings, get_ui_theme, get_progress_loading, get_progress_mode, last_access_sweep
+    from .utils.sweeper import expired_access_count
 
     s = get_settings(create=True)
     current_mode = (getattr(s, "challenges_board_mode", "all") or "all").strip().lower()
@@ -248,6 +354,7 @@ def admin_modules_settings():
     lock_message = str(getattr(s, "lock_message", "") or "")
     ui_theme = get_ui_theme()
     progress_mode = get_progress_mode()
+    progress_loading = get_progress_loading()
 
     return render_template(
         "admin/modules/settings.html",
@@ -258,9 +365,80 @@ def admin_modules_settings():
         lock_message=lock_message,
         ui_theme=ui_theme,
         progress_mode=progress_mode,
+        progress_loading=progress_loading,
+        access_sweep=last_access_sweep(),
+        expired_access=expired_access_count(),
     )
 
 
+@modules_admin_bp.route("/access/sweep", methods=["POST"])
+@admins_only
+@csrf_protect
+def admin_modules_access_sweep():
+    from .utils import sweep_expired_access
+
+    stats = sweep_expired_access()
+    if request.is_json:
+        return jsonify({"success": True, "data": stats})
+
+    flash(f"Removed {stats['deleted']} expired grants", "success")
+    return redirect(url_for("ctfd_modules_admin.admin_modules_settings"))
+
+
+@modules_admin_bp.route("/cache/warm", methods=["POST"])
+@admins_only
+def admin_modules_cache_warm():
+    from .utils import request_cache_warmup, warm_caches
+
+    results = warm_caches()
+    request_cache_warmup()
+
+    if request.is_json:
+        return jsonify({"success": True, "data": results})
+
+    failed = sorted(name for name, ok in results.items() if not ok)
+    if failed:
+        flash(f"Caches warmed with errors: {', '.join(failed)}", "warning")
+    else:
+        flash("Caches warmed; other workers will rebuild in the background", "success")
+    return redirect(url_for("ctfd_modules_admin.admin_modules_settings"))
+
+
+@modules_admin_bp.route("/analytics", methods=["GET"])
+@admins_only
+def admin_modules_analytics():
+    from .utils import module_analytics
+    from .utils.analytics import analytics_refresh_interval
+
+    stats = module_analytics()
+    if request.args.get("format") == "json":
+        return jsonify({"success": True, "data": stats})
+
+    rows = []
+    for module in ordered_modules_query().all():
+        module_stats = stats["modules"].get(module.id)
+        if module_stats:
+            rows.append((module, module_stats))
+
+    return render_template(
+        "admin/modules/analytics.html",
+        rows=rows,
+        stats=stats,
+        refresh_interval=analytics_refresh_interval(),
+    )
+
+
+@modules_admin_bp.route("/analytics/refresh", methods=["POST"])
+@admins_only
+def admin_modules_analytics_refresh():
+    from .utils import refresh_module_analytics
+
+    refresh_module_analytics()
+    if request.is_json:
+        return jsonify({"success": True})
+    return redirect(url_for("ctfd_modules_admin.admin_modules_analytics"))
+
+
 @modules_admin_bp.route("/categories", methods=["GET"])
 @admins_only
 def admin_module_categories_list():
@@ -284,6 +462,7 @@ def admin_module_categories_new():
 
         cat = ModuleCategory(name=name, order=order)
         db.session.add(cat)
+        invalidate_cache("modules")
         db.session.commit()
         flash("Category created", "success")
         return redirect(url_for("ctfd_modules_admin.admin_module_categories_list"))
@@ -310,6 +489,7 @@ def admin_module_categories_edit(category_id: int):
         if old_name != name:
             Module.query.filter(Module.category == old_name).update({"category": name})
 
+        invalidate_cache("modules")
         db.session.commit()
         flash("Category updated", "success")
         return redirect(url_for("ctfd_modules_admin.admin_module_categories_list"))
@@ -325,6 +505,7 @@ def admin_module_categories_delete(category_id: int):
     # Detach modules from this category
     Module.query.filter(Module.category == category.name).update({"category": None})
     db.session.delete(category)
+    invalidate_cache("modules")
     db.session.commit()
     flash("Category deleted", "success")
     return redirect(url_for("ctfd_modules_admin.admin_module_categories_list"))
@@ -336,25 +517,82 @@ def admin_modules_delete(module_id: int):
     module = Module.query.get_or_404(module_id)
     ModuleAccess.query.filter_by(module_id=module.id).delete()
     ModuleChallenge.query.filter_by(module_id=module.id).delete()
+    ModuleScore.query.filter_by(module_id=module.id).delete()
+    ModuleGroupAccess.query.filter_by(module_id=module.id).delete()
+    ModuleTeamAccess.query.filter_by(module_id=module.id).delete()
+    invalidate_cache("access", "groups", "links", "modules")
     db.session.delete(module)
     db.session.commit()
     flash("Module deleted", "success")
     return redirect(url_for("ctfd_modules_admin.admin_modules_list"))
 
 
+# Rows per UPDATE ... CASE statement: 3 bind params per row stays below
+# SQLite's historical 999-parameter limit.
+REORDER_CHUNK_SIZE = 300
+
+
+def _parse_ordered_ids(raw) -> list[int] | None:
+    """Validate a reorder payload: a list of unique positive integer ids."""
+    if not isinstance(raw, list):
+        return None
+
+    ordered_ids = []
+    for value in raw:
+        if isinstance(value, bool):
+            return None
+        try:
+            ordered_ids.append(int(value))
+        except Exception:
+            return None
+
+    if any(value <= 0 for value in ordered_ids) or len(set(ordered_ids)) != len(ordered_ids):
+        return None
+    return ordered_ids
+
+
+def _bulk_update_order(model, ordered_ids: list[int]) -> None:
+    """Set `model.order` to each id's position with one UPDATE ... CASE per chunk."""
+    for start in range(0, len(ordered_ids), REORDER_CHUNK_SIZE):
+        chunk = ordered_ids[start : start + REORDER_CHUNK_SIZE]
+        positions = {row_id: start + idx for idx, row_id in enumerate(chunk)}
+        db.session.query(model).filter(model.id.in_(chunk)).update(
+            {model.order: db.case(positions, value=model.id)},
+            synchronize_session=False,
+        )
+
+
+def _reorder(model, not_found_error: str):
+    body = request.get_json(silent=True) or {}
+    ordered_ids = _parse_ordered_ids(body.get("ordered_ids"))
+    if ordered_ids is None:
+        return jsonify({"success": False, "error": "INVALID_PAYLOAD"}), 400
+    if not ordered_ids:
+        return jsonify({"success": True, "data": {"updated": 0}})
+
+    existing = {
+        row_id
+        for (row_id,) in db.session.query(model.id).filter(model.id.in_(ordered_ids)).all()
+    }
+    if len(existing) != len(ordered_ids):
+        return jsonify({"success": False, "error": not_found_error}), 404
+
+    _bulk_update_order(model, ordered_ids)
+    invalidate_cache("modules")
+    db.session.commit()
+    return jsonify({"success": True, "data": {"updated": len(ordered_ids)}})
+
+
 @modules_admin_bp.route("/modules/reorder", methods=["POST"])
 @admins_only
 def admin_modules_reorder():
-    body = request.get_json(silent=True) or {}
-    ordered_ids = body.get("ordered_ids") or []
-    if not isinstance(ordered_ids, list):
-        return jsonify({"success": False, "error": "INVALID_PAYLOAD"}), 400
+    return _reorder(Module, "MODULE_NOT_FOUND")
 
-    for idx, mid in enumerate(ordered_ids):
-        Module.query.filter_by(id=mid).update({"order": idx})
 
-    db.session.commit()
-    return jsonify({"success": True})
+@modules_admin_bp.route("/categories/reorder", methods=["POST"])
+@admins_only
+def admin_module_categories_reorder():
+    return _reorder(ModuleCategory, "CATEGORY_NOT_FOUND")
 
 
 @modules_admin_bp.route("/modules/<int:module_id>/regen", methods=["POST"])
@@ -417,6 +655,184 @@ def admin_modules_access_revoke(module_id: int):
     return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
 
 
+@modules_admin_bp.route("/modules/<int:module_id>/groups/add", methods=["POST"])
+@admins_only
+def admin_modules_group_access_add(module_id: int):
+    module = Module.query.get_or_404(module_id)
+    group = ModuleGroup.query.get(_to_int(request.form.get("group_id"), 0))
+    if not group:
+        flash("Group not found", "danger")
+        return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
+
+    try:
+        expires_at = _to_datetime(request.form.get("expires_at"))
+    except ValueError:
+        flash("Invalid expiry date", "danger")
+        return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
+
+    grant_group_access(module, group, granted_by_user=get_current_user(), expires_at=expires_at)
+    db.session.commit()
+    flash(f"Access granted to group {group.name}", "success")
+    return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
+
+
+@modules_admin_bp.route("/modules/<int:module_id>/groups/revoke", methods=["POST"])
+@admins_only
+def admin_modules_group_access_revoke(module_id: int):
+    module = Module.query.get_or_404(module_id)
+    revoke_group_access(module, _to_int(request.form.get("group_id"), 0))
+    db.session.commit()
+    flash("Group access revoked", "success")
+    return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
+
+
+@modules_admin_bp.route("/modules/<int:module_id>/teams/add", methods=["POST"])
+@admins_only
+def admin_modules_team_access_add(module_id: int):
+    module = Module.query.get_or_404(module_id)
+    team = Teams.query.get(_to_int(request.form.get("team_id"), 0))
+    if not team:
+        flash("Team not found", "danger")
+        return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
+
+    try:
+        expires_at = _to_datetime(request.form.get("expires_at"))
+    except ValueError:
+        flash("Invalid expiry date", "danger")
+        return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
+
+    grant_team_access(module, team.id, granted_by_user=get_current_user(), expires_at=expires_at)
+    db.session.commit()
+    flash(f"Access granted to team {team.name}", "success")
+    return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
+
+
+@modules_admin_bp.route("/modules/<int:module_id>/teams/revoke", methods=["POST"])
+@admins_only
+def admin_modules_team_access_revoke(module_id: int):
+    module = Module.query.get_or_404(module_id)
+    revoke_team_access(module, _to_int(request.form.get("team_id"), 0))
+    db.session.commit()
+    flash("Team access revoked", "success")
+    return redirect(url_for("ctfd_modules_admin.admin_modules_edit", module_id=module.id))
+
+
+@modules_admin_bp.route("/groups", methods=["GET"])
+@admins_only
+def admin_module_groups_list():
+    member_counts = dict(
+        db.session.query(ModuleGroupMember.group_id, db.func.count(ModuleGroupMember.user_id))
+        .group_by(ModuleGroupMember.group_id)
+        .all()
+    )
+    grant_counts = dict(
+        db.session.query(ModuleGroupAccess.group_id, db.func.count(ModuleGroupAccess.module_id))
+        .group_by(ModuleGroupAccess.group_id)
+        .all()
+    )
+    groups = ModuleGroup.query.order_by(ModuleGroup.name.asc()).all()
+    return render_template(
+        "admin/modules/groups/list.html",
+        groups=groups,
+        member_counts=member_counts,
+        grant_counts=grant_counts,
+    )
+
+
+@modules_admin_bp.route("/groups/new", methods=["GET", "POST"])
+@admins_only
+def admin_module_groups_new():
+    if request.method == "POST":
+        name = (request.form.get("name") or "").strip()
+        if not name:
+            flash("Name is required", "danger")
+            return render_template("admin/modules/groups/edit.html", group=None)
+
+        if ModuleGroup.query.filter_by(name=name).first():
+            flash("A group with this name already exists", "warning")
+            return render_template("admin/modules/groups/edit.html", group=None)
+
+        group = ModuleGroup(name=name, description=(request.form.get("description") or "").strip() or None)
+        db.session.add(group)
+        db.session.commit()
+        flash("Group created", "success")
+        return redirect(url_for("ctfd_modules_admin.admin_module_groups_edit", group_id=group.id))
+
+    return render_template("admin/modules/groups/edit.html", group=None)
+
+
+@modules_admin_bp.route("/groups/<int:group_id>/edit", methods=["GET", "POST"])
+@admins_only
+def admin_module_groups_edit(group_id: int):
+    group = ModuleGroup.query.get_or_404(group_id)
+
+    if request.method == "POST":
+        name = (request.form.get("name") or "").strip()
+        if not name:
+            flash("Name is required", "danger")
+            return redirect(url_for("ctfd_modules_admin.admin_module_groups_edit", group_id=group.id))
+
+        group.name = name
+        group.description = (request.form.get("description") or "").strip() or None
+        db.session.commit()
+        flash("Group updated", "success")
+        return redirect(url_for("ctfd_modules_admin.admin_module_groups_edit", group_id=group.id))
+
+    members = (
+        db.session.query(Users)
+        .join(ModuleGroupMember, ModuleGroupMember.user_id == Users.id)
+        .filter(ModuleGroupMember.group_id == group.id)
+        .order_by(Users.name.asc())
+        .all()
+    )
+    grants = (
+        db.session.query(Module, ModuleGroupAccess.expires_at)
+        .join(ModuleGroupAccess, ModuleGroupAccess.module_id == Module.id)
+        .filter(ModuleGroupAccess.group_id == group.id)
+        .order_by(Module.name.asc())
+        .all()
+    )
+    return render_template("admin/modules/groups/edit.html", group=group, members=members, grants=grants)
+
+
+@modules_admin_bp.route("/groups/<int:group_id>/delete", methods=["POST"])
+@admins_only
+def admin_module_groups_delete(group_id: int):
+    group = ModuleGroup.query.get_or_404(group_id)
+    ModuleGroupAccess.query.filter_by(group_id=group.id).delete()
+    ModuleGroupMember.query.filter_by(group_id=group.id).delete()
+    db.session.delete(group)
+    invalidate_cache("groups")
+    db.session.commit()
+    flash("Group deleted", "success")
+    return redirect(url_for("ctfd_modules_admin.admin_module_groups_list"))
+
+
+@modules_admin_bp.route("/groups/<int:group_id>/members/add", methods=["POST"])
+@admins_only
+def admin_module_groups_members_add(group_id: int):
+    group = ModuleGroup.query.get_or_404(group_id)
+    user_ids = parse_user_ids(request.form.get("user_ids"))
+    if not user_ids:
+        flash("Enter one or more user ids", "danger")
+        return redirect(url_for("ctfd_modules_admin.admin_module_groups_edit", group_id=group.id))
+
+    added = add_group_members(group, user_ids)
+    db.session.commit()
+    flash(f"Added {added} members", "success")
+    return redirect(url_for("ctfd_modules_admin.admin_module_groups_edit", group_id=group.id))
+
+
+@modules_admin_bp.route("/groups/<int:group_id>/members/remove", methods=["POST"])
+@admins_only
+def admin_module_groups_members_remove(group_id: int):
+    group = ModuleGroup.query.get_or_404(group_id)
+    remove_group_member(group, _to_int(request.form.get("user_id"), 0))
+    db.session.commit()
+    flash("Member removed", "success")
+    return redirect(url_for("ctfd_modules_admin.admin_module_groups_edit", group_id=group.id))
+
+
 @modules_admin_bp.route("/users/search", methods=["GET"])
 @admins_only
 def admin_users_search():
@@ -1,31 +1,40 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, abort, jsonify, request
 
-from CTFd.models import Challenges, Solves, Users, db
+from CTFd.models import Challenges, Users, db
 from CTFd.utils.decorators import authed_only, ratelimit
 from CTFd.utils.user import get_current_user
 
-try:
-    from CTFd.utils.config import is_teams_mode
-except Exception:
-    is_teams_mode = None
-
-try:
-    from CTFd.utils.user import get_current_team
-except Exception:
-    get_current_team = None
-
 from .models import Module, ModuleChallenge, ModuleStatus
-from .compat import csrf_protect
+from .compat import csrf_protect, resolve_compat_callable
 from .utils import (
-    module_challenges_query,
+    account_solved_ids,
+    challenge_module_index,
+    challenge_solves,
+    is_admin,
+    invalidate_cache,
+    linked_module_ids,
+    module_challenge_summaries,
     module_progress,
+    modules_progress,
     user_has_module_access,
-    grant_access,
+    grant_invite_access,
     modules_enabled,
-    ordered_modules_query,
+    module_prerequisites,
+    module_scoreboard,
+    module_snapshot,
+    module_snapshots,
+    module_status_code,
+    ordered_module_ids,
+    prerequisite_locked_ids,
+    rescore_modules,
+    ModuleSnapshot,
+    STATUS_LOCKED,
+    STATUS_PRIVATE,
+    STATUS_PUBLIC,
 )
+from .utils.visibility import account_hidden_challenges, bitset_contains
 
 
 modules_api_bp = Blueprint("ctfd_modules_api", __name__, url_prefix="/api/v1/modules")
@@ -45,41 +54,31 @@ def _forbidden_response():
     return jsonify({"success": False, "error": "FORBIDDEN"}), 403
 
 
-def _module_access_error(module: Module, user: Users | None):
-    if module.status == ModuleStatus.locked:
+def _snapshot_or_404(module_id: int) -> ModuleSnapshot:
+    module = module_snapshot(module_id)
+    if module is None:
+        abort(404)
+    return module
+
+
+def _module_access_error(module: Module | ModuleSnapshot, user: Users | None):
+    status = module_status_code(module)
+    if status == STATUS_LOCKED:
         return jsonify({"success": False, "error": "MODULE_LOCKED"}), 403
-    if module.status == ModuleStatus.private and not user_has_module_access(user, module):
+    if status == STATUS_PRIVATE and not user_has_module_access(user, module):
         return jsonify({"success": False, "error": "MODULE_ACCESS_REQUIRED"}), 403
+    if user and module.id in prerequisite_locked_ids(user):
+        return jsonify({"success": False, "error": "MODULE_PREREQUISITES_INCOMPLETE"}), 403
     return None
 
 
 def _solved_ids_for_user(user: Users | None) -> set[int]:
-    if not user:
-        return set()
-
-    try:
-        if is_teams_mode and is_teams_mode() and get_current_team:
-            team = get_current_team()
-            if team:
-                return {
-                    cid
-                    for (cid,) in db.session.query(Solves.challenge_id)
-                    .filter(Solves.team_id == team.id)
-                    .all()
-                }
-    except Exception:
-        pass
-
-    return {
-        cid
-        for (cid,) in db.session.query(Solves.challenge_id)
-        .filter(Solves.user_id == user.id)
-        .all()
-    }
+    return set(account_solved_ids(user))
 
 
-def _module_to_dict(module: Module, user: Users | None):
-    has_access = user_has_module_access(user, module) if user else False
+def _module_to_dict(module: Module | ModuleSnapshot, user: Users | None):
+    unlocked = module.id not in prerequisite_locked_ids(user) if user else False
+    has_access = (user_has_module_access(user, module) and unlocked) if user else False
     progress = module_progress(user, module) if has_access else module_progress(None, module, challenge_ids=[])
     return {
         "id": module.id,
@@ -87,10 +86,12 @@ def _module_to_dict(module: Module, user: Users | None):
         "category": module.category,
         "banner_url": module.banner_url,
         "order": module.order,
-        "status": module.status.value if hasattr(module.status, "value") else str(module.status),
+        "status": module.status.value,
         "created_at": module.created_at.isoformat() if module.created_at else None,
         "updated_at": module.updated_at.isoformat() if module.updated_at else None,
         "has_access": has_access,
+        "prerequisites": list(module_prerequisites(module.id)),
+        "unlocked": unlocked,
         "progress": progress,
     }
 
@@ -103,16 +104,15 @@ def api_modules_list():
         return disabled
 
     user = get_current_user()
-    modules = ordered_modules_query().all()
-    # Locked modules are not visible via list for anyone.
-    modules = [m for m in modules if m.status != ModuleStatus.locked]
-
-    # Private modules should not appear in the general list unless the user has access.
+    modules_by_id = module_snapshots()
+    modules = [modules_by_id[mid] for mid in ordered_module_ids() if mid in modules_by_id]
+    # Locked modules are not visible via list for anyone; private modules
+    # should not appear in the general list unless the user has access.
     modules = [
         m
         for m in modules
-        if m.status == ModuleStatus.public
-        or (m.status == ModuleStatus.private and user_has_module_access(user, m))
+        if m.status_code == STATUS_PUBLIC
+        or (m.status_code == STATUS_PRIVATE and user_has_module_access(user, m))
     ]
 
     return jsonify({"success": True, "data": [_module_to_dict(m, user) for m in modules]})
@@ -126,7 +126,7 @@ def api_modules_get(module_id: int):
         return disabled
 
     user = get_current_user()
-    module = Module.query.get_or_404(module_id)
+    module = _snapshot_or_404(module_id)
     access_error = _module_access_error(module, user)
     if access_error:
         return access_error
@@ -154,7 +154,7 @@ def api_modules_join(module_id: int):
     if not code or not module.invite_code or code != module.invite_code:
         return jsonify({"success": False, "error": "INVALID_INVITE_CODE"}), 400
 
-    grant_access(module, user, granted_by_user=None)
+    grant_invite_access(module, user)
     db.session.commit()
 
     return jsonify({"success": True, "data": _module_to_dict(module, user)})
@@ -168,12 +168,12 @@ def api_modules_challenges(module_id: int):
         return disabled
 
     user = get_current_user()
-    module = Module.query.get_or_404(module_id)
+    module = _snapshot_or_404(module_id)
     access_error = _module_access_error(module, user)
     if access_error:
         return access_error
 
-    challenges = module_challenges_query(module, include_hidden=False)
+    challenges = module_challenge_summaries(module, include_hidden=False)
     if not challenges:
         return jsonify({"success": False, "error": "MODULE_EMPTY"}), 404
 
@@ -234,8 +234,12 @@ def api_modules_assign_challenge():
     if not Challenges.query.get(challenge_id):
         return jsonify({"success": False, "error": "CHALLENGE_NOT_FOUND"}), 404
 
+    affected = linked_module_ids([challenge_id])
+
     if not module_ids and "module_ids" in body:
         ModuleChallenge.query.filter_by(challenge_id=challenge_id).delete()
+        rescore_modules(affected)
+        invalidate_cache("links")
         db.session.commit()
         return jsonify({"success": True, "data": {"challenge_id": challenge_id, "module_ids": []}})
 
@@ -264,6 +268,8 @@ def api_modules_assign_challenge():
             continue
         db.session.add(ModuleChallenge(challenge_id=challenge_id, module_id=module_id))
 
+    rescore_modules(affected | set(module_ids))
+    invalidate_cache("links")
     db.session.commit()
     return jsonify({"success": True, "data": {"challenge_id": challenge_id, "module_ids": module_ids}})
 
@@ -288,6 +294,7 @@ def api_modules_unassign_challenge():
         return jsonify({"success": False, "error": "INVALID_PAYLOAD"}), 400
 
     module_id = body.get("module_id")
+    affected = linked_module_ids([challenge_id])
     if module_id in (None, ""):
         ModuleChallenge.query.filter_by(challenge_id=challenge_id).delete()
     else:
@@ -297,6 +304,8 @@ def api_modules_unassign_challenge():
             return jsonify({"success": False, "error": "INVALID_PAYLOAD"}), 400
         ModuleChallenge.query.filter_by(challenge_id=challenge_id, module_id=module_id).delete()
 
+    rescore_modules(affected)
+    invalidate_cache("links")
     db.session.commit()
     return jsonify({"success": True})
 
@@ -330,6 +339,75 @@ def api_modules_challenge_mapping(challenge_id: int):
     )
 
 
+SOLVES_PAGE_MAX = 100
+
+
+def _challenge_solves_response(challenge_id: int):
+    user = get_current_user()
+    if not is_admin(user):
+        if challenge_id not in challenge_module_index():
+            return jsonify({"success": False, "error": "CHALLENGE_NOT_FOUND"}), 404
+        if bitset_contains(account_hidden_challenges(user), challenge_id):
+            return _forbidden_response()
+
+        row = db.session.query(Challenges.state, Challenges.requirements).filter(Challenges.id == challenge_id).first()
+        if not row or row.state in ("hidden", "locked"):
+            return jsonify({"success": False, "error": "CHALLENGE_NOT_FOUND"}), 404
+        prereqs = set((row.requirements or {}).get("prerequisites", []))
+        if prereqs:
+            existing = {cid for (cid,) in db.session.query(Challenges.id).filter(Challenges.id.in_(prereqs)).all()}
+            if not account_solved_ids(user) >= prereqs & existing:
+                return _forbidden_response()
+
+    solves = challenge_solves(challenge_id)
+    total = len(solves)
+
+    top = request.args.get("top", type=int)
+    if top:
+        return jsonify({"success": True, "data": solves[: max(1, top)], "meta": {"total": total}})
+
+    page = request.args.get("page", type=int)
+    if not page:
+        return jsonify({"success": True, "data": solves, "meta": {"total": total}})
+
+    per_page = max(1, min(request.args.get("per_page", SOLVES_PAGE_MAX, type=int) or SOLVES_PAGE_MAX, SOLVES_PAGE_MAX))
+    pages = max(1, (total + per_page - 1) // per_page)
+    page = max(1, min(page, pages))
+    start = (page - 1) * per_page
+    return jsonify(
+        {
+            "success": True,
+            "data": solves[start : start + per_page],
+            "meta": {
+                "total": total,
+                "pagination": {
+                    "page": page,
+                    "next": page + 1 if page < pages else None,
+                    "prev": page - 1 if page > 1 else None,
+                    "pages": pages,
+                    "per_page": per_page,
+                    "total": total,
+                },
+            },
+        }
+    )
+
+
+@modules_api_bp.route("/challenge/<int:challenge_id>/solves", methods=["GET"])
+@authed_only
+def api_modules_challenge_solves(challenge_id: int):
+    """Cached solves list for module pages; `?top=N` or `?page=&per_page=` to slice it."""
+    disabled = _ensure_modules_enabled()
+    if disabled:
+        return disabled
+
+    # Same visibility/CTF-time/email gates as the core solves endpoint.
+    gate = resolve_compat_callable("challenge_solves_gate")
+    if gate is None:
+        return jsonify({"success": False, "error": "SOLVES_UNAVAILABLE"}), 404
+    return gate(_challenge_solves_response)(challenge_id)
+
+
 @modules_api_bp.route("/bulk/assign", methods=["POST"])
 @authed_only
 @csrf_protect
@@ -393,9 +471,12 @@ def api_modules_bulk_assign_challenges():
     from .models import ModuleChallenge
 
     if module_id is None:
+        affected = linked_module_ids(existing_ids)
         ModuleChallenge.query.filter(ModuleChallenge.challenge_id.in_(list(existing_ids))).delete(
             synchronize_session=False
         )
+        rescore_modules(affected)
+        invalidate_cache("links")
         db.session.commit()
         return jsonify({"success": True, "data": {"updated": len(existing_ids), "module_id": None}})
 
@@ -411,6 +492,8 @@ def api_modules_bulk_assign_challenges():
             continue
         db.session.add(ModuleChallenge(challenge_id=cid, module_id=module_id))
 
+    rescore_modules([module_id])
+    invalidate_cache("links")
     db.session.commit()
     return jsonify({"success": True, "data": {"updated": len(existing_ids), "module_id": module_id}})
 
@@ -423,9 +506,76 @@ def api_modules_progress(module_id: int):
         return disabled
 
     user = get_current_user()
-    module = Module.query.get_or_404(module_id)
+    module = _snapshot_or_404(module_id)
     access_error = _module_access_error(module, user)
     if access_error:
         return access_error
 
     return jsonify({"success": True, "data": module_progress(user, module)})
+
+
+def _module_scoreboard_response(module_id: int):
+    user = get_current_user()
+    module = _snapshot_or_404(module_id)
+    access_error = _module_access_error(module, user)
+    if access_error:
+        return access_error
+
+    top = request.args.get("top", type=int)
+    return jsonify({"success": True, "data": module_scoreboard(module, top)})
+
+
+@modules_api_bp.route("/<int:module_id>/scoreboard", methods=["GET"])
+@authed_only
+def api_modules_scoreboard(module_id: int):
+    disabled = _ensure_modules_enabled()
+    if disabled:
+        return disabled
+
+    # Same score/account visibility gates as the core scoreboard.
+    gate = resolve_compat_callable("scoreboard_gate")
+    if gate is None:
+        return jsonify({"success": False, "error": "SCOREBOARD_UNAVAILABLE"}), 404
+    return gate(_module_scoreboard_response)(module_id)
+
+
+PROGRESS_BATCH_LIMIT = 500
+
+
+def _parse_module_ids(raw: str | None) -> list[int]:
+    ids: list[int] = []
+    for part in (raw or "").split(","):
+        try:
+            module_id = int(part.strip())
+        except Exception:
+            continue
+        if module_id > 0 and module_id not in ids:
+            ids.append(module_id)
+    return ids[:PROGRESS_BATCH_LIMIT]
+
+
+@modules_api_bp.route("/progress", methods=["GET"])
+@authed_only
+def api_modules_progress_batch():
+    """Progress for `?ids=1,2,3`, or for every accessible module with `ids=all` / no ids."""
+    disabled = _ensure_modules_enabled()
+    if disabled:
+        return disabled
+
+    user = get_current_user()
+    raw_ids = (request.args.get("ids") or "").strip()
+    if not raw_ids or raw_ids.lower() == "all":
+        module_ids = None
+    else:
+        module_ids = _parse_module_ids(raw_ids)
+        if not module_ids:
+            return jsonify({"success": True, "data": {}})
+
+    progress = modules_progress(user, module_ids)
+    locked_ids = prerequisite_locked_ids(user)
+    return jsonify(
+        {
+            "success": True,
+            "data": {str(module_id): p for module_id, p in progress.items() if module_id not in locked_ids},
+        }
+    )
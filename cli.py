@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import click
+from flask.cli import AppGroup
+
+modules_cli = AppGroup("modules", help="CTFd Modules maintenance commands.")
+
+
+@modules_cli.command("sweep-access")
+@click.option("--batch-size", default=500, show_default=True, help="Rows deleted per transaction.")
+def sweep_access_command(batch_size: int):
+    """Delete expired module access grants."""
+
+    from .utils import sweep_expired_access
+
+    stats = sweep_expired_access(batch_size=batch_size)
+    click.echo(
+        f"Deleted {stats['deleted']} expired grants for {stats['users']} users in {stats['batches']} batches, "
+        f"{stats['team_grants']} team grants and {stats['group_grants']} group grants"
+    )
+
+
+@modules_cli.command("warm-cache")
+def warm_cache_command():
+    """Rebuild module caches and ask running workers to do the same."""
+
+    from .utils import request_cache_warmup, warm_caches
+
+    results = warm_caches()
+    request_cache_warmup()
+    for name, ok in sorted(results.items()):
+        click.echo(f"{name}: {'ok' if ok else 'failed'}")
+
+
+@modules_cli.command("rebuild-scores")
+@click.option("--chunk-size", default=50000, show_default=True, help="Solves read per query.")
+def rebuild_scores_command(chunk_size: int):
+    """Recompute every per-module scoreboard row from solves."""
+
+    from .utils import rebuild_module_scores
+
+    stats = rebuild_module_scores(chunk_size=chunk_size)
+    if stats is None:
+        click.echo("A rebuild is already running; it will run once more to include this request")
+        return
+    click.echo(f"Rebuilt {stats['rows']} {stats['account_type']} score rows from {stats['solves']} solves")
+
+
+def register_cli(app):
+    try:
+        if "modules" not in app.cli.commands:
+            app.cli.add_command(modules_cli)
+    except Exception:
+        pass
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from functools import wraps
 
 from flask import current_app, request, session
@@ -54,7 +55,7 @@ def render_markdown(text: str) -> str:
         return text.replace("\n", "<br>")
 
 
-def _get_validate_csrf():
+def _find_validate_csrf():
     """Try to locate CTFd's validate_csrf across versions."""
 
     try:
@@ -76,7 +77,7 @@ def _get_validate_csrf():
     return None
 
 
-def _get_generate_nonce():
+def _find_generate_nonce():
     """Try to locate CTFd's nonce generator across versions."""
 
     candidates = [
@@ -119,6 +120,140 @@ def _get_generate_nonce():
     return None
 
 
+def _find_upstream_csrf_protect():
+    """Try to locate CTFd's csrf_protect decorator."""
+
+    try:
+        from CTFd.utils import decorators as ctfd_decorators  # type: ignore
+
+        upstream = getattr(ctfd_decorators, "csrf_protect", None)
+        if callable(upstream):
+            return upstream
+    except Exception:
+        pass
+
+    return None
+
+
+def _find_challenge_board_gate():
+    """Compose the decorators CTFd puts on `GET /api/v1/challenges`.
+
+    Returns None when any of them is missing, so callers fall back to the
+    core endpoint instead of serving the board with weaker checks.
+    """
+
+    try:
+        from CTFd.utils.decorators import during_ctf_time_only, require_verified_emails  # type: ignore
+        from CTFd.utils.decorators.visibility import check_challenge_visibility  # type: ignore
+    except Exception:
+        return None
+
+    def gate(fn):
+        return check_challenge_visibility(during_ctf_time_only(require_verified_emails(fn)))
+
+    return gate
+
+
+def _find_challenge_solves_gate():
+    """Compose the decorators CTFd puts on `GET /api/v1/challenges/<id>/solves`."""
+
+    try:
+        from CTFd.utils.decorators import during_ctf_time_only, require_verified_emails  # type: ignore
+        from CTFd.utils.decorators.visibility import (  # type: ignore
+            check_challenge_visibility,
+            check_score_visibility,
+        )
+    except Exception:
+        return None
+
+    def gate(fn):
+        return check_challenge_visibility(check_score_visibility(during_ctf_time_only(require_verified_emails(fn))))
+
+    return gate
+
+
+def _find_scoreboard_gate():
+    """Compose the decorators CTFd puts on `GET /api/v1/scoreboard`."""
+
+    try:
+        from CTFd.utils.decorators.visibility import (  # type: ignore
+            check_account_visibility,
+            check_score_visibility,
+        )
+    except Exception:
+        return None
+
+    def gate(fn):
+        return check_account_visibility(check_score_visibility(fn))
+
+    return gate
+
+
+# Registry of compat lookups. Each resolver runs at most once per process; the
+# result (including a miss) is memoized so request paths never repeat the
+# module walk. Other plugins or deployments can swap a resolver (or pin a
+# callable directly) before the first lookup happens.
+_COMPAT_RESOLVERS: dict[str, Callable[[], Callable | None]] = {
+    "validate_csrf": _find_validate_csrf,
+    "generate_nonce": _find_generate_nonce,
+    "csrf_protect": _find_upstream_csrf_protect,
+    "challenge_board_gate": _find_challenge_board_gate,
+    "challenge_solves_gate": _find_challenge_solves_gate,
+    "scoreboard_gate": _find_scoreboard_gate,
+}
+_COMPAT_RESOLVED: dict[str, Callable | None] = {}
+
+
+def register_compat_resolver(name: str, resolver: Callable[[], Callable | None]) -> None:
+    """Register (or replace) the lookup used for a compat callable."""
+
+    _COMPAT_RESOLVERS[name] = resolver
+    _COMPAT_RESOLVED.pop(name, None)
+
+
+def register_compat_callable(name: str, fn: Callable | None) -> None:
+    """Pin a compat callable directly, bypassing discovery."""
+
+    _COMPAT_RESOLVED[name] = fn
+
+
+def resolve_compat_callable(name: str) -> Callable | None:
+    try:
+        return _COMPAT_RESOLVED[name]
+    except KeyError:
+        pass
+
+    resolver = _COMPAT_RESOLVERS.get(name)
+    fn = None
+    if resolver is not None:
+        try:
+            fn = resolver()
+        except Exception:
+            fn = None
+
+    _COMPAT_RESOLVED[name] = fn
+    return fn
+
+
+def reset_compat_callables() -> None:
+    _COMPAT_RESOLVED.clear()
+
+
+def warm_compat_callables() -> None:
+    """Resolve every registered compat callable once (called from plugin load)."""
+
+    for name in list(_COMPAT_RESOLVERS):
+        resolve_compat_callable(name)
+
+
+def _get_validate_csrf():
+    return resolve_compat_callable("validate_csrf")
+
+
+def _get_generate_nonce():
+    return resolve_compat_callable("generate_nonce")
+
+
 def _nonce_from_session() -> str:
     # Different CTFd builds store CSRF/nonce under different keys.
     for key in ("nonce", "csrf_nonce", "csrf_token", "csrf", "_csrf_token"):
@@ -158,14 +293,12 @@ def csrf_protect(fn):
     """
 
     # Prefer upstream decorator if present
-    try:
-        from CTFd.utils import decorators as ctfd_decorators  # type: ignore
-
-        upstream = getattr(ctfd_decorators, "csrf_protect", None)
-        if upstream:
+    upstream = resolve_compat_callable("csrf_protect")
+    if upstream:
+        try:
             return upstream(fn)
-    except Exception:
-        pass
+        except Exception:
+            pass
 
     validate_csrf = _get_validate_csrf()
 
@@ -1,16 +1,37 @@
 from __future__ import annotations
 
+import functools
 import json
 import re
 
-from flask import abort, g, redirect, request
+from flask import abort, g, jsonify, redirect, request
 from werkzeug.exceptions import HTTPException
 
 from CTFd.utils.user import get_current_user
 
-from .compat import ctfd_generate_nonce
-from .models import Module, ModuleAccess, ModuleChallenge, ModuleStatus
-from .utils import get_settings, get_ui_theme, modules_enabled, user_has_module_access
+from .compat import ctfd_generate_nonce, resolve_compat_callable
+from .models import Module, ModuleChallenge
+from .utils import (
+    bump_cache_generation,
+    challenge_module_index,
+    challenge_solves_namespace,
+    invalidate_cache,
+    is_admin,
+    linked_module_ids,
+    module_challenge_ids,
+    modules_enabled,
+    record_module_solve,
+    rescore_modules,
+    settings_snapshot,
+    solve_account,
+    solves_namespace,
+)
+from .utils.assets import asset_url
+from .utils.board import MODULE_BOARD_ARGS, invalidate_account_solve_lists, module_board
+from .utils.cache import warm_caches_if_requested
+from .utils.schedule import check_module_schedule, schedule_check_applies
+from .utils.scores import rebuild_module_scores_in_background
+from .utils.visibility import account_hidden_challenges, bitset_contains
 
 
 def _challenge_id(item):
@@ -47,85 +68,8 @@ def _set_json_response_data(response, payload):
     return response
 
 
-def _modules_for_challenge(challenge_id):
-    from CTFd.models import db  # type: ignore
-
-    return (
-        db.session.query(Module)
-        .join(ModuleChallenge, ModuleChallenge.module_id == Module.id)
-        .filter(ModuleChallenge.challenge_id == challenge_id)
-        .all()
-    )
-
-
-def _challenge_module_map():
-    from CTFd.models import db  # type: ignore
-
-    rows = (
-        db.session.query(ModuleChallenge.challenge_id, Module.id, Module.status)
-        .join(Module, Module.id == ModuleChallenge.module_id)
-        .all()
-    )
-    out = {}
-    for cid, mid, status in rows:
-        out.setdefault(cid, []).append((mid, status))
-    return out
-
-
-def _private_module_access_map(private_module_ids):
-    user = None
-    try:
-        user = get_current_user()
-    except Exception:
-        user = None
-
-    if user is None or not hasattr(user, "id") or not private_module_ids:
-        return set()
-
-    from CTFd.models import db  # type: ignore
-
-    return {
-        module_id
-        for (module_id,) in (
-            db.session.query(ModuleAccess.module_id)
-            .filter(ModuleAccess.user_id == user.id)
-            .filter(ModuleAccess.module_id.in_(list(private_module_ids)))
-            .all()
-        )
-    }
-
-
-def _module_challenge_ids(module_id):
-    from CTFd.models import db  # type: ignore
-
-    return {
-        cid
-        for (cid,) in (
-            db.session.query(ModuleChallenge.challenge_id)
-            .filter(ModuleChallenge.module_id == module_id)
-            .all()
-        )
-    }
-
-
 def _assigned_challenge_ids():
-    from CTFd.models import db  # type: ignore
-
-    return {cid for (cid,) in db.session.query(ModuleChallenge.challenge_id).all()}
-
-
-def _challenge_accessible_via_modules(challenge_modules, allowed_private_module_ids):
-    if not challenge_modules:
-        return True
-
-    for module_id, status in challenge_modules:
-        status_value = status.value if hasattr(status, "value") else str(status)
-        if status_value == ModuleStatus.public.value:
-            return True
-        if status_value == ModuleStatus.private.value and module_id in allowed_private_module_ids:
-            return True
-
-    return False
+    return challenge_module_index()
 
 
 def _parse_module_ids_payload(raw):
@@ -225,26 +169,106 @@ def _apply_challenge_module_ids(challenge_id: int, module_ids: list[int]):
         normalized.append(value)
 
     if normalized:
+        # Checked against the table, not the (possibly stale) snapshot cache:
+        # a module deleted moments ago must not get new links.
         existing = {
             mid
             for (mid,) in db.session.query(Module.id).filter(Module.id.in_(normalized)).all()
         }
         normalized = [mid for mid in normalized if mid in existing]
 
+    affected = linked_module_ids([challenge_id]) | set(normalized)
     ModuleChallenge.query.filter_by(challenge_id=challenge_id).delete()
     for module_id in normalized:
         db.session.add(ModuleChallenge(challenge_id=challenge_id, module_id=module_id))
+    rescore_modules(affected)
+    invalidate_cache("links")
     db.session.commit()
 
 
+def _scoped_board_module_id():
+    """The module id of a `/api/v1/challenges?ctfd_modules=1&module_id=N` request, else None."""
+    if not modules_enabled():
+        return None
+    if request.method != "GET":
+        return None
+    if (request.args.get("ctfd_modules") or "").strip() != "1":
+        return None
+    if set(request.args) - MODULE_BOARD_ARGS:
+        return None
+    module_id = int((request.args.get("module_id") or "").strip())
+    return module_id if module_id > 0 else None
+
+
+def _override_challenge_list_view(app):
+    """Answer scoped `/api/v1/challenges` requests from the module's challenges only.
+
+    Wraps the core view rather than returning early from `before_request`, so
+    every other plugin's `before_request` hooks still run first. The scoped
+    board sits behind the same CTFd gates as the core endpoint; when they
+    cannot be resolved, or the request carries other arguments, the core view
+    answers and the after_request filter trims the full board as before.
+    """
+    try:
+        endpoint, _ = app.url_map.bind("").match("/api/v1/challenges", method="GET")
+        core_view = app.view_functions[endpoint]
+    except Exception:
+        return
+
+    @functools.wraps(core_view)
+    def ctfd_modules_challenge_list(*args, **kwargs):
+        try:
+            module_id = _scoped_board_module_id()
+            gate = resolve_compat_callable("challenge_board_gate") if module_id else None
+        except Exception:
+            gate = None
+        if gate is None:
+            return core_view(*args, **kwargs)
+
+        def _serve():
+            from CTFd.utils.config import is_teams_mode  # type: ignore
+            from CTFd.utils.user import get_current_team  # type: ignore
+
+            user = get_current_user()
+            # Same team requirement as the core listing.
+            if user and not is_admin(user) and is_teams_mode() and get_current_team() is None:
+                abort(403)
+            data = module_board(module_id, user, account_hidden_challenges(user))
+            g.ctfd_modules_board_scoped = True
+            return jsonify({"success": True, "data": data})
+
+        try:
+            return gate(_serve)()
+        except HTTPException:
+            raise
+        except Exception:
+            g.ctfd_modules_board_scoped = False
+            return core_view(*args, **kwargs)
+
+    app.view_functions[endpoint] = ctfd_modules_challenge_list
+
+
 def register_plugin_runtime_hooks(app):
     @app.context_processor
     def ctfd_modules_inject_nonce():
         return {
             "ctfd_modules_nonce": ctfd_generate_nonce,
-            "ctfd_modules_ui_theme": get_ui_theme(),
+            "ctfd_modules_asset": asset_url,
+            "ctfd_modules_ui_theme": settings_snapshot().ui_theme,
         }
 
+    @app.before_request
+    def ctfd_modules_apply_module_schedule():
+        try:
+            if not schedule_check_applies(request.path or ""):
+                return None
+            warm_caches_if_requested(app)
+            check_module_schedule()
+        except Exception:
+            return None
+
+        return None
+
     @app.before_request
     def ctfd_modules_stage_challenge_write_payload():
         try:
@@ -286,8 +310,7 @@ def register_plugin_runtime_hooks(app):
             if not modules_enabled():
                 return None
 
-            settings = get_settings(create=True)
-            hide = bool(getattr(settings, "hide_challenges_page", False))
+            hide = settings_snapshot().hide_challenges_page
             if hide and getattr(request, "endpoint", None) == "challenges.listing":
                 return redirect("/modules")
         except Exception:
@@ -319,19 +342,10 @@ def register_plugin_runtime_hooks(app):
             if not challenge_id:
                 return None
 
-            modules = _modules_for_challenge(challenge_id)
-            if not modules:
+            if challenge_id not in challenge_module_index():
                 return None
 
-            user = get_current_user()
-            allowed_private_ids = set()
-            for module in modules:
-                status_value = module.status.value if hasattr(module.status, "value") else str(module.status)
-                if status_value == ModuleStatus.private.value and user_has_module_access(user, module):
-                    allowed_private_ids.add(module.id)
-
-            challenge_modules = [(module.id, module.status) for module in modules]
-            if not _challenge_accessible_via_modules(challenge_modules, allowed_private_ids):
+            if bitset_contains(account_hidden_challenges(get_current_user()), challenge_id):
                 abort(403)
         except HTTPException:
             raise
@@ -340,6 +354,8 @@ def register_plugin_runtime_hooks(app):
 
         return None
 
+    _override_challenge_list_view(app)
+
     @app.after_request
     def ctfd_modules_apply_modules_on_challenge_write(response):
         try:
@@ -380,6 +396,78 @@ def register_plugin_runtime_hooks(app):
 
         return response
 
+    @app.after_request
+    def ctfd_modules_invalidate_on_challenge_write(response):
+        try:
+            method = (request.method or "").upper()
+            path = request.path or ""
+            if method not in {"POST", "PUT", "PATCH", "DELETE"} or not path.startswith("/api/v1/challenges"):
+                return response
+            if path == "/api/v1/challenges/attempt":
+                return response
+            if int(getattr(response, "status_code", 500) or 500) >= 400:
+                return response
+
+            user = get_current_user()
+            if not user or getattr(user, "type", None) != "admin":
+                return response
+
+            # Core already committed: value/state/deletion changes feed module aggregates.
+            update_match = re.match(r"^/api/v1/challenges/(\d+)$", path)
+            if update_match:
+                # Read the links before the bump: a deleted challenge has none left.
+                linked = challenge_module_index().modules_of(int(update_match.group(1)))
+                if linked:
+                    from CTFd.models import db  # type: ignore
+
+                    rescore_modules(linked)
+                    db.session.commit()
+            bump_cache_generation("challenges", "challenge_values", "links")
+        except Exception:
+            return response
+
+        return response
+
+    @app.after_request
+    def ctfd_modules_invalidate_on_solve(response):
+        try:
+            method = (request.method or "").upper()
+            path = request.path or ""
+            if method == "POST" and path == "/api/v1/challenges/attempt":
+                if int(getattr(response, "status_code", 500) or 500) != 200:
+                    return response
+                payload = json.loads(response.get_data(as_text=True) or "{}")
+                data = payload.get("data") if isinstance(payload, dict) else None
+                if not isinstance(data, dict) or data.get("status") != "correct":
+                    return response
+                account = solve_account(get_current_user())
+                if account is not None:
+                    bump_cache_generation(solves_namespace(account))
+                    body = request.get_json(silent=True) or request.form or {}
+                    try:
+                        challenge_id = int(body.get("challenge_id"))
+                    except Exception:
+                        challenge_id = None
+                    if challenge_id:
+                        bump_cache_generation(challenge_solves_namespace(challenge_id))
+                        record_module_solve(account, challenge_id)
+            elif method == "PATCH" and path in ("/api/v1/users/me", "/api/v1/teams/me"):
+                # Self-service renames: cached solves lists show the account name.
+                if int(getattr(response, "status_code", 500) or 500) < 400:
+                    invalidate_account_solve_lists(solve_account(get_current_user()))
+            elif method in {"POST", "PATCH", "DELETE"} and path.startswith(("/api/v1/submissions", "/api/v1/users", "/api/v1/teams")):
+                # Admin edits to submissions or accounts can add/remove solves for anyone.
+                if int(getattr(response, "status_code", 500) or 500) < 400:
+                    user = get_current_user()
+                    if user and getattr(user, "type", None) == "admin":
+                        bump_cache_generation("solves")
+                        if path.startswith("/api/v1/submissions") or method == "DELETE":
+                            rebuild_module_scores_in_background(app)
+        except Exception:
+            return response
+
+        return response
+
     @app.after_request
     def ctfd_modules_filter_challenges_api(response):
         try:
@@ -387,6 +475,9 @@ def register_plugin_runtime_hooks(app):
                 return response
             if request.method != "GET" or request.path != "/api/v1/challenges":
                 return response
+            if getattr(g, "ctfd_modules_board_scoped", False):
+                # Already scoped and access-filtered by the module board view.
+                return response
             if getattr(response, "status_code", 200) != 200:
                 return response
 
@@ -402,27 +493,12 @@ def register_plugin_runtime_hooks(app):
             return response
 
         try:
-            challenge_to_modules = _challenge_module_map()
-            private_module_ids = {
-                module_id
-                for challenge_modules in challenge_to_modules.values()
-                for (module_id, status) in challenge_modules
-                if (status.value if hasattr(status, "value") else str(status)) == ModuleStatus.private.value
-            }
-            allowed_private_module_ids = _private_module_access_map(private_module_ids)
-
+            # One precomputed bitset per access profile: each row is a byte lookup.
+            hidden = account_hidden_challenges(get_current_user())
             secured = []
             for challenge in data:
                 challenge_id = _challenge_id(challenge)
-                if challenge_id is None:
-                    continue
-
-                if challenge_id not in challenge_to_modules:
-                    secured.append(challenge)
-                    continue
-
-                challenge_modules = challenge_to_modules[challenge_id]
-                if not _challenge_accessible_via_modules(challenge_modules, allowed_private_module_ids):
+                if challenge_id is None or bitset_contains(hidden, challenge_id):
                     continue
                 secured.append(challenge)
 
@@ -441,7 +517,7 @@ def register_plugin_runtime_hooks(app):
                         module_id = None
 
                 if module_id:
-                    allowed_ids = _module_challenge_ids(module_id)
+                    allowed_ids = module_challenge_ids(module_id)
                     data_container[data_key] = [
                         challenge
                         for challenge in (data_container.get(data_key) or [])
@@ -459,8 +535,7 @@ def register_plugin_runtime_hooks(app):
                 return response
 
         try:
-            settings = get_settings(create=True)
-            mode = (getattr(settings, "challenges_board_mode", "all") or "all").strip().lower()
+            mode = settings_snapshot().challenges_board_mode
             if mode in ("", "all", "none"):
                 return _set_json_response_data(response, payload)
 
@@ -22,6 +22,11 @@ class ModuleCategory(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # ordered_categories_query(): ORDER BY order, name
+        db.Index("ix_module_categories_order_name", "order", "name"),
+    )
+
 
 class Module(db.Model):
     __tablename__ = "modules"
@@ -37,9 +42,23 @@ class Module(db.Model):
 
     prerequisites = db.Column(db.Text, nullable=True)
 
+    # Scheduled transitions (UTC): open_at -> open_status, close_at -> locked.
+    # open_status is public or private; NULL (rows from before the column
+    # existed) keeps a private module private and opens anything else as public.
+    open_at = db.Column(db.DateTime, nullable=True)
+    open_status = db.Column(db.Enum(ModuleStatus), nullable=True)
+    close_at = db.Column(db.DateTime, nullable=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # ordered_module_tree(): SELECT id, category ... ORDER BY order, name,
+        # answered from the index alone. module_ordering() sorts on a CASE
+        # expression first, which no index can serve.
+        db.Index("ix_modules_order_name", "order", "name", "category"),
+    )
+
 
 class ModuleAccess(db.Model):
     __tablename__ = "module_access"
@@ -51,6 +70,78 @@ class ModuleAccess(db.Model):
     granted_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        # Access checks (WHERE user_id = ? AND module_id IN (...)) use the PK.
+        # Admin access list / module delete: WHERE module_id = ?
+        db.Index("ix_module_access_module_user", "module_id", "user_id"),
+        # Expiry sweeper: WHERE expires_at <= now
+        db.Index("ix_module_access_expires_at", "expires_at"),
+    )
+
+
+class ModuleTeamAccess(db.Model):
+    """Team-scoped grant: in team mode one row covers every team member."""
+
+    __tablename__ = "module_team_access"
+
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True)
+    module_id = db.Column(db.Integer, db.ForeignKey("modules.id", ondelete="CASCADE"), primary_key=True)
+
+    granted_by = db.Column(db.Integer, db.ForeignKey("users.id"))
+    granted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # Admin access list / module delete: WHERE module_id = ?
+        db.Index("ix_module_team_access_module_team", "module_id", "team_id"),
+        # Expiry sweeper: WHERE expires_at <= now
+        db.Index("ix_module_team_access_expires_at", "expires_at"),
+    )
+
+
+class ModuleGroup(db.Model):
+    """A named cohort of users that can be granted private modules as a whole."""
+
+    __tablename__ = "module_groups"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), unique=True, nullable=False, index=True)
+    description = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ModuleGroupMember(db.Model):
+    __tablename__ = "module_group_members"
+
+    group_id = db.Column(db.Integer, db.ForeignKey("module_groups.id", ondelete="CASCADE"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+    added_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # user_group_ids(): WHERE user_id = ?
+        db.Index("ix_module_group_members_user_group", "user_id", "group_id"),
+    )
+
+
+class ModuleGroupAccess(db.Model):
+    """Group -> private module grant: one row covers every member."""
+
+    __tablename__ = "module_group_access"
+
+    group_id = db.Column(db.Integer, db.ForeignKey("module_groups.id", ondelete="CASCADE"), primary_key=True)
+    module_id = db.Column(db.Integer, db.ForeignKey("modules.id", ondelete="CASCADE"), primary_key=True)
+
+    granted_by = db.Column(db.Integer, db.ForeignKey("users.id"))
+    granted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # Module edit page / module delete: WHERE module_id = ?
+        db.Index("ix_module_group_access_module_group", "module_id", "group_id"),
+    )
+
 
 class ModuleChallenge(db.Model):
     """Link table: many-to-many module <-> challenge."""
@@ -61,6 +152,31 @@ class ModuleChallenge(db.Model):
     module_id = db.Column(db.Integer, db.ForeignKey("modules.id", ondelete="CASCADE"), primary_key=True, index=True)
 
 
+class ModuleScore(db.Model):
+    """Per-(account, module) totals backing the module scoreboards.
+
+    The solver's rows are refreshed on correct attempts, and the affected
+    modules are recomputed when challenge links or values change. Every
+    writer locks the module rows first (see `utils.scores._lock_modules`).
+    """
+
+    __tablename__ = "module_scores"
+
+    module_id = db.Column(db.Integer, db.ForeignKey("modules.id", ondelete="CASCADE"), primary_key=True)
+    account_type = db.Column(db.String(8), primary_key=True)
+    account_id = db.Column(db.Integer, primary_key=True)
+
+    points = db.Column(db.Integer, default=0, nullable=False)
+    solves = db.Column(db.Integer, default=0, nullable=False)
+    last_solve_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # module_scoreboard(): WHERE module_id = ? AND account_type = ?
+        # ORDER BY points DESC, last_solve_at  LIMIT N
+        db.Index("ix_module_scores_module_points", "module_id", "account_type", "points", "last_solve_at"),
+    )
+
+
 class ModuleSettings(db.Model):
     __tablename__ = "ctfd_modules_settings"
 
@@ -83,8 +199,96 @@ class ModuleSettings(db.Model):
 
 def db_init(app):
     with app.app_context():
+        try:
+            had_scores = ModuleScore.__tablename__ in set(db.inspect(db.engine).get_table_names())
+        except Exception:
+            had_scores = True
         db.create_all()
+        _migrate_columns()
+        _migrate_indexes()
         _migrate_legacy_module_challenges()
+        if not had_scores:
+            _seed_module_scores()
+
+
+def _migrate_columns():
+    """Add nullable columns introduced after the initial release.
+
+    Only nullable columns without server defaults are handled, which keeps the
+    generated `ALTER TABLE ... ADD COLUMN` portable across SQLite/MySQL/Postgres.
+    """
+    try:
+        inspector = db.inspect(db.engine)
+        tables = set(inspector.get_table_names())
+        dialect = db.engine.dialect
+        quote = dialect.identifier_preparer.quote
+    except Exception:
+        return
+
+    for model in (ModuleCategory, Module, ModuleAccess, ModuleChallenge, ModuleSettings):
+        table = model.__table__
+        if table.name not in tables:
+            continue
+
+        try:
+            existing = {col.get("name") for col in inspector.get_columns(table.name)}
+        except Exception:
+            continue
+
+        for column in table.columns:
+            if column.name in existing or not column.nullable or column.server_default is not None:
+                continue
+            ddl = "ALTER TABLE {} ADD COLUMN {} {}".format(
+                quote(table.name),
+                quote(column.name),
+                column.type.compile(dialect=dialect),
+            )
+            try:
+                db.session.execute(db.text(ddl))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+
+
+def _migrate_indexes():
+    """Create indexes declared on plugin tables that an older install is missing.
+
+    `create_all()` only creates missing tables, so indexes added in later
+    releases have to be created explicitly.
+    """
+    try:
+        inspector = db.inspect(db.engine)
+        tables = set(inspector.get_table_names())
+    except Exception:
+        return
+
+    for model in (
+        ModuleCategory,
+        Module,
+        ModuleAccess,
+        ModuleTeamAccess,
+        ModuleGroupMember,
+        ModuleGroupAccess,
+        ModuleChallenge,
+        ModuleScore,
+    ):
+        table = model.__table__
+        if table.name not in tables:
+            continue
+
+        try:
+            existing = {ix.get("name") for ix in inspector.get_indexes(table.name)}
+        except Exception:
+            continue
+
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                index.create(bind=db.engine)
+            except Exception:
+                # Already present under the same name (e.g. MySQL FK index) or unsupported.
+                pass
 
 
 def _migrate_legacy_module_challenges():
@@ -118,3 +322,13 @@ def _migrate_legacy_module_challenges():
             db.session.commit()
     except Exception:
         db.session.rollback()
+
+
+def _seed_module_scores():
+    """Fill the freshly created `module_scores` table from existing solves."""
+    try:
+        from .utils.scores import rebuild_module_scores
+
+        rebuild_module_scores()
+    except Exception:
+        db.session.rollback()
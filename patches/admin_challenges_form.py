@@ -16,7 +16,8 @@ _OLD_FIELD_RE = re.compile(
 )
 
 _OLD_SCRIPT_RE = re.compile(
-  r"\s*<script src=\"/plugins/ctfd_modules/static/js/admin_challenges_patch\.js[^\"]*\"></script>\s*",
+  r"\s*<script src=\"(?:/plugins/ctfd_modules/static/js/admin_challenges_patch\.js[^\"]*"
+  r"|\{\{\s*ctfd_modules_asset\(\s*['\"]js/admin_challenges_patch\.js['\"]\s*\)\s*\}\})\"></script>\s*",
   flags=re.IGNORECASE,
 )
 
@@ -47,7 +48,7 @@ def patch_admin_challenge_form_templates(app) -> dict:
     </select>
   </div>
 
-  <script src=\"/plugins/ctfd_modules/static/js/admin_challenges_patch.js\"></script>
+  <script src=\"{{ ctfd_modules_asset('js/admin_challenges_patch.js') }}\"></script>
 """
 
   def inject_module_field(src: str) -> str:
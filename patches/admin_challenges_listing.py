@@ -10,7 +10,8 @@ _OLD_BULK_TEMPLATE_RE = re.compile(
 )
 
 _OLD_PATCH_SCRIPT_RE = re.compile(
-    r"\s*<script src=\"/plugins/ctfd_modules/static/js/admin_challenges_patch\.js[^\"]*\"></script>\s*",
+    r"\s*<script src=\"(?:/plugins/ctfd_modules/static/js/admin_challenges_patch\.js[^\"]*"
+    r"|\{\{\s*ctfd_modules_asset\(\s*['\"]js/admin_challenges_patch\.js['\"]\s*\)\s*\}\})\"></script>\s*",
     flags=re.IGNORECASE,
 )
 
@@ -54,7 +55,7 @@ def patch_admin_challenge_listing_templates(app) -> dict:
 <template id=\"ctfd-modules-bulk-module-options\">
   {% for m in (ctfd_modules_all_modules() or []) %}<option value=\"{{ m.id }}\">{{ m.name|e }}</option>{% endfor %}
 </template>
-<script src=\"/plugins/ctfd_modules/static/js/admin_challenges_patch.js\"></script>
+<script src=\"{{ ctfd_modules_asset('js/admin_challenges_patch.js') }}\"></script>
 """
 
             def _after_table(m):
@@ -348,7 +348,48 @@ function updateSolves(challengeId) {
     return null;
   }
 
+  // Solves lists fetched from the plugin endpoint, memoized per challenge for
+  // this page; dropped again after the current account solves the challenge.
+  var solvesMemo = {};
+
+  function forgetSolves(challengeId) {
+    try {
+      delete solvesMemo[solvesKey(challengeId)];
+    } catch (_) { }
+  }
+
+  function fetchModuleSolves(challengeId) {
+    var key = solvesKey(challengeId);
+    if (!solvesMemo[key]) {
+      var pending = fetch('/api/v1/modules/challenge/' + encodeURIComponent(key) + '/solves', {
+        method: 'GET',
+        credentials: 'same-origin',
+        headers: { Accept: 'application/json' },
+      })
+        .then(function (resp) {
+          return resp.ok ? resp.json() : null;
+        })
+        .then(function (json) {
+          return json && json.success !== false ? extractSolvesList(json) : null;
+        })
+        .catch(function () {
+          return null;
+        });
+      solvesMemo[key] = pending;
+      // Do not memoize failures: the next open falls back and retries.
+      pending.then(function (list) {
+        if (!list && solvesMemo[key] === pending) delete solvesMemo[key];
+      });
+    }
+    return solvesMemo[key];
+  }
+
   async function fetchSolvesList(challengeId) {
+    try {
+      var fromPlugin = await fetchModuleSolves(challengeId);
+      if (fromPlugin) return { ok: true, list: fromPlugin };
+    } catch (_) { }
+
     try {
       if (window.CTFd && window.CTFd.api && typeof window.CTFd.api.get_challenge_solves === 'function') {
         var apiResp = await window.CTFd.api.get_challenge_solves({ challengeId: challengeId });
@@ -686,6 +727,7 @@ function updateSolves(challengeId) {
       var message = (json.data && json.data.message) || json.message || '';
       if (status === 'correct') {
         setResult(modal, 'success', message || 'Correct');
+        forgetSolves(challengeId);
         updateSolves(challengeId);
         // Refresh the board/list, but don't immediately reload the modal view,
         // otherwise the result UI disappears due to x-html re-render.
@@ -0,0 +1,62 @@
+(function () {
+  "use strict";
+
+  var rows = document.querySelectorAll("[data-ctfd-modules-progress]");
+  if (!rows.length) return;
+
+  var ids = [];
+  rows.forEach(function (row) {
+    var id = row.getAttribute("data-ctfd-modules-progress");
+    if (id && ids.indexOf(id) === -1) ids.push(id);
+  });
+
+  function render(row, progress) {
+    var counter = row.querySelector("[data-progress-counter]");
+    var percent = row.querySelector("[data-progress-percent]");
+    var card = row.closest(".ctfd-modules-card");
+    var bar = card ? card.querySelector("[data-progress-bar]") : null;
+    var complete = !!(progress.total && progress.solved >= progress.total);
+
+    if (counter) {
+      counter.textContent =
+        progress.display_current +
+        " / " +
+        progress.display_total +
+        (progress.display_suffix ? " " + progress.display_suffix : "");
+    }
+    if (percent) percent.textContent = progress.percent + "%";
+    if (bar) {
+      bar.style.width = progress.percent + "%";
+      bar.setAttribute("aria-valuenow", progress.percent);
+    }
+    if (complete && card) {
+      card.classList.add("ctfd-modules-card--complete");
+      [counter, percent].forEach(function (el) {
+        if (!el) return;
+        el.classList.remove("text-muted");
+        el.classList.add("text-white");
+      });
+    }
+  }
+
+  fetch("/api/v1/modules/progress?ids=" + encodeURIComponent(ids.join(",")), {
+    credentials: "same-origin",
+    headers: { Accept: "application/json" },
+  })
+    .then(function (res) {
+      return res.ok ? res.json() : null;
+    })
+    .then(function (payload) {
+      var data = payload && payload.success ? payload.data || {} : {};
+      rows.forEach(function (row) {
+        var progress = data[row.getAttribute("data-ctfd-modules-progress")];
+        if (progress) {
+          render(row, progress);
+        } else {
+          var counter = row.querySelector("[data-progress-counter]");
+          if (counter) counter.textContent = "";
+        }
+      });
+    })
+    .catch(function () {});
+})();
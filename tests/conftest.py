@@ -0,0 +1,24 @@
+"""Shared fixtures for tests that need a CTFd app with the plugin loaded.
+
+These use CTFd's own `tests/helpers.py`, so run them from a CTFd checkout
+(`python -m pytest CTFd/plugins/ctfd_modules/tests`); they are skipped elsewhere.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture
+def ctfd_app():
+    helpers = pytest.importorskip("tests.helpers")
+    cache = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.cache")
+
+    app = helpers.create_ctfd(enable_plugins=True)
+    cache.set_cache_backend(cache.LocalCacheBackend())
+    try:
+        with app.app_context():
+            yield app
+    finally:
+        cache.set_cache_backend(None)
+        helpers.destroy_ctfd(app)
@@ -0,0 +1,107 @@
+"""Tests for the cached per-challenge solves lists (utils/board.py).
+
+Run from a CTFd checkout with the plugin installed as `CTFd/plugins/ctfd_modules`.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("CTFd.models")
+board = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.board")
+
+
+@pytest.fixture
+def solved(ctfd_app):
+    from CTFd.models import Users, db
+    from tests.helpers import gen_challenge, gen_solve, gen_user
+
+    challenge_id = gen_challenge(db).id
+    user = Users.query.get(gen_user(db, name="before").id)
+    gen_solve(db, user_id=user.id, challenge_id=challenge_id)
+    with ctfd_app.test_request_context():
+        yield user, challenge_id
+
+
+def _names(challenge_id):
+    return [row["name"] for row in board.challenge_solves(challenge_id)]
+
+
+def test_rename_refreshes_the_lists_showing_the_account(solved):
+    from CTFd.models import db
+
+    user, challenge_id = solved
+    assert _names(challenge_id) == ["before"]
+
+    user.name = "after"
+    db.session.commit()
+    assert _names(challenge_id) == ["before"]
+
+    assert board.invalidate_account_solve_lists(("user", user.id)) == 1
+    assert _names(challenge_id) == ["after"]
+
+
+def test_invalidating_an_account_without_solves_is_a_no_op(solved):
+    assert board.invalidate_account_solve_lists(("user", 999999)) == 0
+    assert board.invalidate_account_solve_lists(None) == 0
+
+
+@pytest.fixture
+def module_board_client(ctfd_app):
+    """A logged-in player and a public module mixing listed, hidden and anonymized challenges."""
+    from CTFd.models import Challenges, Users, db
+    from tests.helpers import gen_challenge, gen_solve, gen_tag, gen_user, login_as_user, register_user
+
+    models = pytest.importorskip("CTFd.plugins.ctfd_modules.models")
+    cache = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.cache")
+
+    register_user(ctfd_app)
+    module = models.Module(name="module", status=models.ModuleStatus.public)
+    db.session.add(module)
+    db.session.commit()
+
+    listed = gen_challenge(db, name="listed", value=100).id
+    solved = gen_challenge(db, name="solved", value=100).id
+    gen_tag(db, challenge_id=listed, value="web")
+    hidden = gen_challenge(db, name="hidden", value=200, state="hidden").id
+    anonymized = gen_challenge(db, name="anonymized", value=300).id
+    Challenges.query.get(anonymized).requirements = {"prerequisites": [listed], "anonymize": True}
+    outside = gen_challenge(db, name="outside", value=50).id
+    db.session.add_all(
+        [models.ModuleChallenge(challenge_id=cid, module_id=module.id) for cid in (listed, solved, hidden, anonymized)]
+    )
+    db.session.commit()
+
+    gen_solve(db, user_id=Users.query.filter_by(name="user").first().id, challenge_id=solved)
+    gen_solve(db, user_id=gen_user(db, name="other", email="other@examplectf.com").id, challenge_id=listed)
+    cache.bump_cache_generation("links", "challenges", "modules")
+    return login_as_user(ctfd_app), module.id, outside
+
+
+def test_module_board_matches_the_core_listing(module_board_client):
+    client, module_id, outside = module_board_client
+
+    core = client.get("/api/v1/challenges").get_json()["data"]
+    scoped = client.get(f"/api/v1/challenges?ctfd_modules=1&module_id={module_id}").get_json()["data"]
+
+    module_ids = set(board.challenge_module_index().challenges_of(module_id))
+    expected = sorted((row for row in core if row["id"] in module_ids), key=lambda row: row["id"])
+    assert sorted(scoped, key=lambda row: row["id"]) == expected
+    assert {row["type"] for row in scoped} == {"hidden", "standard"}
+    assert outside not in {row["id"] for row in scoped}
+
+
+def test_module_board_runs_after_later_before_request_hooks(ctfd_app, module_board_client):
+    from flask import abort, request
+
+    client, module_id, _ = module_board_client
+
+    def deny_challenge_listing():
+        if request.path == "/api/v1/challenges":
+            abort(418)
+
+    # Registered after the plugin, like another plugin's hook would be.
+    ctfd_app.before_request_funcs.setdefault(None, []).append(deny_challenge_listing)
+
+    response = client.get(f"/api/v1/challenges?ctfd_modules=1&module_id={module_id}")
+    assert response.status_code == 418
@@ -0,0 +1,274 @@
+"""Tests for utils/cache.py against the in-process LocalCacheBackend.
+
+Run from a CTFd checkout with the plugin installed (the module imports
+`CTFd.models`); skipped when Flask or CTFd are not importable.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import threading
+import types
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("CTFd.models")
+
+_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils", "cache.py")
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    spec = importlib.util.spec_from_file_location("ctfd_modules_cache_under_test", _CACHE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.set_cache_backend(module.LocalCacheBackend())
+    # Deferred invalidation only needs `db.session.info`.
+    monkeypatch.setattr(module, "db", types.SimpleNamespace(session=types.SimpleNamespace(info={})))
+    return module
+
+
+class CountingBuilder:
+    def __init__(self, value="built", gate: threading.Event | None = None):
+        self.value = value
+        self.gate = gate
+        self.started = threading.Event()
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        return self.value
+
+
+def test_miss_then_hit(cache):
+    builder = CountingBuilder()
+    assert cache.cached("modules", "k", builder) == "built"
+    assert cache.cached("modules", "k", builder) == "built"
+    assert builder.calls == 1
+
+
+def test_none_result_is_cached(cache):
+    builder = CountingBuilder(value=None)
+    assert cache.cached("modules", "k", builder) is None
+    assert cache.cached("modules", "k", builder) is None
+    assert builder.calls == 1
+
+
+def test_keys_and_namespaces_are_separate(cache):
+    a = CountingBuilder("a")
+    b = CountingBuilder("b")
+    assert cache.cached("modules", "a", a) == "a"
+    assert cache.cached("links", "a", b) == "b"
+    assert a.calls == b.calls == 1
+
+
+def test_generation_bump_rebuilds(cache):
+    builder = CountingBuilder()
+    cache.cached("modules", "k", builder)
+    cache.bump_cache_generation("modules")
+    cache.cached("modules", "k", builder)
+    assert builder.calls == 2
+
+
+def test_tuple_namespace_follows_every_generation(cache):
+    builder = CountingBuilder()
+    cache.cached(("links", "modules"), "k", builder)
+    cache.bump_cache_generation("links")
+    cache.cached(("links", "modules"), "k", builder)
+    cache.bump_cache_generation("modules")
+    cache.cached(("links", "modules"), "k", builder)
+    assert builder.calls == 3
+
+
+def _rebuild_in_thread(cache, builder, results):
+    thread = threading.Thread(target=lambda: results.append(cache.cached("modules", "k", builder)))
+    thread.start()
+    assert builder.started.wait(5)
+    return thread
+
+
+def test_stale_value_served_during_rebuild(cache):
+    cache.cached("modules", "k", CountingBuilder("old"))
+    cache.bump_cache_generation("modules")
+
+    gate = threading.Event()
+    slow = CountingBuilder("new", gate=gate)
+    results: list = []
+    thread = _rebuild_in_thread(cache, slow, results)
+
+    other = CountingBuilder("unused")
+    assert cache.cached("modules", "k", other) == "old"
+    assert other.calls == 0
+
+    gate.set()
+    thread.join(5)
+    assert results == ["new"]
+    assert cache.cached("modules", "k", other) == "new"
+
+
+def test_allow_stale_false_waits_for_rebuild(cache):
+    cache.cached("modules", "k", CountingBuilder("old"))
+    cache.bump_cache_generation("modules")
+
+    gate = threading.Event()
+    slow = CountingBuilder("new", gate=gate)
+    results: list = []
+    thread = _rebuild_in_thread(cache, slow, results)
+
+    waiter_results: list = []
+    other = CountingBuilder("unused")
+    waiter = threading.Thread(
+        target=lambda: waiter_results.append(cache.cached("modules", "k", other, allow_stale=False))
+    )
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive(), "allow_stale=False must not return the previous generation"
+
+    gate.set()
+    thread.join(5)
+    waiter.join(5)
+    assert results == ["new"]
+    assert waiter_results == ["new"]
+    assert other.calls == 0
+
+
+def test_single_flight_between_threads(cache):
+    gate = threading.Event()
+    builder = CountingBuilder("value", gate=gate)
+    results: list = []
+
+    first = _rebuild_in_thread(cache, builder, results)
+    # Nothing stale to serve: the second caller blocks on the build lock.
+    second = threading.Thread(target=lambda: results.append(cache.cached("modules", "k", builder)))
+    second.start()
+    second.join(0.2)
+    assert second.is_alive()
+
+    gate.set()
+    first.join(5)
+    second.join(5)
+    assert results == ["value", "value"]
+    assert builder.calls == 1
+
+
+def test_invalidate_cache_waits_for_commit(cache):
+    builder = CountingBuilder()
+    cache.cached("modules", "k", builder)
+
+    cache.invalidate_cache("modules")
+    cache.cached("modules", "k", builder)
+    assert builder.calls == 1
+
+    cache._flush_pending_invalidations(cache.db.session)
+    cache.cached("modules", "k", builder)
+    assert builder.calls == 2
+
+
+def test_invalidate_cache_dropped_on_rollback(cache):
+    builder = CountingBuilder()
+    cache.cached("modules", "k", builder)
+
+    cache.invalidate_cache("modules")
+    cache._discard_pending_invalidations(cache.db.session)
+    cache._flush_pending_invalidations(cache.db.session)
+    cache.cached("modules", "k", builder)
+    assert builder.calls == 1
+
+
+def test_local_backend_ttl_and_lru(cache, monkeypatch):
+    backend = cache.LocalCacheBackend(max_entries=16)
+    for index in range(20):
+        backend.set(f"k{index}", index)
+    assert backend.get("k0") is None
+    assert backend.get("k19") == 19
+
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    backend.set("ttl", "v", timeout=10)
+    assert backend.add("ttl", "other", timeout=10) is False
+    now[0] += 11
+    assert backend.get("ttl") is None
+    assert backend.add("ttl", "other", timeout=10) is True
+
+
+def test_entity_generations_expire_shared_ones_do_not(cache):
+    timeouts = {}
+
+    class RecordingBackend(cache.LocalCacheBackend):
+        def _store(self, key, value, timeout):
+            timeouts[key] = timeout
+            super()._store(key, value, timeout)
+
+    cache.set_cache_backend(RecordingBackend())
+    cache.cache_generation("modules")
+    cache.cache_generation("solves:user:5")
+    cache.bump_cache_generation("links", "solves:challenge:3")
+
+    assert timeouts[cache._generation_key("modules")] == 0
+    assert timeouts[cache._generation_key("links")] == 0
+    assert timeouts[cache._generation_key("solves:user:5")] == cache.ENTITY_GENERATION_TTL
+    assert timeouts[cache._generation_key("solves:challenge:3")] == cache.ENTITY_GENERATION_TTL
+
+
+def test_reserved_generation_is_prewarmed_and_published(cache):
+    current = CountingBuilder("current")
+    assert cache.cached("modules", "k", current) == "current"
+
+    token = cache.reserve_cache_generation("modules", "batch-1")
+    future = CountingBuilder("future")
+    with cache.preview_generation("modules", token):
+        assert cache.cached("modules", "k", future) == "future"
+
+    # Readers of the current generation never see the previewed value.
+    assert cache.cached("modules", "k", current) == "current"
+    assert current.calls == 1
+
+    assert cache.advance_cache_generation("modules", "batch-1") is True
+    assert cache.cache_generation("modules") == token
+    assert cache.cached("modules", "k", CountingBuilder("unused")) == "future"
+    assert future.calls == 1
+
+
+def test_preview_does_not_write_stale_copies(cache):
+    cache.cached("modules", "k", CountingBuilder("current"))
+    token = cache.reserve_cache_generation("modules", "batch-1")
+    with cache.preview_generation("modules", token):
+        cache.cached("modules", "k", CountingBuilder("future"))
+
+    # A rebuild in progress on the current generation serves the old copy.
+    cache.bump_cache_generation("modules")
+    gate = threading.Event()
+    slow = CountingBuilder("rebuilt", gate=gate)
+    results: list = []
+    thread = _rebuild_in_thread(cache, slow, results)
+    assert cache.cached("modules", "k", CountingBuilder("unused")) == "current"
+    gate.set()
+    thread.join(5)
+
+
+def test_reservation_for_another_batch_falls_back_to_bump(cache):
+    builder = CountingBuilder()
+    cache.cached("modules", "k", builder)
+    token = cache.reserve_cache_generation("modules", "batch-1")
+
+    assert cache.advance_cache_generation("modules", "batch-2") is False
+    assert cache.cache_generation("modules") != token
+    cache.cached("modules", "k", builder)
+    assert builder.calls == 2
+
+
+def test_reservation_is_dropped_after_an_intervening_bump(cache):
+    token = cache.reserve_cache_generation("modules", "batch-1")
+    with cache.preview_generation("modules", token):
+        cache.cached("modules", "k", CountingBuilder("future"))
+
+    # An admin edit after the pre-warm: the previewed values predate it.
+    cache.bump_cache_generation("modules")
+    assert cache.advance_cache_generation("modules", "batch-1") is False
+    assert cache.cache_generation("modules") != token
+    assert cache.cached("modules", "k", CountingBuilder("fresh")) == "fresh"
@@ -0,0 +1,80 @@
+"""Tests for the memoized compat callable registry (compat.py).
+
+compat.py only needs Flask, so it is loaded by path and runs without CTFd.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+
+import pytest
+
+flask = pytest.importorskip("flask")
+
+_COMPAT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "compat.py")
+
+
+@pytest.fixture
+def compat():
+    spec = importlib.util.spec_from_file_location("ctfd_modules_compat_under_test", _COMPAT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class CountingResolver:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def test_lookups_are_resolved_once(compat):
+    resolver = CountingResolver(lambda: "nonce")
+    compat.register_compat_resolver("generate_nonce", resolver)
+
+    app = flask.Flask(__name__)
+    app.secret_key = "test"
+    with app.test_request_context():
+        # Per render, as the `ctfd_modules_nonce` template helper does.
+        assert [compat.ctfd_generate_nonce() for _ in range(100)] == ["nonce"] * 100
+    assert resolver.calls == 1
+
+
+def test_misses_and_failing_resolvers_are_memoized(compat):
+    def _broken():
+        raise RuntimeError("incompatible CTFd")
+
+    missing = CountingResolver(None)
+    compat.register_compat_resolver("missing", missing)
+    compat.register_compat_resolver("broken", _broken)
+    for _ in range(3):
+        assert compat.resolve_compat_callable("missing") is None
+        assert compat.resolve_compat_callable("broken") is None
+    assert missing.calls == 1
+    assert compat.resolve_compat_callable("unregistered") is None
+
+
+def test_reset_rediscovers_and_drops_pinned_callables(compat):
+    resolver = CountingResolver(len)
+    compat.register_compat_resolver("helper", resolver)
+    compat.warm_compat_callables()
+    compat.register_compat_callable("pinned", abs)
+    assert compat.resolve_compat_callable("helper") is len
+    assert compat.resolve_compat_callable("pinned") is abs
+
+    compat.reset_compat_callables()
+    assert compat.resolve_compat_callable("helper") is len
+    assert resolver.calls == 2
+    assert compat.resolve_compat_callable("pinned") is None
+
+
+def test_replacing_a_resolver_invalidates_its_memo(compat):
+    compat.register_compat_resolver("helper", lambda: len)
+    assert compat.resolve_compat_callable("helper") is len
+    compat.register_compat_resolver("helper", lambda: abs)
+    assert compat.resolve_compat_callable("helper") is abs
@@ -0,0 +1,64 @@
+"""Tests for the array-backed challenge <-> module link index (utils/index.py)."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("CTFd.models")
+index = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.index")
+
+PUBLIC, PRIVATE, LOCKED = index.STATUS_PUBLIC, index.STATUS_PRIVATE, index.STATUS_LOCKED
+
+# (challenge_id, module_id, status_code, visible)
+ROWS = [
+    (5, 2, PUBLIC, 1),
+    (5, 9, PRIVATE, 1),
+    (1_000_000, 2, PUBLIC, 0),
+    (7, 9, PRIVATE, 1),
+]
+
+
+@pytest.fixture
+def links():
+    return index.ChallengeModuleIndex(ROWS)
+
+
+def test_lookups_by_challenge(links):
+    assert list(links.challenge_ids()) == [5, 7, 1_000_000]
+    assert list(links.modules_of(5)) == [2, 9]
+    assert links.links_of(5) == [(2, PUBLIC), (9, PRIVATE)]
+    assert list(links.modules_of(6)) == []
+    assert 1_000_000 in links
+    assert 6 not in links
+    assert "5" not in links
+    assert len(links) == 3
+
+
+def test_lookups_by_module(links):
+    assert list(links.module_ids()) == [2, 9]
+    assert list(links.challenges_of(2)) == [5, 1_000_000]
+    assert links.visible_challenges_of(2) == [5]
+    assert links.status_of(9) == PRIVATE
+    # Unknown or unlinked modules behave as locked with no challenges.
+    assert links.status_of(3) == LOCKED
+    assert list(links.challenges_of(3)) == []
+
+
+def test_rows_take_values_from_the_value_map(links):
+    assert links.rows_of(9, {5: 100, 7: 10}) == [(5, 100, True), (7, 10, True)]
+    assert links.rows_of(2, {5: 100}) == [(5, 100, True), (1_000_000, 0, False)]
+
+
+def test_memory_follows_link_count_not_largest_id(links):
+    # One offset per distinct id (plus the end), not one per possible id.
+    assert len(links._c_offsets) == len(links.challenge_ids()) + 1
+    assert len(links._m_offsets) == len(links.module_ids()) + 1
+
+
+def test_empty_index():
+    empty = index.ChallengeModuleIndex([])
+    assert len(empty) == 0
+    assert list(empty.modules_of(1)) == []
+    assert empty.status_of(1) == LOCKED
+    assert 1 not in empty
+    assert empty.rows_of(1, {}) == []
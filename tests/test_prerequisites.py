@@ -0,0 +1,90 @@
+"""Tests for module prerequisites (utils/prerequisites.py).
+
+Run from a CTFd checkout with the plugin installed as `CTFd/plugins/ctfd_modules`.
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+pytest.importorskip("CTFd.models")
+prerequisites = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.prerequisites")
+models = pytest.importorskip("CTFd.plugins.ctfd_modules.models")
+cache = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.cache")
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        (None, ()),
+        ("[3, 1, 3]", (3, 1)),
+        ("2, x, 0, 5", (2, 5)),
+        (7, (7,)),
+    ],
+)
+def test_parse_prerequisites(raw, expected):
+    assert prerequisites.parse_prerequisites(raw) == expected
+
+
+def test_topological_order_reports_cycles():
+    order, cyclic = prerequisites._topological_order({1: (), 2: (1,), 3: (4,), 4: (3,), 5: (3,)})
+    assert order == (1, 2)
+    assert cyclic == {3, 4, 5}
+
+
+@pytest.fixture
+def chain(ctfd_app):
+    """`intro` <- `advanced`, plus `loop_a` <-> `loop_b` written by hand."""
+    from CTFd.models import Users, db
+    from tests.helpers import gen_challenge, gen_user
+
+    ids = {}
+    for name in ("intro", "advanced", "loop_a", "loop_b"):
+        module = models.Module(name=name)
+        db.session.add(module)
+        db.session.commit()
+        ids[name] = module.id
+    for name, requires in (("advanced", "intro"), ("loop_a", "loop_b"), ("loop_b", "loop_a")):
+        models.Module.query.get(ids[name]).prerequisites = json.dumps([ids[requires]])
+
+    challenge_id = gen_challenge(db).id
+    db.session.add(models.ModuleChallenge(challenge_id=challenge_id, module_id=ids["intro"]))
+    db.session.commit()
+    cache.bump_cache_generation("links", "challenges", "modules")
+    return ids, challenge_id, Users.query.get(gen_user(db).id)
+
+
+def test_cycles_in_stored_rows_lock_their_modules(chain):
+    ids, _, user = chain
+    graph = prerequisites.prerequisite_graph()
+    assert graph["cyclic"] == {ids["loop_a"], ids["loop_b"]}
+    assert prerequisites.prerequisite_locked_ids(user) == {ids["advanced"], ids["loop_a"], ids["loop_b"]}
+
+
+def test_solving_a_prerequisite_unlocks_its_dependents(chain):
+    from CTFd.models import db
+    from tests.helpers import gen_solve
+
+    progress = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.progress")
+    ids, challenge_id, user = chain
+    gen_solve(db, user_id=user.id, challenge_id=challenge_id)
+    cache.bump_cache_generation(progress.solves_namespace(progress.solve_account(user)))
+    assert prerequisites.prerequisite_locked_ids(user) == {ids["loop_a"], ids["loop_b"]}
+
+
+def test_anonymous_visitors_see_every_dependent_locked(chain):
+    ids, _, _ = chain
+    assert prerequisites.prerequisite_locked_ids(None) == {ids["advanced"], ids["loop_a"], ids["loop_b"]}
+
+
+def test_validate_rejects_cycles_self_references_and_unknown_ids(chain):
+    ids, _, _ = chain
+    with pytest.raises(ValueError, match="cycle"):
+        prerequisites.validate_prerequisites(ids["intro"], [ids["advanced"]])
+    with pytest.raises(ValueError, match="itself"):
+        prerequisites.validate_prerequisites(ids["intro"], [ids["intro"]])
+    with pytest.raises(ValueError, match="Unknown"):
+        prerequisites.validate_prerequisites(ids["intro"], [999999])
+    assert prerequisites.validate_prerequisites(ids["advanced"], [ids["intro"]]) == (ids["intro"],)
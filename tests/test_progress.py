@@ -0,0 +1,63 @@
+"""Tests for module progress totals (utils/progress.py).
+
+Run from a CTFd checkout with the plugin installed as `CTFd/plugins/ctfd_modules`.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("CTFd.models")
+progress = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.progress")
+models = pytest.importorskip("CTFd.plugins.ctfd_modules.models")
+cache = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.cache")
+
+
+@pytest.fixture
+def course(ctfd_app):
+    """One module: an open challenge, a hidden one and one gated behind the first."""
+    from CTFd.models import Users, db
+    from tests.helpers import gen_challenge, gen_user
+
+    module = models.Module(name="course")
+    db.session.add(module)
+    db.session.commit()
+
+    open_id = gen_challenge(db, name="open", value=100).id
+    hidden_id = gen_challenge(db, name="hidden", value=200, state="hidden").id
+    gated_id = gen_challenge(db, name="gated", value=300, requirements={"prerequisites": [open_id]}).id
+    for challenge_id in (open_id, hidden_id, gated_id):
+        db.session.add(models.ModuleChallenge(challenge_id=challenge_id, module_id=module.id))
+    db.session.commit()
+    cache.bump_cache_generation("links", "challenges", "challenge_values", "modules")
+
+    user = Users.query.get(gen_user(db).id)
+    return {"module": module, "user": user, "open": open_id, "gated": gated_id}
+
+
+def _totals(payload):
+    return payload["solved"], payload["total"], payload["points_solved"], payload["points_total"]
+
+
+def test_single_and_batch_progress_agree_and_skip_hidden_and_gated(course):
+    module, user = course["module"], course["user"]
+    single = progress.module_progress(user, module)
+    batch = progress.modules_progress(user, [module.id])[module.id]
+    assert _totals(single) == _totals(batch) == (0, 1, 0, 100)
+
+
+def test_gated_challenge_counts_once_prerequisites_are_solved(course):
+    from CTFd.models import db
+    from tests.helpers import gen_solve
+
+    module, user = course["module"], course["user"]
+    gen_solve(db, user_id=user.id, challenge_id=course["open"])
+    cache.bump_cache_generation(progress.solves_namespace(progress.solve_account(user)))
+
+    single = progress.module_progress(user, module)
+    batch = progress.modules_progress(user, [module.id])[module.id]
+    assert _totals(single) == _totals(batch) == (1, 2, 100, 400)
+
+
+def test_logged_out_progress_hides_gated_challenges(course):
+    assert _totals(progress.module_progress(None, course["module"])) == (0, 1, 0, 100)
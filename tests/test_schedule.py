@@ -0,0 +1,121 @@
+"""Tests for scheduled module transitions (utils/schedule.py, admin form parsing).
+
+Run from a CTFd checkout with the plugin installed as `CTFd/plugins/ctfd_modules`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+pytest.importorskip("CTFd.models")
+schedule = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.schedule")
+admin = pytest.importorskip("CTFd.plugins.ctfd_modules.admin")
+models = pytest.importorskip("CTFd.plugins.ctfd_modules.models")
+
+ModuleStatus = models.ModuleStatus
+
+
+@pytest.mark.parametrize(
+    "open_status, current, expected",
+    [
+        (None, ModuleStatus.locked, ModuleStatus.public),
+        (None, ModuleStatus.private, ModuleStatus.private),
+        (None, None, ModuleStatus.public),
+        (ModuleStatus.private, ModuleStatus.locked, ModuleStatus.private),
+        ("public", ModuleStatus.private, ModuleStatus.public),
+        # A locked open target is meaningless; fall back to the safe default.
+        (ModuleStatus.locked, ModuleStatus.private, ModuleStatus.private),
+    ],
+)
+def test_open_target_status(open_status, current, expected):
+    assert schedule.open_target_status(open_status, current) == expected
+
+
+def test_schedule_form_parses_open_status():
+    form = MultiDict({"open_at": "2030-01-01T10:00", "open_status": "private", "close_at": "2030-01-02T10:00"})
+    assert admin._schedule_from_form(form) == (
+        datetime(2030, 1, 1, 10, 0),
+        "private",
+        datetime(2030, 1, 2, 10, 0),
+    )
+
+
+def test_schedule_form_drops_open_status_without_open_at():
+    form = MultiDict({"open_status": "private"})
+    assert admin._schedule_from_form(form) == (None, None, None)
+
+
+@pytest.mark.parametrize(
+    "fields, message",
+    [
+        ({"open_at": "2030-01-02T10:00", "close_at": "2030-01-01T10:00"}, "Close time must be after open time"),
+        ({"open_at": "2030-01-01T10:00", "close_at": "2030-01-01T10:00"}, "Close time must be after open time"),
+        ({"open_at": "2030-01-01T10:00", "open_status": "locked"}, "Modules can only open as public or private"),
+        ({"open_at": "tomorrow"}, "Invalid schedule date"),
+    ],
+)
+def test_schedule_form_rejects_invalid_input(fields, message):
+    with pytest.raises(ValueError, match=message):
+        admin._schedule_from_form(MultiDict(fields))
+
+
+def _scheduled_module(db, name, **fields):
+    module = models.Module(name=name, status=ModuleStatus.locked, **fields)
+    db.session.add(module)
+    db.session.commit()
+    return module.id
+
+
+def test_prewarmed_transition_is_published_on_apply(ctfd_app, monkeypatch):
+    from CTFd.models import db
+
+    from CTFd.plugins.ctfd_modules.utils import queries
+
+    open_at = datetime(2030, 1, 1, 10, 0)
+    module_id = _scheduled_module(db, "scheduled", open_at=open_at)
+    batch = [entry for entry in schedule.current_schedule().entries if entry[0] == open_at]
+    assert [(entry[1], entry[2]) for entry in batch] == [(module_id, ModuleStatus.public)]
+
+    assert schedule.warm_upcoming_transition(batch) is True
+    # Nothing changed yet, for the database or for readers of the cache.
+    assert models.Module.query.get(module_id).status == ModuleStatus.locked
+    assert queries.module_snapshots()[module_id].is_locked
+
+    cold_warms = []
+    monkeypatch.setattr(schedule, "warm_caches_in_background", cold_warms.append)
+    assert schedule.apply_due_transitions(now=open_at) == 1
+    assert cold_warms == []
+
+    # The pre-warmed snapshot is served without rebuilding.
+    monkeypatch.setattr(db.session, "query", None)
+    assert queries.module_snapshots()[module_id].is_public
+
+
+def test_late_apply_without_matching_prewarm_warms_cold(ctfd_app, monkeypatch):
+    from CTFd.models import db
+
+    open_at = datetime(2030, 1, 1, 10, 0)
+    _scheduled_module(db, "first", open_at=open_at)
+    second_id = _scheduled_module(db, "second", open_at=datetime(2030, 1, 1, 10, 5))
+    batch = [entry for entry in schedule.current_schedule().entries if entry[0] == open_at]
+    assert schedule.warm_upcoming_transition(batch) is True
+
+    cold_warms = []
+    monkeypatch.setattr(schedule, "warm_caches_in_background", cold_warms.append)
+    # Applied late: both openings are due, which is not the pre-warmed batch.
+    assert schedule.apply_due_transitions(now=datetime(2030, 1, 1, 10, 10)) == 2
+    assert len(cold_warms) == 1
+    assert models.Module.query.get(second_id).status == ModuleStatus.public
+
+
+def test_private_module_opens_private(ctfd_app):
+    from CTFd.models import db
+
+    open_at = datetime(2030, 1, 1, 10, 0)
+    module = models.Module(name="course", status=ModuleStatus.private, open_at=open_at)
+    db.session.add(module)
+    db.session.commit()
+    assert schedule.current_schedule().entries[0][2] == ModuleStatus.private
@@ -0,0 +1,124 @@
+"""Tests for per-module score maintenance (utils/scores.py).
+
+Run from a CTFd checkout with the plugin installed as `CTFd/plugins/ctfd_modules`.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("CTFd.models")
+scores = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.scores")
+models = pytest.importorskip("CTFd.plugins.ctfd_modules.models")
+cache = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.cache")
+
+
+@pytest.fixture
+def board(ctfd_app):
+    """Two modules sharing one challenge, three users with some solves."""
+    from CTFd.models import db
+    from tests.helpers import gen_challenge, gen_solve, gen_user
+
+    first = models.Module(name="first")
+    second = models.Module(name="second")
+    db.session.add_all([first, second])
+    db.session.commit()
+
+    challenges = [gen_challenge(db, name=f"c{value}", value=value).id for value in (100, 200, 300)]
+    db.session.add_all(
+        [
+            models.ModuleChallenge(challenge_id=challenges[0], module_id=first.id),
+            models.ModuleChallenge(challenge_id=challenges[1], module_id=first.id),
+            models.ModuleChallenge(challenge_id=challenges[1], module_id=second.id),
+            models.ModuleChallenge(challenge_id=challenges[2], module_id=second.id),
+        ]
+    )
+    db.session.commit()
+    users = [gen_user(db, name=f"user{i}", email=f"user{i}@examplectf.com").id for i in range(3)]
+    for user_id, challenge_id in ((users[0], challenges[0]), (users[0], challenges[1]), (users[1], challenges[2])):
+        gen_solve(db, user_id=user_id, challenge_id=challenge_id)
+    cache.bump_cache_generation("links", "challenges", "modules")
+    return {"modules": (first.id, second.id), "challenges": challenges, "users": users}
+
+
+def _rows():
+    return sorted(
+        (row.module_id, row.account_type, row.account_id, row.points, row.solves)
+        for row in models.ModuleScore.query.all()
+    )
+
+
+def _expected():
+    from CTFd.models import db
+
+    return sorted(
+        (row[0], row[1], row[2], int(row[3]), int(row[4]))
+        for row in db.session.execute(scores._aggregate_select(scores.score_account_type())).fetchall()
+    )
+
+
+def test_rebuild_matches_direct_aggregate(board):
+    assert scores.rebuild_module_scores(chunk_size=1)["rows"] == 3
+    assert _rows() == _expected()
+
+
+def test_numpy_and_python_grouping_agree(board):
+    if scores.np is None:
+        pytest.skip("numpy not installed")
+    args = ([1, 1, 2, 1], [5, 5, 5, 6], [100, 200, 300, 50], [10, 30, 20, 5])
+    assert sorted(scores._group_chunk_numpy(*args)) == sorted(scores._group_chunk_python(*args))
+
+
+def test_rebuild_includes_solves_committed_during_the_read(board, monkeypatch):
+    from CTFd.models import db
+    from tests.helpers import gen_solve
+
+    monkeypatch.setattr(scores, "np", None)
+    grouped = scores._group_chunk_python
+    late = []
+
+    def _group_and_solve(*args):
+        if not late:
+            late.append(gen_solve(db, user_id=board["users"][2], challenge_id=board["challenges"][0]).id)
+        return grouped(*args)
+
+    monkeypatch.setattr(scores, "_group_chunk_python", _group_and_solve)
+    # One chunk: the late solve is only seen by the per-module catch-up query.
+    scores.rebuild_module_scores(chunk_size=10)
+    assert late
+    assert _rows() == _expected()
+
+
+def test_overlapping_rebuild_is_deferred_to_the_running_one(board):
+    backend = cache.get_cache_backend()
+    backend.add(scores._REBUILD_LOCK_KEY, 1, timeout=60)
+    try:
+        assert scores.rebuild_module_scores() is None
+        assert backend.get(scores._REBUILD_REQUESTED_KEY)
+    finally:
+        backend.delete(scores._REBUILD_LOCK_KEY)
+
+    assert scores.rebuild_module_scores() is not None
+    assert not backend.get(scores._REBUILD_REQUESTED_KEY)
+
+
+def test_record_module_solve_is_idempotent(board):
+    from CTFd.models import db
+    from tests.helpers import gen_solve
+
+    scores.rebuild_module_scores()
+    user_id = board["users"][1]
+    challenge_id = board["challenges"][1]
+    gen_solve(db, user_id=user_id, challenge_id=challenge_id)
+
+    # The hook can run after a rebuild already counted the solve.
+    assert scores.record_module_solve(("user", user_id), challenge_id) == 2
+    assert scores.record_module_solve(("user", user_id), challenge_id) == 2
+    assert _rows() == _expected()
+
+
+def test_record_module_solve_ignores_other_account_types(board):
+    scores.rebuild_module_scores()
+    before = _rows()
+    assert scores.record_module_solve(("team", 1), board["challenges"][0]) == 0
+    assert _rows() == before
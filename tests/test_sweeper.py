@@ -0,0 +1,79 @@
+"""Tests for the expired-grant sweeper (utils/sweeper.py).
+
+Run from a CTFd checkout with the plugin installed as `CTFd/plugins/ctfd_modules`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("CTFd.models")
+sweeper = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.sweeper")
+models = pytest.importorskip("CTFd.plugins.ctfd_modules.models")
+access = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.access")
+
+NOW = datetime(2030, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def grants(ctfd_app):
+    """Expired user, team and group grants next to ones that are still valid."""
+    from CTFd.models import db
+    from tests.helpers import gen_team, gen_user
+
+    module = models.Module(name="private", status=models.ModuleStatus.private)
+    other = models.Module(name="other", status=models.ModuleStatus.private)
+    group = models.ModuleGroup(name="group")
+    db.session.add_all([module, other, group])
+    db.session.commit()
+
+    users = [gen_user(db, name=f"user{i}", email=f"user{i}@examplectf.com").id for i in range(3)]
+    team_id = gen_team(db).id
+    past, future = NOW - timedelta(minutes=1), NOW + timedelta(days=1)
+    db.session.add_all(
+        [
+            models.ModuleAccess(user_id=users[0], module_id=module.id, expires_at=past),
+            models.ModuleAccess(user_id=users[1], module_id=module.id, expires_at=past),
+            models.ModuleAccess(user_id=users[0], module_id=other.id, expires_at=future),
+            models.ModuleAccess(user_id=users[2], module_id=module.id, expires_at=None),
+            models.ModuleTeamAccess(team_id=team_id, module_id=module.id, expires_at=past),
+            models.ModuleGroupAccess(group_id=group.id, module_id=module.id, expires_at=past),
+            models.ModuleGroupAccess(group_id=group.id, module_id=other.id, expires_at=future),
+        ]
+    )
+    db.session.commit()
+    return {"module": module.id, "other": other.id, "users": users}
+
+
+def test_sweep_deletes_expired_user_team_and_group_grants(grants):
+    assert sweeper.expired_access_count(now=NOW) == 4
+
+    stats = sweeper.sweep_expired_access(batch_size=1, now=NOW)
+    assert (stats["deleted"], stats["team_grants"], stats["group_grants"]) == (2, 1, 1)
+    assert stats["users"] == 2
+    assert stats["batches"] == 2
+    assert sweeper.last_access_sweep() == stats
+
+    assert sweeper.expired_access_count(now=NOW) == 0
+    assert sorted((row.user_id, row.module_id) for row in models.ModuleAccess.query.all()) == [
+        (grants["users"][0], grants["other"]),
+        (grants["users"][2], grants["module"]),
+    ]
+    assert models.ModuleTeamAccess.query.count() == 0
+    assert [row.module_id for row in models.ModuleGroupAccess.query.all()] == [grants["other"]]
+
+
+def test_sweep_refreshes_cached_grants(grants):
+    user_id = grants["users"][0]
+    assert set(access.user_access_grants(user_id)) == {grants["module"], grants["other"]}
+
+    sweeper.sweep_expired_access(now=NOW)
+    assert set(access.user_access_grants(user_id)) == {grants["other"]}
+
+
+def test_sweep_without_expired_grants_is_a_no_op(grants):
+    stats = sweeper.sweep_expired_access(now=NOW - timedelta(hours=1))
+    assert (stats["deleted"], stats["team_grants"], stats["group_grants"], stats["batches"]) == (0, 0, 0, 0)
+    assert models.ModuleAccess.query.count() == 4
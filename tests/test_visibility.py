@@ -0,0 +1,81 @@
+"""Tests for the hidden-challenge bitsets (utils/visibility.py).
+
+Run from a CTFd checkout with the plugin installed as `CTFd/plugins/ctfd_modules`.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("CTFd.models")
+visibility = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.visibility")
+models = pytest.importorskip("CTFd.plugins.ctfd_modules.models")
+cache = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.cache")
+access = pytest.importorskip("CTFd.plugins.ctfd_modules.utils.access")
+
+ModuleStatus = models.ModuleStatus
+
+
+def test_bitset_contains():
+    bits = (1 << 3 | 1 << 9).to_bytes(2, "little")
+    assert [cid for cid in range(20) if visibility.bitset_contains(bits, cid)] == [3, 9]
+    assert not visibility.bitset_contains(b"", 0)
+
+
+@pytest.fixture
+def modules(ctfd_app):
+    """Public, private and locked modules; one challenge shared, one unlinked."""
+    from CTFd.models import db
+    from tests.helpers import gen_challenge
+
+    ids = {}
+    for status in (ModuleStatus.public, ModuleStatus.private, ModuleStatus.locked):
+        module = models.Module(name=status.value, status=status)
+        db.session.add(module)
+        db.session.commit()
+        ids[status.value] = module.id
+
+    challenges = {name: gen_challenge(db, name=name).id for name in ("public", "private", "locked", "shared", "free")}
+    links = [(challenges[name], ids[name]) for name in ("public", "private", "locked")]
+    links += [(challenges["shared"], ids["public"]), (challenges["shared"], ids["private"])]
+    db.session.add_all([models.ModuleChallenge(challenge_id=cid, module_id=mid) for cid, mid in links])
+    db.session.commit()
+    cache.bump_cache_generation("links", "challenges", "modules")
+    return ids, challenges
+
+
+def _hidden(bits, challenges):
+    return {name for name, cid in challenges.items() if visibility.bitset_contains(bits, cid)}
+
+
+def test_private_and_locked_modules_hide_their_challenges(modules):
+    _, challenges = modules
+    # Shared with a public module, so still visible; unlinked challenges are never hidden.
+    assert _hidden(visibility.hidden_challenge_bits((), ()), challenges) == {"private", "locked"}
+
+
+def test_grants_reveal_private_modules_only(modules):
+    ids, challenges = modules
+    bits = visibility.hidden_challenge_bits({ids["private"], ids["locked"]}, ())
+    assert _hidden(bits, challenges) == {"locked"}
+
+
+def test_prerequisite_locked_modules_are_hidden(modules):
+    ids, challenges = modules
+    bits = visibility.hidden_challenge_bits((), {ids["public"]})
+    assert _hidden(bits, challenges) == {"public", "shared", "private", "locked"}
+
+
+def test_account_bitset_follows_grants(modules):
+    from CTFd.models import Users, db
+    from tests.helpers import gen_user
+
+    ids, challenges = modules
+    user = Users.query.get(gen_user(db).id)
+    assert _hidden(visibility.account_hidden_challenges(None), challenges) == {"private", "locked"}
+    assert _hidden(visibility.account_hidden_challenges(user), challenges) == {"private", "locked"}
+
+    db.session.add(models.ModuleAccess(user_id=user.id, module_id=ids["private"]))
+    db.session.commit()
+    cache.bump_cache_generation(access.access_namespace(user.id))
+    assert _hidden(visibility.account_hidden_challenges(user), challenges) == {"locked"}
@@ -1,12 +1,103 @@
 from __future__ import annotations
 
-from .access import can_view_module, grant_access, is_admin, revoke_access, user_has_module_access
+from .access import (
+    access_namespace,
+    account_team_id,
+    active_access_filter,
+    active_module_ids,
+    can_view_module,
+    grant_access,
+    grant_invite_access,
+    grant_team_access,
+    group_module_grants,
+    is_admin,
+    revoke_access,
+    revoke_team_access,
+    team_access_grants,
+    team_access_namespace,
+    user_access_grants,
+    user_group_ids,
+    user_has_module_access,
+)
+from .analytics import module_analytics, refresh_module_analytics
+from .board import challenge_solves, challenge_solves_namespace, module_board
+from .cache import (
+    bump_cache_generation,
+    cache_generation,
+    cached,
+    invalidate_cache,
+    get_cache_backend,
+    request_cache_warmup,
+    set_cache_backend,
+    warm_caches,
+)
+from .groups import (
+    add_group_members,
+    grant_group_access,
+    parse_user_ids,
+    remove_group_member,
+    revoke_group_access,
+)
+from .index import (
+    STATUS_LOCKED,
+    STATUS_PRIVATE,
+    STATUS_PUBLIC,
+    ChallengeModuleIndex,
+    challenge_module_index,
+    challenge_values,
+    module_challenge_ids,
+    status_code,
+)
 from .invites import ensure_private_invite_code, generate_invite_code, invite_code_length
-from .progress import module_challenges_query, module_progress
-from .queries import module_ordering, ordered_modules_query, ordered_categories_query, ordered_category_names
-from .settings import get_settings, update_settings_from_form, get_ui_theme, get_progress_mode
+from .prerequisites import (
+    dump_prerequisites,
+    module_prerequisites,
+    parse_prerequisites,
+    prerequisite_graph,
+    prerequisite_locked_ids,
+    validate_prerequisites,
+)
+from .progress import (
+    account_solved_ids,
+    module_challenge_summaries,
+    module_challenge_rows,
+    module_challenges_query,
+    module_progress,
+    modules_progress,
+    requirement_locked_challenge_ids,
+    solve_account,
+    solves_namespace,
+)
+from .queries import (
+    ModuleSnapshot,
+    module_ordering,
+    module_snapshot,
+    module_snapshots,
+    module_status_code,
+    ordered_categories_query,
+    ordered_category_names,
+    ordered_module_ids,
+    ordered_module_tree,
+    ordered_modules_query,
+)
+from .scores import (
+    linked_module_ids,
+    module_scoreboard,
+    rebuild_module_scores,
+    record_module_solve,
+    rescore_modules,
+    schedule_module_rescore,
+)
+from .settings import (
+    get_progress_loading,
+    get_progress_mode,
+    get_settings,
+    get_ui_theme,
+    settings_snapshot,
+    update_settings_from_form,
+)
+from .sweeper import last_access_sweep, sweep_expired_access
 
 
 def modules_enabled() -> bool:
-    s = get_settings(create=True)
-    return bool(getattr(s, "modules_enabled", True))
+    return bool(settings_snapshot().modules_enabled)
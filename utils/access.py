@@ -6,7 +6,160 @@ from flask import current_app
 
 from CTFd.models import Users, db
 
-from ..models import Module, ModuleAccess, ModuleStatus
+try:
+    from CTFd.utils.config import is_teams_mode
+except Exception:
+    is_teams_mode = None
+
+from ..models import Module, ModuleAccess, ModuleGroupAccess, ModuleGroupMember, ModuleTeamAccess
+from .cache import cache_generation, cached, invalidate_cache
+from .index import STATUS_LOCKED, STATUS_PUBLIC
+from .queries import module_status_code
+
+_NO_GRANT = object()
+
+
+def access_namespace(user_id: int) -> str:
+    return f"access:{user_id}"
+
+
+def team_access_namespace(team_id: int) -> str:
+    return f"access:team:{team_id}"
+
+
+def account_team_id(user: Users | None) -> int | None:
+    """The user's current team in team mode, else None."""
+    if not user:
+        return None
+    try:
+        if is_teams_mode and is_teams_mode():
+            return getattr(user, "team_id", None) or None
+    except Exception:
+        pass
+    return None
+
+
+def _merge_expiry(current: datetime | None, other: datetime | None) -> datetime | None:
+    if current is None or other is None:
+        return None
+    return max(current, other)
+
+
+def user_group_ids(user_id: int) -> frozenset[int]:
+    """Ids of the access groups a user belongs to (cached per user)."""
+
+    def _load():
+        return frozenset(
+            group_id
+            for (group_id,) in db.session.query(ModuleGroupMember.group_id)
+            .filter(ModuleGroupMember.user_id == user_id)
+            .all()
+        )
+
+    # Membership edits bump the shared "groups" generation once instead of
+    # every member's access namespace.
+    return cached(
+        access_namespace(user_id),
+        ("groups", cache_generation("access"), cache_generation("groups")),
+        _load,
+        allow_stale=False,
+    )
+
+
+def group_module_grants() -> dict[int, dict[int, datetime | None]]:
+    """`{group_id: {module_id: expires_at}}` for every group grant."""
+
+    def _load():
+        out: dict[int, dict[int, datetime | None]] = {}
+        rows = db.session.query(
+            ModuleGroupAccess.group_id, ModuleGroupAccess.module_id, ModuleGroupAccess.expires_at
+        ).all()
+        for group_id, module_id, expires_at in rows:
+            out.setdefault(group_id, {})[module_id] = expires_at
+        return out
+
+    return cached("groups", "grants", _load, allow_stale=False)
+
+
+def team_access_grants(team_id: int) -> dict[int, datetime | None]:
+    """`{module_id: expires_at}` for a team's grants: one indexed lookup per team."""
+
+    def _load():
+        return {
+            module_id: expires_at
+            for module_id, expires_at in (
+                db.session.query(ModuleTeamAccess.module_id, ModuleTeamAccess.expires_at)
+                .filter(ModuleTeamAccess.team_id == team_id)
+                .all()
+            )
+        }
+
+    return cached(
+        team_access_namespace(team_id),
+        ("grants", cache_generation("access")),
+        _load,
+        allow_stale=False,
+    )
+
+
+def _merge_grants(merged: dict[int, datetime | None], extra: dict[int, datetime | None]) -> None:
+    for module_id, expires_at in extra.items():
+        if module_id in merged:
+            merged[module_id] = _merge_expiry(merged[module_id], expires_at)
+        else:
+            merged[module_id] = expires_at
+
+
+def user_access_grants(user_id: int, team_id: int | None = None) -> dict[int, datetime | None]:
+    """Return `{module_id: expires_at}` for every grant reaching a user.
+
+    Direct grants are memoized until the user's grants change (grant/revoke/
+    sweep) or a module is deleted; team grants (team mode) are memoized per
+    team and group grants come from the shared group map. Expiry is compared
+    at read time so no DB hit is needed.
+    """
+    grants = _direct_access_grants(user_id)
+    group_ids = user_group_ids(user_id)
+    if not group_ids and not team_id:
+        return grants
+
+    merged = dict(grants)
+    if team_id:
+        _merge_grants(merged, team_access_grants(team_id))
+    if group_ids:
+        by_group = group_module_grants()
+        for group_id in group_ids:
+            _merge_grants(merged, by_group.get(group_id, {}))
+    return merged
+
+
+def _direct_access_grants(user_id: int) -> dict[int, datetime | None]:
+    def _load():
+        return {
+            module_id: expires_at
+            for module_id, expires_at in (
+                db.session.query(ModuleAccess.module_id, ModuleAccess.expires_at)
+                .filter(ModuleAccess.user_id == user_id)
+                .all()
+            )
+        }
+
+    # Never serve a previous generation here: a revoke must take effect at once.
+    return cached(
+        access_namespace(user_id),
+        ("grants", cache_generation("access")),
+        _load,
+        allow_stale=False,
+    )
+
+
+def active_module_ids(user_id: int, now: datetime | None = None, team_id: int | None = None) -> set[int]:
+    now = now or datetime.utcnow()
+    return {
+        module_id
+        for module_id, expires_at in user_access_grants(user_id, team_id).items()
+        if expires_at is None or expires_at > now
+    }
 
 
 def is_admin(user: Users | None) -> bool:
@@ -17,25 +170,29 @@ def user_has_module_access(user: Users | None, module: Module) -> bool:
     if not user:
         return False
 
-    if module.status == ModuleStatus.public:
+    status = module_status_code(module)
+    if status == STATUS_PUBLIC:
         return True
 
-    if module.status == ModuleStatus.locked:
+    if status == STATUS_LOCKED:
         return False
 
     # private
-    ma = (
-        ModuleAccess.query.filter_by(user_id=user.id, module_id=module.id)
-        .order_by(ModuleAccess.granted_at.desc())
-        .first()
-    )
-    if not ma:
+    expires_at = user_access_grants(user.id, account_team_id(user)).get(module.id, _NO_GRANT)
+    if expires_at is _NO_GRANT:
         return False
-    if ma.expires_at and ma.expires_at <= datetime.utcnow():
+    if expires_at and expires_at <= datetime.utcnow():
         return False
     return True
 
 
+def active_access_filter(now: datetime | None = None):
+    """SQL condition matching grants that have not expired yet."""
+
+    now = now or datetime.utcnow()
+    return db.or_(ModuleAccess.expires_at.is_(None), ModuleAccess.expires_at > now)
+
+
 def can_view_module(user: Users | None, module: Module) -> bool:
     return bool(user)
 
@@ -55,6 +212,8 @@ def grant_access(module: Module, user: Users, granted_by_user: Users | None = No
         )
         db.session.add(row)
 
+    invalidate_cache(access_namespace(user.id))
+
     try:
         actor = getattr(granted_by_user, "id", None)
         current_app.logger.info(
@@ -69,3 +228,47 @@ def grant_access(module: Module, user: Users, granted_by_user: Users | None = No
 
 def revoke_access(module: Module, user_id: int) -> None:
     ModuleAccess.query.filter_by(module_id=module.id, user_id=user_id).delete()
+    invalidate_cache(access_namespace(user_id))
+
+
+def grant_team_access(module: Module, team_id: int, granted_by_user: Users | None = None, expires_at=None) -> None:
+    row = ModuleTeamAccess.query.filter_by(team_id=team_id, module_id=module.id).first()
+    if row:
+        row.expires_at = expires_at
+        row.granted_by = getattr(granted_by_user, "id", None)
+        row.granted_at = datetime.utcnow()
+    else:
+        db.session.add(
+            ModuleTeamAccess(
+                team_id=team_id,
+                module_id=module.id,
+                granted_by=getattr(granted_by_user, "id", None),
+                expires_at=expires_at,
+            )
+        )
+
+    invalidate_cache(team_access_namespace(team_id))
+
+    try:
+        current_app.logger.info(
+            "ctfd_modules: grant team access team_id=%s module_id=%s granted_by=%s",
+            team_id,
+            module.id,
+            getattr(granted_by_user, "id", None),
+        )
+    except Exception:
+        pass
+
+
+def revoke_team_access(module: Module, team_id: int) -> None:
+    ModuleTeamAccess.query.filter_by(module_id=module.id, team_id=team_id).delete()
+    invalidate_cache(team_access_namespace(team_id))
+
+
+def grant_invite_access(module: Module, user: Users) -> None:
+    """Invite-code join: grants the user's team in team mode, else the user."""
+    team_id = account_team_id(user)
+    if team_id:
+        grant_team_access(module, team_id, granted_by_user=None)
+    else:
+        grant_access(module, user, granted_by_user=None)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from flask import current_app
+
+from CTFd.models import Challenges, Solves, Teams, Users, db
+
+try:
+    from CTFd.utils.config import is_teams_mode
+except Exception:
+    is_teams_mode = None
+
+from ..models import ModuleChallenge
+from .cache import bump_cache_generation, cache_generation, cached
+from .index import challenge_module_index, challenge_values
+
+ANALYTICS_REFRESH_CONFIG_KEY = "CTFD_MODULES_ANALYTICS_REFRESH"
+ANALYTICS_REFRESH_DEFAULT = 300
+HISTOGRAM_BUCKETS = 10
+
+
+def analytics_refresh_interval() -> int:
+    try:
+        value = int(current_app.config.get(ANALYTICS_REFRESH_CONFIG_KEY) or ANALYTICS_REFRESH_DEFAULT)
+    except Exception:
+        value = ANALYTICS_REFRESH_DEFAULT
+    return max(10, value)
+
+
+def _teams_mode() -> bool:
+    try:
+        return bool(is_teams_mode and is_teams_mode())
+    except Exception:
+        return False
+
+
+def _weighted_median(counts: dict[int, int]) -> float:
+    """Median of a `{value: occurrences}` distribution."""
+    size = sum(counts.values())
+    if not size:
+        return 0
+    lower_rank = (size - 1) // 2
+    upper_rank = size // 2
+    lower = upper = None
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if lower is None and seen > lower_rank:
+            lower = value
+        if seen > upper_rank:
+            upper = value
+            break
+    return (lower + upper) / 2
+
+
+def _bucket(solved: int, total: int) -> int:
+    if not total:
+        return 0
+    return min(HISTOGRAM_BUCKETS - 1, (solved * HISTOGRAM_BUCKETS) // total)
+
+
+def _solve_distribution(teams: bool):
+    """`(module_id, solved, points, accounts)` rows, aggregated entirely in SQL.
+
+    The inner query groups visible, non-hidden solves per (module, account);
+    the outer one collapses identical (solved, points) pairs so the result is
+    bounded by the number of distinct scores, not by the number of players.
+    """
+    if teams:
+        account_col = Solves.team_id
+        account_model = Teams
+    else:
+        account_col = Solves.user_id
+        account_model = Users
+
+    q = (
+        db.session.query(
+            ModuleChallenge.module_id.label("module_id"),
+            account_col.label("account_id"),
+            db.func.count(Solves.id).label("solved"),
+            db.func.coalesce(db.func.sum(Challenges.value), 0).label("points"),
+        )
+        .join(ModuleChallenge, ModuleChallenge.challenge_id == Solves.challenge_id)
+        .join(Challenges, Challenges.id == Solves.challenge_id)
+        .join(account_model, account_model.id == account_col)
+        .filter(Challenges.state == "visible")
+        .filter(account_model.hidden.is_(False))
+        .filter(account_model.banned.is_(False))
+    )
+    if not teams:
+        q = q.filter(Users.type != "admin")
+    per_account = q.group_by(ModuleChallenge.module_id, account_col).subquery()
+
+    return (
+        db.session.query(
+            per_account.c.module_id,
+            per_account.c.solved,
+            per_account.c.points,
+            db.func.count(),
+        )
+        .group_by(per_account.c.module_id, per_account.c.solved, per_account.c.points)
+        .all()
+    )
+
+
+def _eligible_accounts(teams: bool) -> int:
+    if teams:
+        q = db.session.query(db.func.count(Teams.id))
+        q = q.filter(Teams.hidden.is_(False)).filter(Teams.banned.is_(False))
+    else:
+        q = db.session.query(db.func.count(Users.id))
+        q = q.filter(Users.hidden.is_(False)).filter(Users.banned.is_(False)).filter(Users.type != "admin")
+    return q.scalar() or 0
+
+
+def _build_module_analytics() -> dict:
+    teams = _teams_mode()
+
+    totals: dict[int, tuple[int, int]] = {}
+    index = challenge_module_index()
+    values = challenge_values()
+    for module_id in index.module_ids():
+        visible = [value for _, value, is_visible in index.rows_of(module_id, values) if is_visible]
+        totals[module_id] = (len(visible), sum(visible))
+
+    stats: dict[int, dict] = {}
+    for module_id, solved, points, accounts in _solve_distribution(teams):
+        total, _ = totals.get(module_id, (0, 0))
+        entry = stats.setdefault(
+            module_id,
+            {"participants": 0, "completed": 0, "histogram": [0] * HISTOGRAM_BUCKETS, "solves": {}, "points": {}},
+        )
+        solved = int(solved or 0)
+        points = int(points or 0)
+        accounts = int(accounts or 0)
+        entry["participants"] += accounts
+        if total and solved >= total:
+            entry["completed"] += accounts
+        entry["histogram"][_bucket(solved, total)] += accounts
+        entry["solves"][solved] = entry["solves"].get(solved, 0) + accounts
+        entry["points"][points] = entry["points"].get(points, 0) + accounts
+
+    modules = {}
+    for module_id in set(totals) | set(stats):
+        total, points_total = totals.get(module_id, (0, 0))
+        entry = stats.get(module_id)
+        modules[module_id] = {
+            "challenges": total,
+            "points_total": points_total,
+            "participants": entry["participants"] if entry else 0,
+            "completed": entry["completed"] if entry else 0,
+            "histogram": entry["histogram"] if entry else [0] * HISTOGRAM_BUCKETS,
+            "median_solves": _weighted_median(entry["solves"]) if entry else 0,
+            "median_points": _weighted_median(entry["points"]) if entry else 0,
+        }
+
+    return {
+        "mode": "teams" if teams else "users",
+        "accounts": _eligible_accounts(teams),
+        "buckets": HISTOGRAM_BUCKETS,
+        "generated_at": datetime.utcnow().isoformat(),
+        "modules": modules,
+    }
+
+
+def module_analytics() -> dict:
+    """Per-module participation and completion stats for the admin dashboard.
+
+    Solves are not tracked by a generation here, so results are refreshed on
+    the `CTFD_MODULES_ANALYTICS_REFRESH` interval (or by `refresh_module_analytics`).
+    """
+    return cached(
+        "analytics",
+        ("modules", cache_generation("links"), cache_generation("challenges")),
+        _build_module_analytics,
+        ttl=analytics_refresh_interval(),
+    )
+
+
+def refresh_module_analytics() -> None:
+    bump_cache_generation("analytics")
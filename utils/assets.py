@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, request, send_from_directory
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+STATIC_URL_PREFIX = "/plugins/ctfd_modules/static"
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_EXTENSIONS = (".js", ".css", ".svg", ".json", ".html", ".txt")
+COMPRESS_MIN_SIZE = 512
+
+
+class StaticAsset:
+    """A static file held in memory with its content hash and encoded variants."""
+
+    __slots__ = ("digest", "mimetype", "variants")
+
+    def __init__(self, digest: str, mimetype: str, variants: dict[str, bytes]):
+        self.digest = digest
+        self.mimetype = mimetype
+        # {"identity": raw, "gzip": ..., "br": ...}; only variants smaller than raw.
+        self.variants = variants
+
+
+_manifest: dict[str, StaticAsset] = {}
+
+
+def _encode_variants(filename: str, raw: bytes) -> dict[str, bytes]:
+    variants = {"identity": raw}
+    if not filename.endswith(COMPRESSIBLE_EXTENSIONS) or len(raw) < COMPRESS_MIN_SIZE:
+        return variants
+
+    packed = gzip.compress(raw, compresslevel=9, mtime=0)
+    if len(packed) < len(raw):
+        variants["gzip"] = packed
+    if brotli is not None:
+        try:
+            packed = brotli.compress(raw, quality=11)
+        except Exception:
+            packed = raw
+        if len(packed) < len(raw):
+            variants["br"] = packed
+    return variants
+
+
+def build_asset_manifest(static_dir: str = STATIC_DIR) -> dict[str, StaticAsset]:
+    """Hash and precompress every file under `static/`; called once at plugin load."""
+    manifest: dict[str, StaticAsset] = {}
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            filename = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            try:
+                with open(path, "rb") as handle:
+                    raw = handle.read()
+            except OSError:
+                continue
+            mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            manifest[filename] = StaticAsset(
+                hashlib.sha256(raw).hexdigest()[:16],
+                mimetype,
+                _encode_variants(filename, raw),
+            )
+
+    _manifest.clear()
+    _manifest.update(manifest)
+    return manifest
+
+
+def asset_url(filename: str) -> str:
+    """Fingerprinted URL for a static file, e.g. `.../js/x.js?v=<hash>`."""
+    filename = filename.lstrip("/")
+    asset = _manifest.get(filename)
+    if asset is None:
+        return f"{STATIC_URL_PREFIX}/{filename}"
+    return f"{STATIC_URL_PREFIX}/{filename}?v={asset.digest}"
+
+
+def _preferred_encoding(asset: StaticAsset) -> str:
+    accepted = request.accept_encodings
+    for encoding in ("br", "gzip"):
+        if encoding in asset.variants and accepted[encoding]:
+            return encoding
+    return "identity"
+
+
+def asset_response(filename: str, static_dir: str = STATIC_DIR):
+    """Serve a static file from the manifest, negotiating gzip/brotli.
+
+    Requests carrying the current `?v=` hash are cached for a year as
+    immutable; anything else revalidates against the content-hash ETag.
+    Files missing from the manifest (added after load) go through
+    `send_from_directory` as before.
+    """
+    asset = _manifest.get(filename)
+    if asset is None:
+        return send_from_directory(static_dir, filename)
+
+    encoding = _preferred_encoding(asset)
+    response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    if len(asset.variants) > 1:
+        response.vary.add("Accept-Encoding")
+    response.set_etag(asset.digest if encoding == "identity" else f"{asset.digest}-{encoding}")
+
+    if request.args.get("v") == asset.digest:
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+    return response.make_conditional(request)
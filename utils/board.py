@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from flask import url_for
+
+from CTFd.models import Challenges, Solves, Tags, Teams, Users, db
+
+from .cache import bump_cache_generation, cache_generation, cached
+from .index import challenge_module_index
+from .progress import account_solved_ids
+from .scores import freeze_cutoff
+
+# Query arguments the scoped board understands; anything else (search, admin
+# view, ...) is left to the core endpoint.
+MODULE_BOARD_ARGS = frozenset({"ctfd_modules", "module_id"})
+
+
+def _solve_count_default():
+    """0 when solve counts are public, None when CTFd hides them."""
+    try:
+        from CTFd.utils.config.visibility import accounts_visible, scores_visible  # type: ignore
+
+        return 0 if scores_visible() and accounts_visible() else None
+    except Exception:
+        return 0
+
+
+def _public_solves_filter(query, account_model, account_col):
+    """Restrict a Solves query to visible accounts and, when frozen, to pre-freeze solves."""
+    query = (
+        query.join(account_model, account_model.id == account_col)
+        .filter(account_model.banned.is_(False))
+        .filter(account_model.hidden.is_(False))
+    )
+    cutoff = freeze_cutoff()
+    if cutoff is not None:
+        query = query.filter(Solves.date < cutoff)
+    return query
+
+
+def _solves_account():
+    from CTFd.utils.config import is_teams_mode  # type: ignore
+
+    if is_teams_mode():
+        return Teams, Solves.team_id, "teams.public", "team_id"
+    return Users, Solves.user_id, "users.public", "user_id"
+
+
+def _solve_counts(challenge_ids: list[int]) -> dict[int, int]:
+    """Per-challenge solve counts for these ids, excluding hidden/banned accounts and frozen solves."""
+    account_model, account_col, _, _ = _solves_account()
+    q = db.session.query(Solves.challenge_id, db.func.count(Solves.challenge_id))
+    q = _public_solves_filter(q, account_model, account_col).filter(Solves.challenge_id.in_(challenge_ids))
+    return {cid: count for cid, count in q.group_by(Solves.challenge_id).all()}
+
+
+def challenge_solves_namespace(challenge_id: int) -> str:
+    return f"solves:challenge:{challenge_id}"
+
+
+def invalidate_account_solve_lists(account: tuple[str, int] | None) -> int:
+    """Drop the cached solves lists that show this account; returns how many.
+
+    Used when an account renames itself: only the lists of challenges it
+    solved carry its name. Admin edits (hide, ban, delete) bump the shared
+    `solves` generation instead.
+    """
+    if account is None:
+        return 0
+    account_type, account_id = account
+    account_col = Solves.team_id if account_type == "team" else Solves.user_id
+    challenge_ids = [cid for (cid,) in db.session.query(Solves.challenge_id).filter(account_col == account_id).all()]
+    if challenge_ids:
+        bump_cache_generation(*(challenge_solves_namespace(cid) for cid in challenge_ids))
+    return len(challenge_ids)
+
+
+def challenge_solves(challenge_id: int) -> list[dict]:
+    """Public solves of a challenge, oldest first, in the core `/solves` row shape.
+
+    Shared by every viewer: cached per challenge until it is solved again
+    (or admins edit solves/challenges), so popular challenges are listed
+    from the cache instead of re-joining thousands of rows per modal open.
+    """
+
+    def _load():
+        account_model, account_col, endpoint, arg = _solves_account()
+        q = db.session.query(account_col, account_model.name, Solves.date)
+        q = _public_solves_filter(q, account_model, account_col).filter(Solves.challenge_id == challenge_id)
+        return [
+            {
+                "account_id": account_id,
+                "name": name,
+                "date": date.isoformat() + "Z" if date else None,
+                "account_url": url_for(endpoint, **{arg: account_id}),
+            }
+            for account_id, name, date in q.order_by(Solves.date.asc(), Solves.id.asc()).all()
+        ]
+
+    return cached(
+        challenge_solves_namespace(challenge_id),
+        ("list", cache_generation("solves")),
+        _load,
+    )
+
+
+def module_board(module_id: int, user, hidden: bytes) -> list[dict]:
+    """The `/api/v1/challenges` payload restricted to one module.
+
+    Mirrors the core listing (state filter, prerequisite anonymization,
+    solve counts, tags, type templates) but only loads, evaluates and
+    serializes the module's own challenges. `hidden` is the account's
+    hidden-challenge bitset from `utils.visibility`.
+    """
+    from CTFd.plugins.challenges import get_chal_class  # type: ignore
+
+    from .visibility import bitset_contains
+
+    challenge_ids = [
+        cid for cid in challenge_module_index().challenges_of(module_id) if not bitset_contains(hidden, cid)
+    ]
+    if not challenge_ids:
+        return []
+
+    challenges = (
+        Challenges.query.filter(Challenges.id.in_(challenge_ids))
+        .filter(Challenges.state != "hidden")
+        .filter(Challenges.state != "locked")
+        .order_by(Challenges.value.asc(), Challenges.id.asc())
+        .all()
+    )
+    if not challenges:
+        return []
+
+    user_solves = account_solved_ids(user) if user else frozenset()
+
+    prereq_ids = set()
+    for challenge in challenges:
+        if challenge.requirements:
+            prereq_ids.update(challenge.requirements.get("prerequisites", []))
+    existing_prereqs = set()
+    if prereq_ids:
+        existing_prereqs = {
+            cid for (cid,) in db.session.query(Challenges.id).filter(Challenges.id.in_(prereq_ids)).all()
+        }
+
+    solve_count_default = _solve_count_default()
+    solve_counts = _solve_counts([c.id for c in challenges]) if solve_count_default is not None else {}
+
+    tags: dict[int, list[dict]] = {}
+    for cid, value in (
+        db.session.query(Tags.challenge_id, Tags.value).filter(Tags.challenge_id.in_([c.id for c in challenges])).all()
+    ):
+        tags.setdefault(cid, []).append({"value": value})
+
+    data = []
+    for challenge in challenges:
+        if challenge.requirements:
+            prereqs = set(challenge.requirements.get("prerequisites", [])) & existing_prereqs
+            if not user_solves >= prereqs:
+                if challenge.requirements.get("anonymize"):
+                    data.append(
+                        {
+                            "id": challenge.id,
+                            "type": "hidden",
+                            "name": "???",
+                            "value": 0,
+                            "solves": None,
+                            "solved_by_me": False,
+                            "category": "???",
+                            "tags": [],
+                            "template": "",
+                            "script": "",
+                        }
+                    )
+                continue
+
+        try:
+            challenge_type = get_chal_class(challenge.type)
+        except KeyError:
+            continue
+
+        data.append(
+            {
+                "id": challenge.id,
+                "type": challenge_type.name,
+                "name": challenge.name,
+                "value": challenge.value,
+                "solves": solve_counts.get(challenge.id, solve_count_default),
+                "solved_by_me": challenge.id in user_solves,
+                "category": challenge.category,
+                "tags": tags.get(challenge.id, []),
+                "template": challenge_type.templates["view"],
+                "script": challenge_type.scripts["view"],
+            }
+        )
+    return data
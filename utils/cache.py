@@ -0,0 +1,594 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context
+
+from CTFd.models import db
+
+CACHE_PREFIX = "ctfd_modules"
+
+CACHE_BACKEND_CONFIG_KEY = "CTFD_MODULES_CACHE_BACKEND"
+CACHE_BACKEND_ALLOWED = ("auto", "ctfd", "local")
+CACHE_MAX_ENTRIES_CONFIG_KEY = "CTFD_MODULES_CACHE_MAX_ENTRIES"
+CACHE_MAX_ENTRIES_DEFAULT = 4096
+
+CACHE_TTL_DEFAULT = 3600
+# Generation bumps do the invalidation; TTLs only bound how long unused or
+# per-account entries linger in the store.
+CACHE_TTLS: dict[str, int] = {
+    "settings": 3600,
+    "modules": 3600,
+    "links": 3600,
+    "challenges": 3600,
+    "challenge_values": 3600,
+    "access": 900,
+    "groups": 900,
+    "solves": 300,
+}
+
+# Single-flight: how long a cross-worker rebuild lock lives, and how long a
+# worker with nothing stale to serve waits for another worker's result.
+SINGLE_FLIGHT_LOCK_TTL = 30
+SINGLE_FLIGHT_WAIT = 2.0
+SINGLE_FLIGHT_POLL = 0.05
+
+_PENDING_INVALIDATIONS_KEY = "ctfd_modules_pending_invalidations"
+_MISSING = object()
+
+# How long a generation reserved for an upcoming change stays claimable.
+RESERVED_GENERATION_TTL = 600
+
+# Per-account and per-challenge generations ("solves:user:5", "access:7", ...)
+# expire so entities nobody looks at any more do not pile up in the store;
+# shared namespaces ("modules", "links", ...) are kept until evicted.
+ENTITY_GENERATION_TTL = 86400
+
+
+class LocalCacheBackend:
+    """In-process LRU with per-key TTLs (Flask-Caching-like interface)."""
+
+    shared = False
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES_DEFAULT):
+        self.max_entries = max(16, int(max_entries or CACHE_MAX_ENTRIES_DEFAULT))
+        self._data: OrderedDict[str, tuple[float | None, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires, value = entry
+        if expires is not None and expires <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value, timeout: int | None) -> None:
+        expires = time.monotonic() + timeout if timeout else None
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._lookup(key)
+        return None if value is _MISSING else value
+
+    def set(self, key: str, value, timeout: int | None = None) -> bool:
+        with self._lock:
+            self._store(key, value, timeout)
+        return True
+
+    def add(self, key: str, value, timeout: int | None = None) -> bool:
+        with self._lock:
+            if self._lookup(key) is not _MISSING:
+                return False
+            self._store(key, value, timeout)
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class FlaskCacheBackend:
+    """Adapter over CTFd's Flask-Caching instance (Redis in production)."""
+
+    shared = True
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get(self, key: str):
+        return self.cache.get(key)
+
+    def set(self, key: str, value, timeout: int | None = None) -> bool:
+        return bool(self.cache.set(key, value, timeout=timeout or 0))
+
+    def add(self, key: str, value, timeout: int | None = None) -> bool:
+        return bool(self.cache.add(key, value, timeout=timeout or 0))
+
+    def delete(self, key: str) -> bool:
+        return bool(self.cache.delete(key))
+
+
+_backend = None
+# L1 in front of a shared backend: skips the network round trip and unpickling
+# for hot keys. Doubles as the whole store for the "local" backend.
+_local_values = LocalCacheBackend()
+_build_locks: dict[str, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+
+
+def _ctfd_cache():
+    try:
+        from CTFd.cache import cache  # type: ignore
+
+        # Flask-Caching without an initialised backend has no `.cache`.
+        if getattr(cache, "cache", None) is None:
+            return None
+        return cache
+    except Exception:
+        return None
+
+
+def _app_config(key: str, default=None):
+    if not has_app_context():
+        return default
+    try:
+        return current_app.config.get(key, default)
+    except Exception:
+        return default
+
+
+def set_cache_backend(backend) -> None:
+    """Install a backend exposing get/set/add/delete (e.g. a fakeredis adapter).
+
+    Passing None re-runs backend selection from the app config.
+    """
+
+    global _backend
+    _backend = backend
+    _local_values.clear()
+
+
+def get_cache_backend():
+    global _backend
+
+    if _backend is not None:
+        return _backend
+
+    choice = str(_app_config(CACHE_BACKEND_CONFIG_KEY, "auto") or "auto").strip().lower()
+    if choice not in CACHE_BACKEND_ALLOWED:
+        choice = "auto"
+
+    try:
+        _local_values.max_entries = max(
+            16, int(_app_config(CACHE_MAX_ENTRIES_CONFIG_KEY, CACHE_MAX_ENTRIES_DEFAULT))
+        )
+    except Exception:
+        pass
+
+    backend = None
+    if choice in ("auto", "ctfd"):
+        cache = _ctfd_cache()
+        if cache is not None:
+            backend = FlaskCacheBackend(cache)
+    if backend is None:
+        # Generations are per-process here: only safe with a single worker.
+        backend = _local_values
+
+    if has_app_context():
+        _backend = backend
+    return backend
+
+
+def cache_ttl(namespace: str | tuple[str, ...]) -> int:
+    if isinstance(namespace, tuple):
+        return min(cache_ttl(ns) for ns in namespace)
+    return CACHE_TTLS.get(namespace.split(":", 1)[0], CACHE_TTL_DEFAULT)
+
+
+def _generation_key(namespace: str) -> str:
+    return f"{CACHE_PREFIX}:gen:{namespace}"
+
+
+def _generation_timeout(namespace: str) -> int:
+    return ENTITY_GENERATION_TTL if ":" in namespace else 0
+
+
+def _value_key(namespace, key, generation) -> str:
+    if isinstance(namespace, tuple):
+        namespace = "+".join(namespace)
+        generation = ".".join(str(part) for part in generation)
+    return f"{CACHE_PREFIX}:v:{namespace}:{generation}:{key}"
+
+
+# Per-thread generation overrides installed by `preview_generation`.
+_preview = threading.local()
+
+
+def _request_generations() -> dict[str, int] | None:
+    if not has_app_context():
+        return None
+    try:
+        memo = getattr(g, "ctfd_modules_generations", None)
+        if memo is None:
+            memo = {}
+            g.ctfd_modules_generations = memo
+        return memo
+    except Exception:
+        return None
+
+
+def cache_generation(namespace: str) -> int:
+    """Return the current generation token for `namespace`.
+
+    Generations live in the cache backend so a bump in one worker invalidates
+    the derived data in every worker. Reads are memoized for the current request.
+    """
+
+    overrides = getattr(_preview, "generations", None)
+    if overrides and namespace in overrides:
+        return overrides[namespace]
+
+    memo = _request_generations()
+    if memo is not None and namespace in memo:
+        return memo[namespace]
+
+    backend = get_cache_backend()
+    key = _generation_key(namespace)
+    try:
+        value = backend.get(key)
+        if value is None:
+            # Missing or evicted: start a fresh token rather than reusing an old one,
+            # otherwise values stored under a previous token could be served again.
+            backend.add(key, time.time_ns(), timeout=_generation_timeout(namespace))
+            value = backend.get(key)
+        value = int(value or 0)
+    except Exception:
+        value = 0
+
+    if memo is not None:
+        memo[namespace] = value
+    return value
+
+
+def bump_cache_generation(*namespaces: str) -> None:
+    """Invalidate everything derived from `namespaces` immediately."""
+
+    backend = get_cache_backend()
+    memo = _request_generations()
+    for namespace in namespaces:
+        # A time-based token never collides with a concurrent bump the way a
+        # read-increment-write counter could.
+        token = time.time_ns()
+        try:
+            backend.set(_generation_key(namespace), token, timeout=_generation_timeout(namespace))
+        except Exception:
+            pass
+        if memo is not None:
+            memo[namespace] = token
+
+
+def _reserved_generation_key(namespace: str) -> str:
+    return f"{CACHE_PREFIX}:gen_next:{namespace}"
+
+
+def reserve_cache_generation(namespace: str, tag, ttl: int = RESERVED_GENERATION_TTL) -> int:
+    """Pick the token `namespace` moves to once the change identified by `tag` commits.
+
+    Caches built under `preview_generation(namespace, token)` are then already
+    warm when `advance_cache_generation(namespace, tag)` publishes the token.
+    Workers reserving the same `tag` from the same base generation share a token.
+    """
+
+    backend = get_cache_backend()
+    key = _reserved_generation_key(namespace)
+    base = cache_generation(namespace)
+    entry = (tag, base, time.time_ns())
+    try:
+        if not backend.add(key, entry, timeout=ttl):
+            current = backend.get(key)
+            if current is not None and current[0] == tag and current[1] == base:
+                return current[2]
+            backend.set(key, entry, timeout=ttl)
+    except Exception:
+        pass
+    return entry[2]
+
+
+def discard_reserved_generation(namespace: str) -> None:
+    try:
+        get_cache_backend().delete(_reserved_generation_key(namespace))
+    except Exception:
+        pass
+
+
+def advance_cache_generation(namespace: str, tag) -> bool:
+    """Bump `namespace` now, to the token reserved for `tag` when there is one.
+
+    The reservation is only honoured if nothing else bumped the namespace
+    since it was made (otherwise the pre-built values predate that change);
+    returns True when the reserved, pre-warmed generation was published.
+    """
+
+    backend = get_cache_backend()
+    entry = _backend_get(backend, _reserved_generation_key(namespace))
+    discard_reserved_generation(namespace)
+
+    current = _backend_get(backend, _generation_key(namespace))
+    if entry is None or entry[0] != tag or current is None or int(current) != entry[1]:
+        bump_cache_generation(namespace)
+        return False
+
+    token = entry[2]
+    try:
+        backend.set(_generation_key(namespace), token, timeout=_generation_timeout(namespace))
+    except Exception:
+        bump_cache_generation(namespace)
+        return False
+    memo = _request_generations()
+    if memo is not None:
+        memo[namespace] = token
+    return True
+
+
+@contextmanager
+def preview_generation(namespace: str, token: int):
+    """Build caches in this thread as if `namespace` were already at `token`.
+
+    Stale copies are neither read nor written meanwhile, so previewed values
+    never leak to readers of the current generation.
+    """
+
+    previous = getattr(_preview, "generations", None)
+    _preview.generations = dict(previous or {}, **{namespace: token})
+    try:
+        yield
+    finally:
+        _preview.generations = previous
+
+
+def invalidate_cache(*namespaces: str) -> None:
+    """Bump `namespaces` once the current DB transaction commits.
+
+    Bumping before the commit would let another worker rebuild from the old
+    rows and store them under the new generation.
+    """
+
+    try:
+        pending = db.session.info.setdefault(_PENDING_INVALIDATIONS_KEY, set())
+        pending.update(namespaces)
+    except Exception:
+        bump_cache_generation(*namespaces)
+
+
+def _flush_pending_invalidations(session) -> None:
+    pending = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    if pending:
+        bump_cache_generation(*sorted(pending))
+
+
+def _discard_pending_invalidations(session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+
+
+def register_cache_invalidation_hooks() -> None:
+    from sqlalchemy import event
+
+    try:
+        target = db.session
+        if not event.contains(target, "after_commit", _flush_pending_invalidations):
+            event.listen(target, "after_commit", _flush_pending_invalidations)
+            event.listen(target, "after_rollback", _discard_pending_invalidations)
+    except Exception:
+        pass
+
+
+def _build_lock(key: str) -> threading.Lock:
+    with _build_locks_guard:
+        lock = _build_locks.get(key)
+        if lock is None:
+            if len(_build_locks) > 4 * _local_values.max_entries:
+                _build_locks.clear()
+            lock = threading.Lock()
+            _build_locks[key] = lock
+        return lock
+
+
+def _stale_key(namespace, key) -> str:
+    if isinstance(namespace, tuple):
+        namespace = "+".join(namespace)
+    return f"{CACHE_PREFIX}:stale:{namespace}:{key}"
+
+
+def _backend_get(backend, key: str):
+    try:
+        return backend.get(key)
+    except Exception:
+        return None
+
+
+def _wait_for_shared_value(backend, value_key: str):
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(SINGLE_FLIGHT_POLL)
+        entry = _backend_get(backend, value_key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def cached(
+    namespace: str | tuple[str, ...],
+    key,
+    builder: Callable[[], object],
+    ttl: int | None = None,
+    allow_stale: bool = True,
+):
+    """Return `builder()` cached until any of `namespace` is bumped.
+
+    Lookup order: in-process L1, then the configured backend. A miss is
+    rebuilt by a single caller: threads in a worker share a lock and workers
+    share an `add()`-based lock in the backend. Everyone else gets the previous
+    generation's value while the rebuild runs (unless `allow_stale` is False),
+    or waits briefly for the winner's result when there is nothing to serve.
+    """
+
+    if isinstance(namespace, tuple):
+        generation = tuple(cache_generation(ns) for ns in namespace)
+    else:
+        generation = cache_generation(namespace)
+
+    ttl = ttl if ttl is not None else cache_ttl(namespace)
+    value_key = _value_key(namespace, key, generation)
+    stale_key = _stale_key(namespace, key)
+    previewing = bool(getattr(_preview, "generations", None))
+    if previewing:
+        allow_stale = False
+
+    # Values are wrapped in a 1-tuple so a cached None/empty result is a hit.
+    entry = _local_values.get(value_key)
+    if entry is not None:
+        return entry[0]
+
+    backend = get_cache_backend()
+    shared = bool(getattr(backend, "shared", False))
+
+    if shared:
+        entry = _backend_get(backend, value_key)
+        if entry is not None:
+            _local_values.set(value_key, entry, timeout=ttl)
+            return entry[0]
+
+    lock = _build_lock(value_key)
+    if not lock.acquire(blocking=False):
+        stale = _local_values.get(stale_key) if allow_stale else None
+        if stale is not None:
+            return stale[0]
+        lock.acquire()
+
+    try:
+        entry = _local_values.get(value_key)
+        if entry is not None:
+            return entry[0]
+
+        lock_key = f"{CACHE_PREFIX}:lock:{value_key}"
+        holds_shared_lock = False
+        if shared:
+            try:
+                holds_shared_lock = bool(backend.add(lock_key, 1, timeout=SINGLE_FLIGHT_LOCK_TTL))
+            except Exception:
+                holds_shared_lock = True
+
+            if not holds_shared_lock:
+                # Another worker is rebuilding this key.
+                if allow_stale:
+                    stale = _local_values.get(stale_key) or _backend_get(backend, stale_key)
+                    if stale is not None:
+                        return stale[0]
+                entry = _wait_for_shared_value(backend, value_key)
+                if entry is not None:
+                    _local_values.set(value_key, entry, timeout=ttl)
+                    return entry[0]
+
+        try:
+            entry = (builder(),)
+            _local_values.set(value_key, entry, timeout=ttl)
+            if not previewing:
+                _local_values.set(stale_key, entry, timeout=ttl)
+            if shared:
+                try:
+                    backend.set(value_key, entry, timeout=ttl)
+                    if not previewing:
+                        backend.set(stale_key, entry, timeout=ttl)
+                except Exception:
+                    pass
+            return entry[0]
+        finally:
+            if holds_shared_lock:
+                try:
+                    backend.delete(lock_key)
+                except Exception:
+                    pass
+    finally:
+        lock.release()
+
+
+# name -> callable that rebuilds one cached structure for the current generation
+_warmers: dict[str, Callable[[], object]] = {}
+
+
+def register_cache_warmer(name: str, fn: Callable[[], object]) -> None:
+    _warmers[name] = fn
+
+
+def warm_caches(rollback_on_error: bool = True) -> dict[str, bool]:
+    """Run every registered warmer; returns `{name: succeeded}`.
+
+    With `rollback_on_error=False` the session is left alone after a failure
+    (callers warming uncommitted state decide themselves).
+    """
+
+    results: dict[str, bool] = {}
+    for name, fn in list(_warmers.items()):
+        try:
+            fn()
+            results[name] = True
+        except Exception:
+            if rollback_on_error:
+                try:
+                    db.session.rollback()
+                except Exception:
+                    pass
+            results[name] = False
+    return results
+
+
+_warmed_generation: int | None = None
+
+
+def warm_caches_in_background(app) -> None:
+    def _run():
+        with app.app_context():
+            try:
+                warm_caches()
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=_run, name="ctfd-modules-cache-warm", daemon=True).start()
+
+
+def request_cache_warmup() -> None:
+    """Ask every worker to rebuild its caches (picked up on its next request)."""
+
+    bump_cache_generation("warmup")
+
+
+def warm_caches_if_requested(app) -> bool:
+    """Warm this worker in the background on first use and after each warm-up request.
+
+    Runs off the request thread so the request that notices it is not slowed.
+    """
+
+    global _warmed_generation
+
+    generation = cache_generation("warmup")
+    if generation == _warmed_generation:
+        return False
+    _warmed_generation = generation
+    warm_caches_in_background(app)
+    return True
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from flask import current_app
+
+from CTFd.models import Users, db
+
+from ..models import Module, ModuleGroup, ModuleGroupAccess, ModuleGroupMember
+from .cache import invalidate_cache
+
+
+def parse_user_ids(raw) -> list[int]:
+    """Parse a free-form list of user ids (commas, spaces or newlines)."""
+    ids: list[int] = []
+    for part in str(raw or "").replace(",", " ").split():
+        try:
+            user_id = int(part)
+        except Exception:
+            continue
+        if user_id > 0:
+            ids.append(user_id)
+    return list(dict.fromkeys(ids))
+
+
+def add_group_members(group: ModuleGroup, user_ids) -> int:
+    """Add existing users to a group with one bulk insert; returns rows added."""
+    user_ids = list(dict.fromkeys(int(uid) for uid in user_ids or ()))
+    if not user_ids:
+        return 0
+
+    valid = {uid for (uid,) in db.session.query(Users.id).filter(Users.id.in_(user_ids)).all()}
+    present = {
+        uid
+        for (uid,) in db.session.query(ModuleGroupMember.user_id)
+        .filter(ModuleGroupMember.group_id == group.id)
+        .filter(ModuleGroupMember.user_id.in_(user_ids))
+        .all()
+    }
+    now = datetime.utcnow()
+    rows = [
+        {"group_id": group.id, "user_id": uid, "added_at": now}
+        for uid in user_ids
+        if uid in valid and uid not in present
+    ]
+    if rows:
+        db.session.execute(ModuleGroupMember.__table__.insert(), rows)
+        invalidate_cache("groups")
+    return len(rows)
+
+
+def remove_group_member(group: ModuleGroup, user_id: int) -> None:
+    ModuleGroupMember.query.filter_by(group_id=group.id, user_id=user_id).delete()
+    invalidate_cache("groups")
+
+
+def grant_group_access(module: Module, group: ModuleGroup, granted_by_user=None, expires_at=None) -> None:
+    row = ModuleGroupAccess.query.filter_by(group_id=group.id, module_id=module.id).first()
+    if row:
+        row.expires_at = expires_at
+        row.granted_by = getattr(granted_by_user, "id", None)
+        row.granted_at = datetime.utcnow()
+    else:
+        db.session.add(
+            ModuleGroupAccess(
+                group_id=group.id,
+                module_id=module.id,
+                granted_by=getattr(granted_by_user, "id", None),
+                expires_at=expires_at,
+            )
+        )
+    invalidate_cache("groups")
+
+    try:
+        current_app.logger.info(
+            "ctfd_modules: grant group access group_id=%s module_id=%s granted_by=%s",
+            group.id,
+            module.id,
+            getattr(granted_by_user, "id", None),
+        )
+    except Exception:
+        pass
+
+
+def revoke_group_access(module: Module, group_id: int) -> None:
+    ModuleGroupAccess.query.filter_by(module_id=module.id, group_id=group_id).delete()
+    invalidate_cache("groups")
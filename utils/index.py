@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+
+from CTFd.models import Challenges, db
+
+from ..models import Module, ModuleChallenge, ModuleStatus
+from .cache import cached, register_cache_warmer
+
+# Integer module status codes used by the array-backed read models.
+STATUS_PUBLIC = 0
+STATUS_PRIVATE = 1
+STATUS_LOCKED = 2
+STATUS_CODES = {
+    ModuleStatus.public: STATUS_PUBLIC,
+    ModuleStatus.private: STATUS_PRIVATE,
+    ModuleStatus.locked: STATUS_LOCKED,
+}
+
+_EMPTY = array("I")
+
+
+def status_code(status) -> int:
+    try:
+        return STATUS_CODES[ModuleStatus(status)]
+    except Exception:
+        return STATUS_LOCKED
+
+
+def _sparse_offsets(keys: array) -> tuple[array, array]:
+    """CSR offsets over the distinct ids of a sorted key column.
+
+    Returns `(ids, offsets)`: rows of `ids[i]` are `[offsets[i], offsets[i + 1])`.
+    Memory follows the number of linked ids, not the largest id.
+    """
+    ids = array("I")
+    offsets = array("I")
+    previous = None
+    for position, key in enumerate(keys):
+        if key != previous:
+            ids.append(key)
+            offsets.append(position)
+            previous = key
+    offsets.append(len(keys))
+    return ids, offsets
+
+
+class ChallengeModuleIndex:
+    """Immutable challenge <-> module link index in compressed-sparse-row form.
+
+    Both directions are flat `array`s sorted by the owning id, with the
+    distinct ids and their row offsets kept side by side. Lookups are a
+    binary search plus a slice, and a catalog of thousands of links costs a
+    handful of buffers instead of per-link tuples, whatever the id range.
+    """
+
+    __slots__ = (
+        "_challenge_ids",
+        "_c_offsets",
+        "_c_modules",
+        "_c_status",
+        "_module_ids",
+        "_m_offsets",
+        "_m_challenges",
+        "_m_visible",
+        "_m_status",
+    )
+
+    def __init__(self, rows):
+        # rows: (challenge_id, module_id, status_code, visible)
+        by_challenge = sorted(rows, key=lambda row: (row[0], row[1]))
+        by_module = sorted(rows, key=lambda row: (row[1], row[0]))
+
+        challenge_keys = array("I", (row[0] for row in by_challenge))
+        module_keys = array("I", (row[1] for row in by_module))
+
+        self._challenge_ids, self._c_offsets = _sparse_offsets(challenge_keys)
+        self._c_modules = array("I", (row[1] for row in by_challenge))
+        self._c_status = array("B", (row[2] for row in by_challenge))
+
+        self._module_ids, self._m_offsets = _sparse_offsets(module_keys)
+        self._m_challenges = array("I", (row[0] for row in by_module))
+        self._m_visible = array("B", (row[3] for row in by_module))
+
+        # One status per module, aligned with `_module_ids`.
+        self._m_status = array("B", (by_module[start][2] for start in self._m_offsets[:-1]))
+
+    @staticmethod
+    def _position(ids: array, key: int) -> int:
+        position = bisect_left(ids, key)
+        if position < len(ids) and ids[position] == key:
+            return position
+        return -1
+
+    def _span(self, ids: array, offsets: array, key: int) -> tuple[int, int]:
+        position = self._position(ids, key)
+        if position < 0:
+            return 0, 0
+        return offsets[position], offsets[position + 1]
+
+    def __contains__(self, challenge_id) -> bool:
+        if not isinstance(challenge_id, int):
+            return False
+        return self._position(self._challenge_ids, challenge_id) >= 0
+
+    def __len__(self) -> int:
+        return len(self._challenge_ids)
+
+    def challenge_ids(self) -> array:
+        """Sorted ids of every challenge linked to at least one module."""
+        return self._challenge_ids
+
+    def module_ids(self) -> array:
+        """Sorted ids of every module with at least one linked challenge."""
+        return self._module_ids
+
+    def modules_of(self, challenge_id: int) -> array:
+        start, end = self._span(self._challenge_ids, self._c_offsets, challenge_id)
+        return self._c_modules[start:end] if end > start else _EMPTY
+
+    def links_of(self, challenge_id: int) -> list[tuple[int, int]]:
+        """`[(module_id, status_code), ...]` for a challenge."""
+        start, end = self._span(self._challenge_ids, self._c_offsets, challenge_id)
+        return list(zip(self._c_modules[start:end], self._c_status[start:end]))
+
+    def status_of(self, module_id: int) -> int:
+        position = self._position(self._module_ids, module_id)
+        return self._m_status[position] if position >= 0 else STATUS_LOCKED
+
+    def challenges_of(self, module_id: int) -> array:
+        start, end = self._span(self._module_ids, self._m_offsets, module_id)
+        return self._m_challenges[start:end] if end > start else _EMPTY
+
+    def rows_of(self, module_id: int, values: dict[int, int]) -> list[tuple[int, int, bool]]:
+        """`[(challenge_id, value, visible), ...]` for a module, values from `challenge_values()`."""
+        start, end = self._span(self._module_ids, self._m_offsets, module_id)
+        return [
+            (cid, values.get(cid, 0), bool(visible))
+            for cid, visible in zip(self._m_challenges[start:end], self._m_visible[start:end])
+        ]
+
+    def visible_challenges_of(self, module_id: int) -> list[int]:
+        start, end = self._span(self._module_ids, self._m_offsets, module_id)
+        return [
+            cid
+            for cid, visible in zip(self._m_challenges[start:end], self._m_visible[start:end])
+            if visible
+        ]
+
+
+def challenge_module_index() -> ChallengeModuleIndex:
+    """The shared link index, rebuilt when links, modules or challenges change."""
+
+    def _load():
+        rows = (
+            db.session.query(
+                ModuleChallenge.challenge_id,
+                ModuleChallenge.module_id,
+                Module.status,
+                Challenges.state,
+            )
+            .join(Module, Module.id == ModuleChallenge.module_id)
+            .join(Challenges, Challenges.id == ModuleChallenge.challenge_id)
+            .all()
+        )
+        normalized = [
+            (cid, mid, status_code(status), 1 if state == "visible" else 0) for cid, mid, status, state in rows
+        ]
+        return ChallengeModuleIndex(normalized)
+
+    return cached(("links", "modules", "challenges"), "challenge_module_index", _load)
+
+
+def challenge_values() -> dict[int, int]:
+    """`{challenge_id: value}` for every module challenge.
+
+    Kept out of the link index under its own `challenge_values` generation:
+    dynamic challenges change value on every solve, and only this map is
+    rebuilt for it.
+    """
+
+    def _load():
+        values = {}
+        for cid, value in (
+            db.session.query(Challenges.id, Challenges.value)
+            .join(ModuleChallenge, ModuleChallenge.challenge_id == Challenges.id)
+            .distinct()
+            .all()
+        ):
+            try:
+                values[cid] = int(value or 0)
+            except Exception:
+                values[cid] = 0
+        return values
+
+    return cached(("links", "challenge_values"), "challenge_values", _load)
+
+
+def module_challenge_ids(module_id: int) -> set[int]:
+    return set(challenge_module_index().challenges_of(module_id))
+
+
+register_cache_warmer("challenge_module_index", challenge_module_index)
+register_cache_warmer("challenge_values", challenge_values)
@@ -6,16 +6,15 @@ import string
 from CTFd.models import db
 
 from ..models import Module, ModuleStatus
-from .settings import get_settings
+from .settings import settings_snapshot
 
 
 ALPHABET = string.ascii_uppercase + string.digits
 
 
 def invite_code_length() -> int:
-    s = get_settings(create=True)
     try:
-        return int(getattr(s, "invite_code_length", 8) or 8)
+        return int(settings_snapshot().invite_code_length or 8)
     except Exception:
         return 8
 
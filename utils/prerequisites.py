@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+
+from CTFd.models import db
+
+from ..models import Module
+from .cache import cache_generation, cached, register_cache_warmer
+from .index import challenge_module_index
+from .progress import account_solved_ids, solve_account, solves_namespace
+
+
+def parse_prerequisites(raw) -> tuple[int, ...]:
+    """Read `Module.prerequisites` (a JSON list of module ids) leniently."""
+    if raw in (None, ""):
+        return ()
+    values = raw
+    if isinstance(raw, str):
+        try:
+            values = json.loads(raw)
+        except Exception:
+            values = raw.split(",")
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+
+    out: list[int] = []
+    for value in values:
+        try:
+            module_id = int(str(value).strip())
+        except Exception:
+            continue
+        if module_id > 0 and module_id not in out:
+            out.append(module_id)
+    return tuple(out)
+
+
+def dump_prerequisites(module_ids) -> str | None:
+    ids = parse_prerequisites(list(module_ids or ()))
+    return json.dumps(list(ids)) if ids else None
+
+
+def _topological_order(requires: dict[int, tuple[int, ...]]) -> tuple[tuple[int, ...], frozenset[int]]:
+    """Kahn's algorithm; returns the order and the modules left in a cycle.
+
+    Saves reject cycles, but rows edited by hand can still contain one.
+    """
+    dependents: dict[int, list[int]] = {module_id: [] for module_id in requires}
+    pending = {module_id: 0 for module_id in requires}
+    for module_id, prereqs in requires.items():
+        for prereq in prereqs:
+            dependents[prereq].append(module_id)
+            pending[module_id] += 1
+
+    ready = sorted(module_id for module_id, count in pending.items() if count == 0)
+    order: list[int] = []
+    while ready:
+        module_id = ready.pop(0)
+        order.append(module_id)
+        for dependent in dependents[module_id]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                ready.append(dependent)
+
+    placed = set(order)
+    cyclic = frozenset(module_id for module_id in requires if module_id not in placed)
+    return tuple(order), cyclic
+
+
+def prerequisite_graph() -> dict:
+    """`{"requires": {module_id: (prereq_ids...)}, "order": (...), "cyclic": frozenset}`.
+
+    Only modules that have prerequisites or are prerequisites appear; unknown
+    ids are dropped. Rebuilt when modules change.
+    """
+
+    def _load():
+        rows = db.session.query(Module.id, Module.prerequisites).all()
+        known = {module_id for module_id, _ in rows}
+        requires: dict[int, tuple[int, ...]] = {}
+        for module_id, raw in rows:
+            prereqs = tuple(p for p in parse_prerequisites(raw) if p in known and p != module_id)
+            if not prereqs:
+                continue
+            requires[module_id] = prereqs
+            for prereq in prereqs:
+                requires.setdefault(prereq, ())
+        order, cyclic = _topological_order(requires)
+        return {"requires": requires, "order": order, "cyclic": cyclic}
+
+    return cached("modules", "prerequisite_graph", _load)
+
+
+def validate_prerequisites(module_id: int | None, prereq_ids) -> tuple[int, ...]:
+    """Return the cleaned prerequisite ids or raise ValueError (unknown id or cycle)."""
+    prereq_ids = parse_prerequisites(list(prereq_ids or ()))
+    if not prereq_ids:
+        return ()
+    if module_id is not None and module_id in prereq_ids:
+        raise ValueError("A module cannot require itself")
+
+    rows = db.session.query(Module.id, Module.prerequisites).all()
+    requires = {mid: parse_prerequisites(raw) for mid, raw in rows}
+    missing = [p for p in prereq_ids if p not in requires]
+    if missing:
+        raise ValueError("Unknown prerequisite module")
+    if module_id is None:
+        # A module that does not exist yet cannot be anyone's prerequisite.
+        return prereq_ids
+
+    # A cycle exists iff module_id is reachable from one of its new prerequisites.
+    stack = list(prereq_ids)
+    seen: set[int] = set()
+    while stack:
+        current = stack.pop()
+        if current == module_id:
+            raise ValueError("Prerequisites would create a cycle")
+        if current in seen:
+            continue
+        seen.add(current)
+        stack.extend(requires.get(current, ()))
+    return prereq_ids
+
+
+def module_prerequisites(module_id: int) -> tuple[int, ...]:
+    return prerequisite_graph()["requires"].get(module_id, ())
+
+
+def prerequisite_locked_ids(user) -> frozenset[int]:
+    """Modules whose prerequisites the user's account has not completed.
+
+    A prerequisite is complete when every visible challenge in it is solved
+    and it is itself unlocked. Evaluated once per account in topological
+    order over the cached challenge rows and solved set; cached until the
+    account solves something or modules/links/challenges change.
+    """
+    graph = prerequisite_graph()
+    requires = graph["requires"]
+    if not any(requires.values()):
+        return frozenset()
+
+    account = solve_account(user)
+    if account is None:
+        return frozenset(module_id for module_id, prereqs in requires.items() if prereqs)
+
+    def _load():
+        index = challenge_module_index()
+        solved = account_solved_ids(user)
+        locked: set[int] = set(graph["cyclic"])
+        for module_id in graph["order"]:
+            prereqs = requires.get(module_id, ())
+            for prereq in prereqs:
+                if prereq in locked or any(cid not in solved for cid in index.visible_challenges_of(prereq)):
+                    locked.add(module_id)
+                    break
+        return frozenset(locked)
+
+    return cached(
+        solves_namespace(account),
+        (
+            "prerequisite_locked",
+            cache_generation("solves"),
+            cache_generation("modules"),
+            cache_generation("links"),
+            cache_generation("challenges"),
+        ),
+        _load,
+    )
+
+
+register_cache_warmer("prerequisite_graph", prerequisite_graph)
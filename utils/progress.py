@@ -2,18 +2,11 @@ from __future__ import annotations
 
 from CTFd.models import Challenges, Solves, db
 
-try:
-    from CTFd.utils.config import is_teams_mode
-except Exception:
-    is_teams_mode = None
-
-try:
-    from CTFd.utils.user import get_current_team
-except Exception:
-    get_current_team = None
-
-from ..models import Module, ModuleChallenge
-from .settings import get_progress_mode
+from ..models import Module, ModuleChallenge, ModuleStatus
+from .access import account_team_id, active_module_ids
+from .cache import cache_generation, cached
+from .index import challenge_module_index, challenge_values
+from .settings import settings_snapshot
 
 
 def _coerce_points(value) -> int:
@@ -23,16 +16,94 @@ def _coerce_points(value) -> int:
         return 0
 
 
-def _apply_user_solve_scope(query, user):
-    try:
-        if is_teams_mode and is_teams_mode() and get_current_team:
-            team = get_current_team()
-            if team:
-                return query.filter(Solves.team_id == team.id)
-            return query.filter(Solves.user_id == user.id)
-        return query.filter(Solves.user_id == user.id)
-    except Exception:
-        return query.filter(Solves.user_id == user.id)
+def solve_account(user) -> tuple[str, int] | None:
+    """Return the account solves are attributed to: `("team", id)` or `("user", id)`.
+
+    Uses the same team resolution as module grants (`account_team_id`), so
+    progress never mixes one team's grants with another account's solves.
+    """
+    if not user:
+        return None
+    team_id = account_team_id(user)
+    if team_id:
+        return ("team", team_id)
+    return ("user", user.id)
+
+
+def solves_namespace(account: tuple[str, int]) -> str:
+    return f"solves:{account[0]}:{account[1]}"
+
+
+def account_solved_ids(user) -> frozenset[int]:
+    """Solved challenge ids for the user's account, cached until its next correct solve."""
+    account = solve_account(user)
+    if account is None:
+        return frozenset()
+
+    def _load():
+        q = db.session.query(Solves.challenge_id)
+        if account[0] == "team":
+            q = q.filter(Solves.team_id == account[1])
+        else:
+            q = q.filter(Solves.user_id == account[1])
+        return frozenset(cid for (cid,) in q.all())
+
+    return cached(solves_namespace(account), ("solved", cache_generation("solves")), _load)
+
+
+def challenge_prerequisites() -> dict[int, frozenset[int]]:
+    """`{challenge_id: prerequisite challenge ids}` for module challenges with CTFd requirements.
+
+    Prerequisites pointing at deleted challenges are dropped, as the core
+    listing does.
+    """
+
+    def _load():
+        rows = (
+            db.session.query(Challenges.id, Challenges.requirements)
+            .join(ModuleChallenge, ModuleChallenge.challenge_id == Challenges.id)
+            .filter(Challenges.requirements.isnot(None))
+            .distinct()
+            .all()
+        )
+        requires: dict[int, set[int]] = {}
+        for challenge_id, requirements in rows:
+            prereqs = set((requirements or {}).get("prerequisites") or [])
+            if prereqs:
+                requires[challenge_id] = prereqs
+        wanted = set().union(*requires.values()) if requires else set()
+        existing = set()
+        if wanted:
+            existing = {cid for (cid,) in db.session.query(Challenges.id).filter(Challenges.id.in_(wanted)).all()}
+        return {
+            challenge_id: frozenset(prereqs & existing)
+            for challenge_id, prereqs in requires.items()
+            if prereqs & existing
+        }
+
+    return cached(("challenges", "links"), "challenge_prerequisites", _load)
+
+
+def requirement_locked_challenge_ids(user) -> frozenset[int]:
+    """Module challenges CTFd hides (or anonymizes) for the account until prerequisites are solved."""
+    requires = challenge_prerequisites()
+    if not requires:
+        return frozenset()
+    solved = account_solved_ids(user) if user else frozenset()
+    return frozenset(challenge_id for challenge_id, prereqs in requires.items() if not solved >= prereqs)
+
+
+def module_challenge_rows(user, module_id: int, index=None, values=None, gated=None) -> list[tuple[int, int]]:
+    """`(challenge_id, value)` for the module challenges the account can see.
+
+    Hidden challenges and those still gated by CTFd requirements are left
+    out, as in the core listing. Every progress total goes through here so
+    all endpoints agree; batch callers pass the shared lookups in.
+    """
+    index = index if index is not None else challenge_module_index()
+    values = values if values is not None else challenge_values()
+    gated = gated if gated is not None else requirement_locked_challenge_ids(user)
+    return [(cid, value) for cid, value, visible in index.rows_of(module_id, values) if visible and cid not in gated]
 
 
 def _progress_payload(
@@ -43,7 +114,7 @@ def _progress_payload(
 ) -> dict:
     challenge_percent = int((solved / total) * 100) if total else 0
     points_percent = int((points_solved / points_total) * 100) if points_total else challenge_percent
-    mode = get_progress_mode()
+    mode = settings_snapshot().progress_mode
 
     if mode == "points":
         display_current = points_solved
@@ -74,13 +145,17 @@ def _progress_payload(
     }
 
 
-def module_progress(user, module: Module, challenge_ids: list[int] | set[int] | tuple[int, ...] | None = None) -> dict:
-    """Return progress for the current user with both challenge and points aggregates."""
-    challenge_rows_q = (
-        db.session.query(Challenges.id, Challenges.value)
-        .join(ModuleChallenge, ModuleChallenge.challenge_id == Challenges.id)
-        .filter(ModuleChallenge.module_id == module.id)
-    )
+def module_progress(
+    user,
+    module: Module,
+    challenge_ids: list[int] | set[int] | tuple[int, ...] | None = None,
+) -> dict:
+    """Return progress for the current user with both challenge and points aggregates.
+
+    Counts the challenges from `module_challenge_rows`, optionally narrowed
+    to `challenge_ids`.
+    """
+    challenge_rows = module_challenge_rows(user, module.id)
 
     normalized_ids = None
     if challenge_ids is not None:
@@ -92,31 +167,26 @@ def module_progress(user, module: Module, challenge_ids: list[int] | set[int] |
                 continue
             if normalized_value > 0:
                 normalized_ids.append(normalized_value)
-        normalized_ids = list(dict.fromkeys(normalized_ids))
+        normalized_ids = set(normalized_ids)
         if not normalized_ids:
             return _progress_payload(solved=0, total=0, points_solved=0, points_total=0)
-        challenge_rows_q = challenge_rows_q.filter(Challenges.id.in_(normalized_ids))
-
-    challenge_rows = challenge_rows_q.all()
-    total = len(challenge_rows)
-    points_total = sum(_coerce_points(value) for _, value in challenge_rows)
-
-    if not user or total == 0:
-        return _progress_payload(solved=0, total=total, points_solved=0, points_total=points_total)
+        challenge_rows = [(cid, value) for cid, value in challenge_rows if cid in normalized_ids]
 
-    challenge_ids_in_scope = [challenge_id for challenge_id, _ in challenge_rows]
+    account_solved = account_solved_ids(user) if user and challenge_rows else frozenset()
+    return _progress_from_rows(challenge_rows, account_solved)
 
-    solves_q = (
-        db.session.query(Solves.challenge_id)
-        .filter(Solves.challenge_id.in_(challenge_ids_in_scope))
-        .distinct()
-    )
-    solves_q = _apply_user_solve_scope(solves_q, user)
 
-    solved_ids = {challenge_id for (challenge_id,) in solves_q.all()}
-    solved = len(solved_ids)
-    values_by_id = {challenge_id: _coerce_points(value) for challenge_id, value in challenge_rows}
-    points_solved = sum(values_by_id.get(challenge_id, 0) for challenge_id in solved_ids)
+def _progress_from_rows(challenge_rows, account_solved: frozenset[int]) -> dict:
+    total = len(challenge_rows)
+    points_total = 0
+    solved = 0
+    points_solved = 0
+    for challenge_id, value in challenge_rows:
+        points = _coerce_points(value)
+        points_total += points
+        if challenge_id in account_solved:
+            solved += 1
+            points_solved += points
 
     return _progress_payload(
         solved=solved,
@@ -126,6 +196,40 @@ def module_progress(user, module: Module, challenge_ids: list[int] | set[int] |
     )
 
 
+def modules_progress(user, module_ids: list[int] | set[int] | None = None) -> dict[int, dict]:
+    """Progress for many modules at once, keyed by module id.
+
+    `module_ids=None` means every module the user can open. Locked modules and
+    private modules without an active grant are left out. Runs a fixed number of
+    queries regardless of how many modules are requested: module statuses plus
+    the (cached) grant map, solved-id set and challenge requirements.
+    """
+
+    q = db.session.query(Module.id, Module.status).filter(Module.status != ModuleStatus.locked)
+    if module_ids is not None:
+        module_ids = set(module_ids)
+        if not module_ids:
+            return {}
+        q = q.filter(Module.id.in_(module_ids))
+    statuses = q.all()
+    if not statuses:
+        return {}
+
+    granted = active_module_ids(user.id, team_id=account_team_id(user)) if user else set()
+    index = challenge_module_index()
+    values = challenge_values()
+    account_solved = account_solved_ids(user) if user else frozenset()
+    gated = requirement_locked_challenge_ids(user)
+
+    out: dict[int, dict] = {}
+    for module_id, status in statuses:
+        if status == ModuleStatus.private and module_id not in granted:
+            continue
+        challenge_rows = module_challenge_rows(user, module_id, index=index, values=values, gated=gated)
+        out[module_id] = _progress_from_rows(challenge_rows, account_solved)
+    return out
+
+
 def module_challenges_query(module: Module, include_hidden: bool) -> list[Challenges]:
     q = (
         Challenges.query.join(ModuleChallenge, ModuleChallenge.challenge_id == Challenges.id)
@@ -134,3 +238,27 @@ def module_challenges_query(module: Module, include_hidden: bool) -> list[Challe
     if not include_hidden:
         q = q.filter(Challenges.state == "visible")
     return q.order_by(Challenges.category.asc(), Challenges.value.asc(), Challenges.name.asc()).all()
+
+
+def module_challenge_summaries(module: Module, include_hidden: bool = False) -> list:
+    """Like `module_challenges_query` but selects only the listed columns.
+
+    Rows expose `id`, `name`, `category`, `value`, `state` and `type`, which
+    is all the module page and API render, without loading descriptions,
+    connection info or the polymorphic challenge subclass.
+    """
+    q = (
+        db.session.query(
+            Challenges.id,
+            Challenges.name,
+            Challenges.category,
+            Challenges.value,
+            Challenges.state,
+            Challenges.type,
+        )
+        .join(ModuleChallenge, ModuleChallenge.challenge_id == Challenges.id)
+        .filter(ModuleChallenge.module_id == module.id)
+    )
+    if not include_hidden:
+        q = q.filter(Challenges.state == "visible")
+    return q.order_by(Challenges.category.asc(), Challenges.value.asc(), Challenges.name.asc()).all()
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from CTFd.models import db
 
-from ..models import Module, ModuleCategory
+from ..models import Module, ModuleCategory, ModuleStatus
+from .cache import cached, register_cache_warmer
+from .index import STATUS_LOCKED, STATUS_PRIVATE, STATUS_PUBLIC, status_code
 
 
 def module_ordering():
@@ -23,4 +25,131 @@ def ordered_categories_query():
 
 
 def ordered_category_names():
-    return [category.name for category in ordered_categories_query().all()]
+    def _load():
+        return [
+            name
+            for (name,) in db.session.query(ModuleCategory.name)
+            .order_by(ModuleCategory.order.asc(), ModuleCategory.name.asc())
+            .all()
+        ]
+
+    return list(cached("modules", "category_names", _load))
+
+
+register_cache_warmer("category_names", ordered_category_names)
+
+
+def ordered_module_tree() -> tuple[tuple[str | None, tuple[int, ...]], ...]:
+    """Display order as `((category, (module_id, ...)), ...)`.
+
+    Categories follow `ModuleCategory.order`, then categories that only exist
+    on modules (alphabetically), then uncategorized modules (`None`) last.
+    Modules inside a category follow `Module.order`, then name. Rebuilt only
+    when a module or category is written.
+    """
+
+    def _load():
+        category_names = ordered_category_names()
+        rows = (
+            db.session.query(Module.id, Module.category)
+            .order_by(Module.order.asc(), Module.name.asc())
+            .all()
+        )
+
+        grouped: dict[str | None, list[int]] = {}
+        for module_id, category in rows:
+            grouped.setdefault((category or "").strip() or None, []).append(module_id)
+
+        known = set(category_names)
+        extra = sorted(name for name in grouped if name is not None and name not in known)
+        order = [name for name in category_names if name in grouped] + extra
+        if None in grouped:
+            order.append(None)
+        return tuple((name, tuple(grouped[name])) for name in order)
+
+    return cached("modules", "module_tree", _load)
+
+
+def ordered_module_ids() -> list[int]:
+    return [module_id for _, module_ids in ordered_module_tree() for module_id in module_ids]
+
+
+register_cache_warmer("module_tree", ordered_module_tree)
+
+
+class ModuleSnapshot:
+    """Read-only copy of a `Module` row for list/detail read paths.
+
+    Carries the columns the views and API render plus the status as an
+    integer code, so hot paths compare ints instead of enum values and never
+    touch the ORM identity map. Write paths keep loading `Module`.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "category",
+        "banner_url",
+        "order",
+        "status",
+        "status_code",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(self, id, name, category, banner_url, order, status, created_at, updated_at):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.banner_url = banner_url
+        self.order = order
+        self.status = ModuleStatus(status)
+        self.status_code = status_code(status)
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @property
+    def is_public(self) -> bool:
+        return self.status_code == STATUS_PUBLIC
+
+    @property
+    def is_private(self) -> bool:
+        return self.status_code == STATUS_PRIVATE
+
+    @property
+    def is_locked(self) -> bool:
+        return self.status_code == STATUS_LOCKED
+
+
+def module_status_code(module) -> int:
+    """Status code of a `ModuleSnapshot` or a `Module` instance."""
+    code = getattr(module, "status_code", None)
+    if code is None:
+        code = status_code(module.status)
+    return code
+
+
+def module_snapshots() -> dict[int, ModuleSnapshot]:
+    """`{module_id: ModuleSnapshot}` for every module; rebuilt when modules change."""
+
+    def _load():
+        rows = db.session.query(
+            Module.id,
+            Module.name,
+            Module.category,
+            Module.banner_url,
+            Module.order,
+            Module.status,
+            Module.created_at,
+            Module.updated_at,
+        ).all()
+        return {row[0]: ModuleSnapshot(*row) for row in rows}
+
+    return cached("modules", "module_snapshots", _load)
+
+
+def module_snapshot(module_id: int) -> ModuleSnapshot | None:
+    return module_snapshots().get(module_id)
+
+
+register_cache_warmer("module_snapshots", module_snapshots)
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from CTFd.models import db
+
+from ..models import Module, ModuleStatus
+from .cache import (
+    CACHE_PREFIX,
+    advance_cache_generation,
+    cache_generation,
+    discard_reserved_generation,
+    get_cache_backend,
+    preview_generation,
+    reserve_cache_generation,
+    warm_caches,
+    warm_caches_in_background,
+)
+
+SCHEDULE_WARM_LEAD = timedelta(seconds=60)
+SCHEDULE_RETRY_DELAY = timedelta(seconds=2)
+SCHEDULE_INTERVAL_CONFIG_KEY = "CTFD_MODULES_SCHEDULE_INTERVAL"
+
+_APPLY_LOCK_KEY = f"{CACHE_PREFIX}:lock:schedule"
+
+# Requests whose response depends on module status; everything else (static
+# files, unrelated CTFd pages) skips the per-request schedule check.
+SCHEDULE_CHECK_PATH_PREFIXES = (
+    "/modules",
+    "/api/v1/modules",
+    "/api/v1/challenges",
+    "/plugins/ctfd_modules/admin",
+)
+
+
+class _Schedule:
+    """Sorted pending transitions for the current modules generation."""
+
+    __slots__ = ("generation", "entries", "next_at", "warmed_for", "retry_at")
+
+    def __init__(self, generation: int, entries: list[tuple[datetime, int, ModuleStatus, str]]):
+        self.generation = generation
+        self.entries = entries
+        self.next_at = entries[0][0] if entries else None
+        self.warmed_for: datetime | None = None
+        self.retry_at: datetime | None = None
+
+
+_schedule: _Schedule | None = None
+_apply_lock = threading.Lock()
+_schedule_thread: threading.Thread | None = None
+
+
+def open_target_status(open_status, current_status) -> ModuleStatus:
+    """Status a module takes at `open_at`; never widens a private module to public by default."""
+    if open_status is not None:
+        target = ModuleStatus(open_status)
+        if target != ModuleStatus.locked:
+            return target
+    if current_status is not None and ModuleStatus(current_status) == ModuleStatus.private:
+        return ModuleStatus.private
+    return ModuleStatus.public
+
+
+def _load_schedule() -> _Schedule:
+    generation = cache_generation("modules")
+    entries: list[tuple[datetime, int, ModuleStatus, str]] = []
+    rows = (
+        db.session.query(Module.id, Module.status, Module.open_at, Module.open_status, Module.close_at)
+        .filter(db.or_(Module.open_at.isnot(None), Module.close_at.isnot(None)))
+        .all()
+    )
+    for module_id, status, open_at, open_status, close_at in rows:
+        if open_at is not None:
+            bisect.insort(entries, (open_at, module_id, open_target_status(open_status, status), "open_at"))
+        if close_at is not None:
+            bisect.insort(entries, (close_at, module_id, ModuleStatus.locked, "close_at"))
+    return _Schedule(generation, entries)
+
+
+def current_schedule() -> _Schedule:
+    global _schedule
+
+    schedule = _schedule
+    if schedule is None or schedule.generation != cache_generation("modules"):
+        schedule = _load_schedule()
+        _schedule = schedule
+    return schedule
+
+
+def next_scheduled_transition() -> tuple[datetime, int, str] | None:
+    schedule = current_schedule()
+    if not schedule.entries:
+        return None
+    at, module_id, status, _ = schedule.entries[0]
+    return at, module_id, status.value
+
+
+def _batch_tag(batch) -> tuple:
+    """Identifies a batch of transitions so a pre-warm can be matched to its apply."""
+    return tuple((at.isoformat(), module_id, status.value, field) for at, module_id, status, field in batch)
+
+
+def _apply_batch(batch) -> int:
+    applied = 0
+    for at, module_id, status, field in batch:
+        column = getattr(Module, field)
+        applied += (
+            Module.query.filter(Module.id == module_id)
+            .filter(column == at)
+            .update({"status": status, field: None}, synchronize_session=False)
+        )
+    return applied
+
+
+def warm_upcoming_transition(batch) -> bool:
+    """Build the caches for the module state right after `batch` is applied.
+
+    The batch is applied inside a transaction that is always rolled back, and
+    every warmer runs under a `modules` generation reserved for the batch, so
+    nothing is visible until `apply_due_transitions` commits the same batch
+    and publishes that generation. Returns False (and drops the reservation)
+    if any warmer failed.
+    """
+
+    token = reserve_cache_generation("modules", _batch_tag(batch))
+    try:
+        _apply_batch(batch)
+        with preview_generation("modules", token):
+            results = warm_caches(rollback_on_error=False)
+    except Exception:
+        results = {"transition": False}
+    finally:
+        db.session.rollback()
+
+    if not all(results.values()):
+        discard_reserved_generation("modules")
+        return False
+    return True
+
+
+def warm_upcoming_transition_in_background(app, batch) -> None:
+    def _run():
+        with app.app_context():
+            try:
+                warm_upcoming_transition(batch)
+            except Exception:
+                app.logger.exception("ctfd_modules: pre-warming a scheduled transition failed")
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=_run, name="ctfd-modules-schedule-warm", daemon=True).start()
+
+
+def apply_due_transitions(now: datetime | None = None) -> int:
+    """Apply every transition whose time has passed; returns the number applied.
+
+    One worker applies a batch (process lock + cache `add` across workers);
+    the applied timestamp is cleared so a later manual status change sticks.
+    """
+
+    now = now or datetime.utcnow()
+    schedule = current_schedule()
+    due = [entry for entry in schedule.entries if entry[0] <= now]
+    if not due:
+        return 0
+
+    if not _apply_lock.acquire(blocking=False):
+        return 0
+
+    backend = get_cache_backend()
+    holds_cache_lock = False
+    try:
+        try:
+            holds_cache_lock = bool(backend.add(_APPLY_LOCK_KEY, 1, timeout=30))
+        except Exception:
+            holds_cache_lock = True
+        if not holds_cache_lock:
+            schedule.retry_at = now + SCHEDULE_RETRY_DELAY
+            return 0
+
+        applied = _apply_batch(due)
+        db.session.commit()
+        # Publishes the generation pre-warmed for exactly this batch, if any;
+        # otherwise a plain bump.
+        prewarmed = advance_cache_generation("modules", _batch_tag(due))
+
+        try:
+            current_app.logger.info("ctfd_modules: applied %s scheduled module transitions", applied)
+        except Exception:
+            pass
+
+        if not prewarmed:
+            # Off the request thread: the request that happened to apply the
+            # batch should not pay for every warmer.
+            warm_caches_in_background(current_app._get_current_object())
+        return applied
+    except Exception:
+        db.session.rollback()
+        schedule.retry_at = now + SCHEDULE_RETRY_DELAY
+        return 0
+    finally:
+        if holds_cache_lock:
+            try:
+                backend.delete(_APPLY_LOCK_KEY)
+            except Exception:
+                pass
+        _apply_lock.release()
+
+
+def check_module_schedule(now: datetime | None = None) -> None:
+    """Per-request check: a single comparison unless a transition is near."""
+
+    schedule = current_schedule()
+    next_at = schedule.next_at
+    if next_at is None:
+        return
+
+    now = now or datetime.utcnow()
+    if now < next_at - SCHEDULE_WARM_LEAD:
+        return
+
+    if now < next_at:
+        if schedule.warmed_for != next_at:
+            schedule.warmed_for = next_at
+            batch = [entry for entry in schedule.entries if entry[0] == next_at]
+            warm_upcoming_transition_in_background(current_app._get_current_object(), batch)
+        return
+
+    if schedule.retry_at is not None and now < schedule.retry_at:
+        return
+
+    apply_due_transitions(now)
+
+
+def schedule_check_applies(path: str) -> bool:
+    return path.startswith(SCHEDULE_CHECK_PATH_PREFIXES)
+
+
+def start_schedule_timer(app) -> bool:
+    """Optional per-worker timer so transitions fire without waiting for traffic.
+
+    Enabled by `CTFD_MODULES_SCHEDULE_INTERVAL` (seconds between checks).
+    """
+
+    global _schedule_thread
+
+    try:
+        interval = int(app.config.get(SCHEDULE_INTERVAL_CONFIG_KEY) or 0)
+    except Exception:
+        interval = 0
+    if interval <= 0:
+        return False
+
+    if _schedule_thread is not None and _schedule_thread.is_alive():
+        return True
+
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(interval):
+            with app.app_context():
+                try:
+                    check_module_schedule()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("ctfd_modules: schedule check failed")
+                finally:
+                    db.session.remove()
+
+    _schedule_thread = threading.Thread(target=_run, name="ctfd-modules-schedule", daemon=True)
+    _schedule_thread.start()
+    return True
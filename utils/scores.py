@@ -0,0 +1,519 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from CTFd.models import Challenges, Solves, Teams, Users, db
+
+try:
+    from CTFd.utils.config import is_teams_mode
+except Exception:
+    is_teams_mode = None
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from ..models import Module, ModuleChallenge, ModuleScore
+from .cache import CACHE_PREFIX, bump_cache_generation, get_cache_backend
+from .index import challenge_module_index
+
+SCOREBOARD_TOP_DEFAULT = 10
+SCOREBOARD_TOP_MAX = 100
+
+REBUILD_CHUNK_SIZE = 50000
+REBUILD_INSERT_BATCH = 5000
+# Cross-worker rebuild lock; a rebuild requested while one runs triggers one
+# more pass (bounded) instead of a concurrent rebuild.
+REBUILD_LOCK_TTL = 3600
+REBUILD_MAX_PASSES = 3
+_REBUILD_LOCK_KEY = f"{CACHE_PREFIX}:lock:score_rebuild"
+_REBUILD_REQUESTED_KEY = f"{CACHE_PREFIX}:score_rebuild_requested"
+_rebuild_lock = threading.Lock()
+
+# Dynamic-value solves queue their modules for a background recompute; solves
+# landing within this window share one pass.
+RESCORE_DEBOUNCE_SECONDS = 2.0
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_SCORE_COLUMNS = ("module_id", "account_type", "account_id", "points", "solves", "last_solve_at")
+
+
+def score_account_type() -> str:
+    try:
+        if is_teams_mode and is_teams_mode():
+            return "team"
+    except Exception:
+        pass
+    return "user"
+
+
+def linked_module_ids(challenge_ids) -> set[int]:
+    challenge_ids = list(challenge_ids or ())
+    if not challenge_ids:
+        return set()
+    return {
+        mid
+        for (mid,) in db.session.query(ModuleChallenge.module_id)
+        .filter(ModuleChallenge.challenge_id.in_(challenge_ids))
+        .distinct()
+        .all()
+    }
+
+
+def freeze_cutoff() -> datetime | None:
+    """The scoreboard freeze time as a naive UTC datetime, or None when not frozen."""
+    try:
+        from CTFd.utils import get_config  # type: ignore
+        from CTFd.utils.dates import unix_time_to_utc  # type: ignore
+
+        freeze = get_config("freeze")
+        return unix_time_to_utc(freeze) if freeze else None
+    except Exception:
+        return None
+
+
+def _aggregate_select(
+    account_type: str,
+    module_ids=None,
+    before: datetime | None = None,
+    account_id: int | None = None,
+    after_solve_id: int | None = None,
+):
+    """Per (module, account) totals from `Solves`.
+
+    `before` drops solves at or after that time, `account_id` limits the
+    totals to one account and `after_solve_id` to solves with a larger id.
+    """
+    account_col = Solves.team_id if account_type == "team" else Solves.user_id
+    q = (
+        db.session.query(
+            ModuleChallenge.module_id.label("module_id"),
+            db.literal(account_type).label("account_type"),
+            account_col.label("account_id"),
+            db.func.coalesce(db.func.sum(Challenges.value), 0).label("points"),
+            db.func.count(Solves.id).label("solves"),
+            db.func.max(Solves.date).label("last_solve_at"),
+        )
+        .join(ModuleChallenge, ModuleChallenge.challenge_id == Solves.challenge_id)
+        .join(Challenges, Challenges.id == Solves.challenge_id)
+        .filter(Challenges.state == "visible")
+        .filter(account_col.isnot(None))
+    )
+    if module_ids is not None:
+        q = q.filter(ModuleChallenge.module_id.in_(module_ids))
+    if before is not None:
+        q = q.filter(Solves.date < before)
+    if account_id is not None:
+        q = q.filter(account_col == account_id)
+    if after_solve_id is not None:
+        q = q.filter(Solves.id > after_solve_id)
+    return q.group_by(ModuleChallenge.module_id, account_col).statement
+
+
+def _lock_modules(module_ids) -> None:
+    """Lock the module rows (in id order) for the rest of the transaction.
+
+    Every writer of `module_scores` takes these locks first, so recomputes,
+    per-solve refreshes and full rebuilds of one module run one at a time
+    across workers (SQLite serializes writers anyway).
+    """
+    db.session.query(Module.id).filter(Module.id.in_(module_ids)).order_by(Module.id.asc()).with_for_update().all()
+
+
+def rescore_modules(module_ids) -> None:
+    """Recompute the score rows of the given modules inside the current transaction.
+
+    Used after link or challenge value changes; the caller commits. The
+    module rows are locked first so concurrent recomputes of the same module
+    run one after another instead of interleaving delete/insert.
+    """
+    module_ids = sorted({int(mid) for mid in module_ids or () if mid})
+    if not module_ids:
+        return
+
+    db.session.flush()
+    _lock_modules(module_ids)
+    ModuleScore.query.filter(ModuleScore.module_id.in_(module_ids)).delete(synchronize_session=False)
+    table = ModuleScore.__table__
+    db.session.execute(
+        table.insert().from_select(
+            list(_SCORE_COLUMNS),
+            _aggregate_select(score_account_type(), module_ids),
+        )
+    )
+
+
+def _group_chunk_numpy(module_ids, account_ids, values, stamps):
+    keys = (np.asarray(module_ids, dtype=np.int64) << 32) | np.asarray(account_ids, dtype=np.int64)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    points = np.bincount(inverse, weights=np.asarray(values, dtype=np.int64), minlength=len(unique_keys))
+    solves = np.bincount(inverse, minlength=len(unique_keys))
+    last = np.full(len(unique_keys), np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(last, inverse, np.asarray(stamps, dtype=np.int64))
+    return zip(unique_keys.tolist(), points.astype(np.int64).tolist(), solves.tolist(), last.tolist())
+
+
+def _group_chunk_python(module_ids, account_ids, values, stamps):
+    groups: dict[int, list[int]] = {}
+    for module_id, account_id, value, stamp in zip(module_ids, account_ids, values, stamps):
+        key = (module_id << 32) | account_id
+        entry = groups.get(key)
+        if entry is None:
+            groups[key] = [value, 1, stamp]
+        else:
+            entry[0] += value
+            entry[1] += 1
+            if stamp > entry[2]:
+                entry[2] = stamp
+    return ((key, points, solves, last) for key, (points, solves, last) in groups.items())
+
+
+def _rebuild_module_scores(chunk_size: int) -> dict:
+    """Recompute every score row from `Solves`.
+
+    Solves are streamed in id order, `chunk_size` at a time, with only the
+    columns needed. Each chunk is expanded through the in-memory link map and
+    grouped per (module, account) with NumPy when installed (pure Python
+    otherwise). Each module is then replaced under its row lock, together with
+    the solves that arrived during the read, using batched executemany inserts.
+    """
+    chunk_size = max(1, int(chunk_size or REBUILD_CHUNK_SIZE))
+    account_type = score_account_type()
+    account_col = Solves.team_id if account_type == "team" else Solves.user_id
+
+    values = {
+        cid: int(value or 0)
+        for cid, value in db.session.query(Challenges.id, Challenges.value)
+        .filter(Challenges.state == "visible")
+        .all()
+    }
+    links: dict[int, list[int]] = {}
+    for cid, mid in db.session.query(ModuleChallenge.challenge_id, ModuleChallenge.module_id).all():
+        if cid in values:
+            links.setdefault(cid, []).append(mid)
+
+    group_chunk = _group_chunk_numpy if np is not None else _group_chunk_python
+    totals: dict[int, list[int]] = {}
+    solves_read = 0
+    last_id = 0
+
+    while links:
+        rows = (
+            db.session.query(Solves.id, Solves.challenge_id, account_col, Solves.date)
+            .filter(Solves.id > last_id)
+            .filter(account_col.isnot(None))
+            .order_by(Solves.id.asc())
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        solves_read += len(rows)
+
+        module_ids: list[int] = []
+        account_ids: list[int] = []
+        points: list[int] = []
+        stamps: list[int] = []
+        for _, cid, account_id, date in rows:
+            mids = links.get(cid)
+            if not mids:
+                continue
+            stamp = (date - _EPOCH) // _MICROSECOND if date else 0
+            for mid in mids:
+                module_ids.append(mid)
+                account_ids.append(account_id)
+                points.append(values[cid])
+                stamps.append(stamp)
+
+        if module_ids:
+            for key, chunk_points, chunk_solves, chunk_last in group_chunk(module_ids, account_ids, points, stamps):
+                entry = totals.get(key)
+                if entry is None:
+                    totals[key] = [int(chunk_points), int(chunk_solves), int(chunk_last)]
+                else:
+                    entry[0] += int(chunk_points)
+                    entry[1] += int(chunk_solves)
+                    if chunk_last > entry[2]:
+                        entry[2] = int(chunk_last)
+
+        if len(rows) < chunk_size:
+            break
+
+    # Group per module so each one is replaced in its own short transaction.
+    by_module: dict[int, dict[int, list[int]]] = {}
+    for key, entry in totals.items():
+        by_module.setdefault(key >> 32, {})[key & 0xFFFFFFFF] = entry
+    linked_modules = sorted({mid for mids in links.values() for mid in mids})
+
+    stale = ModuleScore.query
+    if linked_modules:
+        stale = stale.filter(ModuleScore.module_id.notin_(linked_modules))
+    stale.delete(synchronize_session=False)
+    db.session.commit()
+
+    rows_written = 0
+    insert = ModuleScore.__table__.insert()
+    for module_id in linked_modules:
+        accounts = by_module.get(module_id, {})
+        _lock_modules([module_id])
+        # Solves committed while the chunks were read are folded in under the
+        # lock; per-solve refreshes wait for it and recompute their own row.
+        for _, _, account_id, late_points, late_solves, late_last in db.session.execute(
+            _aggregate_select(account_type, [module_id], after_solve_id=last_id)
+        ).fetchall():
+            late_stamp = (late_last - _EPOCH) // _MICROSECOND if late_last else 0
+            entry = accounts.get(account_id)
+            if entry is None:
+                accounts[account_id] = [int(late_points or 0), int(late_solves or 0), late_stamp]
+            else:
+                entry[0] += int(late_points or 0)
+                entry[1] += int(late_solves or 0)
+                entry[2] = max(entry[2], late_stamp)
+
+        ModuleScore.query.filter(ModuleScore.module_id == module_id).delete(synchronize_session=False)
+        batch = []
+        for account_id, (total_points, total_solves, last) in accounts.items():
+            batch.append(
+                dict(
+                    zip(
+                        _SCORE_COLUMNS,
+                        (module_id, account_type, account_id, total_points, total_solves, _EPOCH + last * _MICROSECOND),
+                    )
+                )
+            )
+            if len(batch) >= REBUILD_INSERT_BATCH:
+                db.session.execute(insert, batch)
+                batch = []
+        if batch:
+            db.session.execute(insert, batch)
+        db.session.commit()
+        rows_written += len(accounts)
+
+    try:
+        current_app.logger.info(
+            "ctfd_modules: rebuilt %s module score rows from %s solves", rows_written, solves_read
+        )
+    except Exception:
+        pass
+    return {"rows": rows_written, "solves": solves_read, "account_type": account_type}
+
+
+def rebuild_module_scores(chunk_size: int = REBUILD_CHUNK_SIZE) -> dict | None:
+    """Rebuild every score row, one rebuild at a time across workers.
+
+    Returns the rebuild stats, or None when another rebuild holds the lock;
+    that rebuild is asked to run once more when it finishes, so changes made
+    after it started reading are still picked up.
+    """
+    backend = get_cache_backend()
+    try:
+        backend.set(_REBUILD_REQUESTED_KEY, 1, timeout=REBUILD_LOCK_TTL)
+    except Exception:
+        pass
+
+    if not _rebuild_lock.acquire(blocking=False):
+        return None
+    holds_cache_lock = False
+    try:
+        try:
+            holds_cache_lock = bool(backend.add(_REBUILD_LOCK_KEY, 1, timeout=REBUILD_LOCK_TTL))
+        except Exception:
+            holds_cache_lock = True
+        if not holds_cache_lock:
+            return None
+
+        stats = None
+        for _ in range(REBUILD_MAX_PASSES):
+            try:
+                if not backend.get(_REBUILD_REQUESTED_KEY):
+                    break
+                backend.delete(_REBUILD_REQUESTED_KEY)
+            except Exception:
+                if stats is not None:
+                    break
+            stats = _rebuild_module_scores(chunk_size)
+        return stats
+    finally:
+        if holds_cache_lock:
+            try:
+                backend.delete(_REBUILD_LOCK_KEY)
+            except Exception:
+                pass
+        _rebuild_lock.release()
+
+
+def rebuild_module_scores_in_background(app) -> None:
+    def _run():
+        with app.app_context():
+            try:
+                rebuild_module_scores()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("ctfd_modules: module score rebuild failed")
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=_run, name="ctfd-modules-score-rebuild", daemon=True).start()
+
+
+_pending_rescores: set[int] = set()
+_pending_lock = threading.Lock()
+_rescore_timer: threading.Timer | None = None
+
+
+def _run_pending_rescores(app) -> None:
+    global _rescore_timer
+    with _pending_lock:
+        module_ids = sorted(_pending_rescores)
+        _pending_rescores.clear()
+        _rescore_timer = None
+    if not module_ids:
+        return
+
+    with app.app_context():
+        try:
+            for module_id in module_ids:
+                rescore_modules([module_id])
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("ctfd_modules: module rescore failed")
+        finally:
+            db.session.remove()
+
+
+def schedule_module_rescore(app, module_ids) -> None:
+    """Recompute these modules in the background after `RESCORE_DEBOUNCE_SECONDS`.
+
+    Modules queued while a pass is pending are merged into it, so a burst of
+    solves on a dynamic challenge costs one recompute per module.
+    """
+    global _rescore_timer
+    with _pending_lock:
+        _pending_rescores.update(int(mid) for mid in module_ids or () if mid)
+        if _rescore_timer is not None or not _pending_rescores:
+            return
+        timer = threading.Timer(RESCORE_DEBOUNCE_SECONDS, _run_pending_rescores, args=(app,))
+        timer.name = "ctfd-modules-rescore"
+        timer.daemon = True
+        _rescore_timer = timer
+    timer.start()
+
+
+def _refresh_account_rows(account_type: str, account_id: int, module_ids) -> None:
+    """Recompute one account's rows on these modules; the caller holds the module locks."""
+    ModuleScore.query.filter(ModuleScore.module_id.in_(module_ids)).filter(
+        ModuleScore.account_type == account_type
+    ).filter(ModuleScore.account_id == account_id).delete(synchronize_session=False)
+    db.session.execute(
+        ModuleScore.__table__.insert().from_select(
+            list(_SCORE_COLUMNS),
+            _aggregate_select(account_type, module_ids, account_id=account_id),
+        )
+    )
+
+
+def record_module_solve(account: tuple[str, int], challenge_id: int) -> int:
+    """Bring the account's module rows up to date after a correct solve; returns rows touched.
+
+    Each row is recomputed from the account's own solves on the module (an
+    index probe per linked challenge) under the module locks, so a refresh
+    racing a rebuild or a retried hook never counts a solve twice. Dynamic
+    challenges change value for every solver, so their modules are queued for
+    a debounced background recompute instead.
+    """
+    module_ids = sorted(challenge_module_index().modules_of(challenge_id))
+    if not module_ids or account is None:
+        return 0
+
+    row = (
+        db.session.query(Challenges.state, Challenges.type)
+        .filter(Challenges.id == challenge_id)
+        .first()
+    )
+    if not row:
+        return 0
+    if row.type == "dynamic":
+        # The solve changed the challenge's value; only the value map holds it.
+        bump_cache_generation("challenge_values")
+    if row.state != "visible" or account[0] != score_account_type():
+        return 0
+
+    if row.type == "dynamic":
+        schedule_module_rescore(current_app._get_current_object(), module_ids)
+        return len(module_ids)
+
+    account_type, account_id = account
+    try:
+        _lock_modules(module_ids)
+        _refresh_account_rows(account_type, account_id, module_ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(module_ids)
+
+
+def module_scoreboard(module: Module, top: int = SCOREBOARD_TOP_DEFAULT) -> list[dict]:
+    """Top-N accounts on a module.
+
+    Read straight from `module_scores`, which always holds every solve. While
+    the CTF is frozen the module's totals are aggregated from `Solves` up to
+    the freeze time instead, like the core scoreboard, so lifting the freeze
+    needs no rebuild.
+    """
+    top = max(1, min(int(top or SCOREBOARD_TOP_DEFAULT), SCOREBOARD_TOP_MAX))
+    account_type = score_account_type()
+    account_model = Teams if account_type == "team" else Users
+
+    cutoff = freeze_cutoff()
+    if cutoff is not None:
+        scores = _aggregate_select(account_type, [module.id], before=cutoff).subquery()
+    else:
+        scores = (
+            db.session.query(
+                ModuleScore.account_id.label("account_id"),
+                ModuleScore.points.label("points"),
+                ModuleScore.solves.label("solves"),
+                ModuleScore.last_solve_at.label("last_solve_at"),
+            )
+            .filter(ModuleScore.module_id == module.id)
+            .filter(ModuleScore.account_type == account_type)
+            .subquery()
+        )
+
+    q = (
+        db.session.query(
+            scores.c.account_id,
+            account_model.name,
+            scores.c.points,
+            scores.c.solves,
+            scores.c.last_solve_at,
+        )
+        .join(account_model, account_model.id == scores.c.account_id)
+        .filter(account_model.hidden.is_(False))
+        .filter(account_model.banned.is_(False))
+    )
+    if account_type == "user":
+        q = q.filter(Users.type != "admin")
+    rows = q.order_by(scores.c.points.desc(), scores.c.last_solve_at.asc()).limit(top).all()
+
+    return [
+        {
+            "pos": pos,
+            "account_id": account_id,
+            "account_type": account_type,
+            "name": name,
+            "points": points,
+            "solves": solves,
+            "last_solve_at": last_solve_at.isoformat() if last_solve_at else None,
+        }
+        for pos, (account_id, name, points, solves, last_solve_at) in enumerate(rows, start=1)
+    ]
+
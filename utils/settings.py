@@ -7,6 +7,7 @@ from flask import current_app
 from CTFd.models import db
 
 from ..models import ModuleSettings
+from .cache import cached, invalidate_cache, register_cache_warmer
 
 
 @dataclass(frozen=True)
@@ -18,6 +19,20 @@ class SettingsDefaults:
     lock_message: str = "This module is under construction. Access will be available soon."
 
 
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """Immutable copy of the settings row plus config-backed options."""
+
+    modules_enabled: bool
+    hide_challenges_page: bool
+    challenges_board_mode: str
+    invite_code_length: int
+    lock_message: str
+    ui_theme: str
+    progress_mode: str
+    progress_loading: str
+
+
 UI_THEME_DEFAULT = "auto"
 UI_THEME_ALLOWED = ("auto", "pixo", "core-beta")
 UI_THEME_CONFIG_KEY = "CTFD_MODULES_UI_THEME"
@@ -26,6 +41,10 @@ PROGRESS_MODE_DEFAULT = "challenges"
 PROGRESS_MODE_ALLOWED = ("challenges", "points")
 PROGRESS_MODE_CONFIG_KEY = "CTFD_MODULES_PROGRESS_MODE"
 
+PROGRESS_LOADING_DEFAULT = "inline"
+PROGRESS_LOADING_ALLOWED = ("inline", "deferred")
+PROGRESS_LOADING_CONFIG_KEY = "CTFD_MODULES_PROGRESS_LOADING"
+
 
 DEFAULTS = SettingsDefaults()
 
@@ -96,6 +115,21 @@ def set_progress_mode(value: str) -> None:
     _write_ctfd_config(PROGRESS_MODE_CONFIG_KEY, val)
 
 
+def get_progress_loading() -> str:
+    raw = _read_ctfd_config(PROGRESS_LOADING_CONFIG_KEY)
+    val = (str(raw or PROGRESS_LOADING_DEFAULT)).strip().lower()
+    if val not in PROGRESS_LOADING_ALLOWED:
+        val = PROGRESS_LOADING_DEFAULT
+    return val
+
+
+def set_progress_loading(value: str) -> None:
+    val = (str(value or PROGRESS_LOADING_DEFAULT)).strip().lower()
+    if val not in PROGRESS_LOADING_ALLOWED:
+        val = PROGRESS_LOADING_DEFAULT
+    _write_ctfd_config(PROGRESS_LOADING_CONFIG_KEY, val)
+
+
 def _read_legacy_ctfd_config(key: str):
     """Best-effort read from CTFd Configs store used by older versions of this plugin."""
     cfg_key = f"CTFD_MODULES_{key.upper()}"
@@ -184,6 +218,32 @@ def get_settings(create: bool = True) -> ModuleSettings:
     return row
 
 
+def _load_settings_snapshot() -> SettingsSnapshot:
+    s = get_settings(create=True)
+    return SettingsSnapshot(
+        modules_enabled=bool(getattr(s, "modules_enabled", DEFAULTS.modules_enabled)),
+        hide_challenges_page=bool(getattr(s, "hide_challenges_page", DEFAULTS.hide_challenges_page)),
+        challenges_board_mode=(
+            (getattr(s, "challenges_board_mode", None) or DEFAULTS.challenges_board_mode).strip().lower()
+        ),
+        invite_code_length=_coerce_int(getattr(s, "invite_code_length", None), DEFAULTS.invite_code_length)
+        or DEFAULTS.invite_code_length,
+        lock_message=str(getattr(s, "lock_message", None) or DEFAULTS.lock_message),
+        ui_theme=get_ui_theme(),
+        progress_mode=get_progress_mode(),
+        progress_loading=get_progress_loading(),
+    )
+
+
+def settings_snapshot() -> SettingsSnapshot:
+    """Settings for read paths, rebuilt only after the settings form is saved."""
+
+    return cached("settings", "snapshot", _load_settings_snapshot)
+
+
+register_cache_warmer("settings", settings_snapshot)
+
+
 def update_settings_from_form(form) -> None:
     s = get_settings(create=True)
 
@@ -208,7 +268,9 @@ def update_settings_from_form(form) -> None:
     s.lock_message = (form.get("lock_message") or DEFAULTS.lock_message).strip() or DEFAULTS.lock_message
 
     # theme (stored in CTFd Configs to avoid DB migrations)
+    invalidate_cache("settings")
     set_ui_theme(form.get("ui_theme") or UI_THEME_DEFAULT)
     set_progress_mode(form.get("progress_mode") or PROGRESS_MODE_DEFAULT)
+    set_progress_loading(form.get("progress_loading") or PROGRESS_LOADING_DEFAULT)
 
     db.session.commit()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+
+from flask import current_app
+
+from CTFd.models import db
+
+from ..models import ModuleAccess, ModuleGroupAccess, ModuleTeamAccess
+from .access import access_namespace, team_access_namespace
+from .cache import invalidate_cache
+
+SWEEP_BATCH_SIZE_DEFAULT = 500
+SWEEP_INTERVAL_CONFIG_KEY = "CTFD_MODULES_ACCESS_SWEEP_INTERVAL"
+SWEEP_BATCH_CONFIG_KEY = "CTFD_MODULES_ACCESS_SWEEP_BATCH"
+
+_last_sweep: dict = {}
+_sweeper_thread: threading.Thread | None = None
+
+
+def last_access_sweep() -> dict:
+    return dict(_last_sweep)
+
+
+def expired_access_count(now: datetime | None = None) -> int:
+    """Expired user, team and group grants still waiting for the sweeper."""
+    now = now or datetime.utcnow()
+    total = 0
+    for model in (ModuleAccess, ModuleTeamAccess, ModuleGroupAccess):
+        total += (
+            db.session.query(db.func.count())
+            .select_from(model)
+            .filter(model.expires_at.isnot(None))
+            .filter(model.expires_at <= now)
+            .scalar()
+            or 0
+        )
+    return total
+
+
+def sweep_expired_access(batch_size: int = SWEEP_BATCH_SIZE_DEFAULT, now: datetime | None = None) -> dict:
+    """Delete expired user, team and group grants.
+
+    User grants (`ModuleAccess`) are deleted in batches, each committed
+    separately so long sweeps never hold a large lock; team and group grants
+    follow in one statement each. Only the affected users' and teams' access
+    caches are invalidated, plus the shared group map when a group grant went.
+    """
+
+    now = now or datetime.utcnow()
+    batch_size = max(1, int(batch_size or SWEEP_BATCH_SIZE_DEFAULT))
+
+    deleted = 0
+    batches = 0
+    users: set[int] = set()
+
+    while True:
+        rows = (
+            db.session.query(ModuleAccess.user_id, ModuleAccess.module_id)
+            .filter(ModuleAccess.expires_at.isnot(None))
+            .filter(ModuleAccess.expires_at <= now)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        modules_by_user: dict[int, list[int]] = {}
+        for user_id, module_id in rows:
+            modules_by_user.setdefault(user_id, []).append(module_id)
+
+        for user_id, module_ids in modules_by_user.items():
+            deleted += (
+                ModuleAccess.query.filter(ModuleAccess.user_id == user_id)
+                .filter(ModuleAccess.module_id.in_(module_ids))
+                .filter(ModuleAccess.expires_at <= now)
+                .delete(synchronize_session=False)
+            )
+            invalidate_cache(access_namespace(user_id))
+
+        db.session.commit()
+        users.update(modules_by_user)
+        batches += 1
+
+        if len(rows) < batch_size:
+            break
+
+    # Team and group grants are one row per (team|group, module): small enough
+    # for a single statement each.
+    expired_teams = {
+        team_id
+        for (team_id,) in db.session.query(ModuleTeamAccess.team_id)
+        .filter(ModuleTeamAccess.expires_at.isnot(None))
+        .filter(ModuleTeamAccess.expires_at <= now)
+        .distinct()
+        .all()
+    }
+    team_grants = 0
+    if expired_teams:
+        team_grants = (
+            ModuleTeamAccess.query.filter(ModuleTeamAccess.expires_at.isnot(None))
+            .filter(ModuleTeamAccess.expires_at <= now)
+            .delete(synchronize_session=False)
+        )
+        for team_id in expired_teams:
+            invalidate_cache(team_access_namespace(team_id))
+
+    group_grants = (
+        ModuleGroupAccess.query.filter(ModuleGroupAccess.expires_at.isnot(None))
+        .filter(ModuleGroupAccess.expires_at <= now)
+        .delete(synchronize_session=False)
+    )
+    if group_grants:
+        invalidate_cache("groups")
+    db.session.commit()
+
+    stats = {
+        "deleted": deleted,
+        "team_grants": team_grants,
+        "group_grants": group_grants,
+        "batches": batches,
+        "users": len(users),
+        "ran_at": now.isoformat(),
+    }
+    _last_sweep.clear()
+    _last_sweep.update(stats)
+
+    if deleted:
+        try:
+            current_app.logger.info(
+                "ctfd_modules: swept %s expired access grants for %s users", deleted, len(users)
+            )
+        except Exception:
+            pass
+
+    return stats
+
+
+def start_access_sweeper(app) -> bool:
+    """Start the optional in-process sweeper thread.
+
+    Enabled by setting `CTFD_MODULES_ACCESS_SWEEP_INTERVAL` (seconds) in the
+    app config. Every worker runs its own timer; sweeps are idempotent.
+    """
+
+    global _sweeper_thread
+
+    try:
+        interval = int(app.config.get(SWEEP_INTERVAL_CONFIG_KEY) or 0)
+    except Exception:
+        interval = 0
+    if interval <= 0:
+        return False
+
+    if _sweeper_thread is not None and _sweeper_thread.is_alive():
+        return True
+
+    try:
+        batch_size = int(app.config.get(SWEEP_BATCH_CONFIG_KEY) or SWEEP_BATCH_SIZE_DEFAULT)
+    except Exception:
+        batch_size = SWEEP_BATCH_SIZE_DEFAULT
+
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(interval):
+            with app.app_context():
+                try:
+                    sweep_expired_access(batch_size=batch_size)
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("ctfd_modules: access sweep failed")
+                finally:
+                    db.session.remove()
+
+    _sweeper_thread = threading.Thread(target=_run, name="ctfd-modules-access-sweeper", daemon=True)
+    _sweeper_thread.start()
+    return True
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from .access import account_team_id, active_module_ids
+from .cache import cached, register_cache_warmer
+from .index import STATUS_PRIVATE, STATUS_PUBLIC, challenge_module_index
+from .prerequisites import prerequisite_locked_ids
+
+
+def module_challenge_bitsets() -> dict:
+    """Challenge-id bitsets: `{"assigned": int, "modules": {module_id: (status_code, int)}}`.
+
+    Bit `cid` of `assigned` is set for every challenge linked to a module;
+    each module carries the bitset of its own challenges. Python ints give a
+    compact bitset with C-speed OR/AND-NOT.
+    """
+
+    def _load():
+        index = challenge_module_index()
+        assigned = 0
+        for challenge_id in index.challenge_ids():
+            assigned |= 1 << challenge_id
+        by_module = {}
+        for module_id in index.module_ids():
+            bits = 0
+            for challenge_id in index.challenges_of(module_id):
+                bits |= 1 << challenge_id
+            by_module[module_id] = (index.status_of(module_id), bits)
+        return {
+            "assigned": assigned,
+            "modules": by_module,
+        }
+
+    return cached(("links", "modules"), "challenge_bitsets", _load)
+
+
+def hidden_challenge_bits(granted_private_ids, locked_ids) -> bytes:
+    """Bitset of module challenges hidden from an account, as little-endian bytes.
+
+    Visible = OR of the bitsets of public modules plus granted private ones,
+    minus prerequisite-locked modules; hidden = assigned AND NOT visible.
+    Cached per (grant set, lock set) so accounts with the same access share it.
+    """
+    granted_private_ids = tuple(sorted(granted_private_ids or ()))
+    locked_ids = tuple(sorted(locked_ids or ()))
+
+    def _load():
+        index = module_challenge_bitsets()
+        granted = set(granted_private_ids)
+        locked = set(locked_ids)
+        visible = 0
+        for module_id, (status, bits) in index["modules"].items():
+            if module_id in locked:
+                continue
+            if status == STATUS_PUBLIC or (status == STATUS_PRIVATE and module_id in granted):
+                visible |= bits
+        hidden = index["assigned"] & ~visible
+        return hidden.to_bytes((hidden.bit_length() + 7) // 8, "little")
+
+    return cached(("links", "modules"), ("hidden_bits", granted_private_ids, locked_ids), _load)
+
+
+def bitset_contains(bits: bytes, challenge_id: int) -> bool:
+    byte = challenge_id >> 3
+    return byte < len(bits) and bool(bits[byte] >> (challenge_id & 7) & 1)
+
+
+def account_hidden_challenges(user) -> bytes:
+    """Hidden-challenge bitset for the current account.
+
+    Logged-out visitors hold no grants and have solved nothing, so private
+    modules and every module with prerequisites stay hidden.
+    """
+    if user is None or not hasattr(user, "id"):
+        return hidden_challenge_bits((), prerequisite_locked_ids(None))
+
+    index = module_challenge_bitsets()
+    private_ids = {
+        module_id
+        for module_id, (status, _) in index["modules"].items()
+        if status == STATUS_PRIVATE
+    }
+    granted = active_module_ids(user.id, team_id=account_team_id(user)) & private_ids
+    return hidden_challenge_bits(granted, prerequisite_locked_ids(user))
+
+
+register_cache_warmer("challenge_bitsets", module_challenge_bitsets)
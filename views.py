@@ -1,24 +1,35 @@
 from __future__ import annotations
 
-from flask import Blueprint, abort, flash, redirect, render_template, request, url_for
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, url_for
+from markupsafe import Markup
 from werkzeug.exceptions import HTTPException
 
 from CTFd.models import db
 from CTFd.utils.decorators import ratelimit
 from CTFd.utils.user import get_current_user
 
-from .models import Module, ModuleChallenge, ModuleStatus
+from .models import Module, ModuleStatus
 from .compat import csrf_protect
 from .utils import (
     can_view_module,
-    module_challenges_query,
+    module_challenge_summaries,
     module_progress,
     modules_enabled,
     user_has_module_access,
-    grant_access,
-    get_settings,
-    ordered_modules_query,
-    ordered_category_names,
+    cached,
+    grant_invite_access,
+    settings_snapshot,
+    challenge_module_index,
+    module_challenge_ids,
+    module_prerequisites,
+    module_snapshots,
+    ordered_module_tree,
+    prerequisite_locked_ids,
+    requirement_locked_challenge_ids,
+    ModuleSnapshot,
+    STATUS_LOCKED,
+    STATUS_PRIVATE,
+    STATUS_PUBLIC,
 )
 
 modules_bp = Blueprint("ctfd_modules", __name__, template_folder="templates", static_folder="static")
@@ -116,6 +127,35 @@ def _visible_challenge_ids_for_current_user(challenge_ids: set[int]) -> set[int]
     return visible_ids
 
 
+# Bump when templates/modules/_module_card.html changes shape, so fragments
+# cached in a shared store by a previous deploy are not reused.
+MODULE_CARD_FRAGMENT_VERSION = 1
+
+
+def _module_card_fragments(module: ModuleSnapshot, theme: str) -> dict:
+    """Return the cached static HTML (banner, title) for a module card.
+
+    Keyed by module id + updated_at + theme: it only changes on admin edits,
+    so `/modules` renders just the per-user progress overlay per card.
+    """
+
+    updated = module.updated_at.isoformat() if module.updated_at else ""
+
+    def _render():
+        macros = current_app.jinja_env.get_template("modules/_module_card.html").module
+        return {
+            "banner": str(macros.card_banner(module)),
+            "title": str(macros.card_title(module)),
+        }
+
+    fragments = cached(
+        "fragments",
+        ("module_card", MODULE_CARD_FRAGMENT_VERSION, module.id, updated, theme),
+        _render,
+    )
+    return {name: Markup(html) for name, html in fragments.items()}
+
+
 @modules_bp.route("/modules")
 def modules_index():
     _ensure_modules_enabled()
@@ -123,33 +163,32 @@ def modules_index():
     if redirect_response:
         return redirect_response
 
-    modules = ordered_modules_query().all()
-    visible = [m for m in modules if can_view_module(user, m)]
-
-    # Do not show locked modules in the list.
-    visible = [m for m in visible if m.status != ModuleStatus.locked]
+    modules_by_id = module_snapshots()
 
-    # Requirement: private modules must not be shown in the general list
-    # unless the user already has access.
-    visible = [
-        m
-        for m in visible
-        if m.status == ModuleStatus.public
-        or (m.status == ModuleStatus.private and user_has_module_access(user, m))
-    ]
+    # Walk the precomputed category -> module order. Modules without a category
+    # are intentionally hidden from the public /modules list.
+    visible_tree: list[tuple[str, list[ModuleSnapshot]]] = []
+    for category, module_ids in ordered_module_tree():
+        if category is None:
+            continue
+        visible = [modules_by_id[mid] for mid in module_ids if mid in modules_by_id]
+        visible = [m for m in visible if can_view_module(user, m)]
+
+        # Locked modules are not shown; private modules must not be shown in
+        # the general list unless the user already has access.
+        visible = [
+            m
+            for m in visible
+            if m.status_code == STATUS_PUBLIC
+            or (m.status_code == STATUS_PRIVATE and user_has_module_access(user, m))
+        ]
+        if visible:
+            visible_tree.append((category, visible))
 
-    module_ids = [m.id for m in visible]
     challenge_ids_by_module: dict[int, list[int]] = {}
-    if module_ids:
-        rows = (
-            db.session.query(ModuleChallenge.module_id, ModuleChallenge.challenge_id)
-            .filter(ModuleChallenge.module_id.in_(module_ids))
-            .all()
-        )
-        for module_id, challenge_id in rows:
-            if module_id not in challenge_ids_by_module:
-                challenge_ids_by_module[module_id] = []
-            challenge_ids_by_module[module_id].append(challenge_id)
+    for _, visible in visible_tree:
+        for m in visible:
+            challenge_ids_by_module[m.id] = sorted(module_challenge_ids(m.id))
 
     all_module_challenge_ids = {
         challenge_id
@@ -157,49 +196,69 @@ def modules_index():
         for challenge_id in ids
     }
 
-    visible_challenge_ids = _visible_challenge_ids_for_current_user(all_module_challenge_ids)
-    if visible_challenge_ids is None:
-        visible_challenge_ids = set()
-
-    cards = []
-    for m in visible:
-        has_access = user_has_module_access(user, m)
-        module_challenge_ids = challenge_ids_by_module.get(m.id, [])
-        available_ids = [challenge_id for challenge_id in module_challenge_ids if challenge_id in visible_challenge_ids]
-        if not available_ids:
-            continue
-
-        if has_access:
-            prog = module_progress(user, m, challenge_ids=available_ids)
-        else:
-            prog = module_progress(None, m, challenge_ids=available_ids)
-
-        cards.append(
-            {
-                "module": m,
-                "has_access": has_access,
-                "progress": prog,
-            }
-        )
-
-    # Group by categories (with ordering from ModuleCategory).
-    # Modules without a category are intentionally hidden from the public /modules list.
-    category_names = ordered_category_names()
-    grouped = {name: [] for name in category_names}
-    extra_category_names = []
-
-    for card in cards:
-        cat = (card["module"].category or "").strip()
-        if not cat:
-            continue
-        if cat not in grouped:
-            grouped[cat] = []
-            extra_category_names.append(cat)
-        grouped[cat].append(card)
+    snapshot = settings_snapshot()
+    deferred_progress = snapshot.progress_loading == "deferred"
+    if deferred_progress:
+        # Render from cached metadata only; per-user progress is fetched by
+        # static/js/modules_progress.js with one batched API call. Challenges
+        # still gated by CTFd requirements are dropped, as the core listing does.
+        index = challenge_module_index()
+        gated = requirement_locked_challenge_ids(user)
+        visible_challenge_ids = {
+            challenge_id
+            for module_id in challenge_ids_by_module
+            for challenge_id in index.visible_challenges_of(module_id)
+            if challenge_id not in gated
+        }
+    else:
+        visible_challenge_ids = _visible_challenge_ids_for_current_user(all_module_challenge_ids)
+        if visible_challenge_ids is None:
+            visible_challenge_ids = set()
+
+    theme = snapshot.ui_theme
+    locked_ids = prerequisite_locked_ids(user)
+    names_by_id = {module_id: m.name for module_id, m in modules_by_id.items()}
+    grouped_list = []
+    for category, visible in visible_tree:
+        cards = []
+        for m in visible:
+            has_access = user_has_module_access(user, m)
+            linked_ids = challenge_ids_by_module.get(m.id, [])
+            available_ids = [challenge_id for challenge_id in linked_ids if challenge_id in visible_challenge_ids]
+            if not available_ids:
+                continue
+
+            if m.id in locked_ids:
+                has_access = False
+                prog = module_progress(None, m, challenge_ids=available_ids)
+            elif deferred_progress:
+                prog = None
+            elif has_access:
+                prog = module_progress(user, m, challenge_ids=available_ids)
+            else:
+                prog = module_progress(None, m, challenge_ids=available_ids)
+
+            cards.append(
+                {
+                    "module": m,
+                    "has_access": has_access,
+                    "progress": prog,
+                    "requires": (
+                        [names_by_id[p] for p in module_prerequisites(m.id) if p in names_by_id]
+                        if m.id in locked_ids
+                        else []
+                    ),
+                    "fragments": _module_card_fragments(m, theme),
+                }
+            )
+        if cards:
+            grouped_list.append((category, cards))
 
-    ordered_all = category_names + sorted(set(extra_category_names))
-    grouped_list = [(name, grouped.get(name, [])) for name in ordered_all if grouped.get(name)]
-    return render_template("modules/index.html", grouped=grouped_list)
+    return render_template(
+        "modules/index.html",
+        grouped=grouped_list,
+        deferred_progress=deferred_progress,
+    )
 
 
 @modules_bp.route("/modules/join", methods=["GET", "POST"])
@@ -223,7 +282,7 @@ def modules_join():
             flash("This module does not require an invite", "info")
             return redirect(url_for("ctfd_modules.module_view", module_id=module.id))
 
-        grant_access(module, user, granted_by_user=None)
+        grant_invite_access(module, user)
         db.session.commit()
 
         flash("Access granted", "success")
@@ -238,29 +297,39 @@ def module_view(module_id: int):
     user, redirect_response = _current_user_or_redirect()
     if redirect_response:
         return redirect_response
-    module = Module.query.get_or_404(module_id)
+    snapshots = module_snapshots()
+    module = snapshots.get(module_id)
+    if module is None:
+        abort(404)
 
     has_access = user_has_module_access(user, module)
 
     # locked modules are not accessible (no tasks) regardless of role/access
-    if module.status == ModuleStatus.locked:
-        s = get_settings(create=True)
-        lock_message = getattr(s, "lock_message", None)
+    if module.status_code == STATUS_LOCKED:
+        lock_message = settings_snapshot().lock_message
         return render_template(
             "modules/locked.html",
             module=module,
             lock_message=lock_message,
         )
 
-    if module.status == ModuleStatus.private and not has_access:
+    if module.status_code == STATUS_PRIVATE and not has_access:
         abort(403)
 
-    challenges = module_challenges_query(module, include_hidden=False)
+    if module.id in prerequisite_locked_ids(user):
+        names = ", ".join(sorted(snapshots[p].name for p in module_prerequisites(module.id) if p in snapshots))
+        return render_template(
+            "modules/locked.html",
+            module=module,
+            lock_message=f"Complete {names} to unlock this module.",
+        )
+
+    challenges = module_challenge_summaries(module, include_hidden=False)
     if not challenges:
         abort(404)
 
     challenge_ids = [c.id for c in challenges]
-    progress = module_progress(user, module, challenge_ids=challenge_ids)
+    progress = module_progress(user, module)
 
     return render_template(
         "modules/challenge_listing.html",
@@ -292,7 +361,7 @@ def module_join_post(module_id: int):
         flash("Invalid invite code", "danger")
         return redirect(url_for("ctfd_modules.module_view", module_id=module.id))
 
-    grant_access(module, user, granted_by_user=None)
+    grant_invite_access(module, user)
     db.session.commit()
 
     flash("Access granted", "success")